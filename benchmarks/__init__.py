@@ -0,0 +1,4 @@
+"""Performance benchmarks for the churn scoring paths.
+
+Run from the repository root, e.g. ``python -m benchmarks.bench_prediction``.
+"""
@@ -0,0 +1,92 @@
+"""Cold-start time of the joblib/pickle artifacts vs the memory-mapped bundle.
+
+Each measurement runs in a fresh interpreter and covers imports, loading and
+the first single-row prediction.
+
+Usage:
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import warnings
+
+from churn_scoring.artifacts import load_artifacts
+from churn_scoring.bundle import export_bundle, load_bundle
+from churn_scoring.fast_svm import FastSVM
+
+_PICKLE_PROBE = """
+import time, json, warnings
+warnings.filterwarnings('ignore')
+t0 = time.perf_counter()
+from churn_scoring.artifacts import load_artifacts
+from churn_scoring.fast_svm import FastSVM
+t1 = time.perf_counter()
+model, scaler, feature_names = load_artifacts({artifact_dir!r})
+engine = FastSVM.from_model(model)
+t2 = time.perf_counter()
+engine.predict_proba([[0.0] * 12])
+t3 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'load': t2 - t1, 'first_prediction': t3 - t2}}))
+"""
+
+_BUNDLE_PROBE = """
+import time, json
+t0 = time.perf_counter()
+from churn_scoring.bundle import load_bundle
+t1 = time.perf_counter()
+bundle = load_bundle({bundle_path!r})
+engine = bundle.engine()
+pipeline = bundle.pipeline()
+t2 = time.perf_counter()
+engine.predict_proba([[0.0] * 12])
+t3 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'load': t2 - t1, 'first_prediction': t3 - t2}}))
+"""
+
+
+def _probe(code, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                             check=True, cwd=os.getcwd())
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    model, scaler, feature_names = load_artifacts()
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_path = os.path.join(tmp, 'churn_model.bundle')
+        export_bundle(bundle_path, model, scaler, feature_names)
+
+        # The mapped engine must score exactly like the pickled one
+        X = [[0.0] * 12, [1.0] * 12]
+        parity = abs(load_bundle(bundle_path).engine().predict_proba(X)
+                     - FastSVM.from_model(model).predict_proba(X)).max()
+        print(f"parity: max |bundle - pickle| = {parity:.1e}")
+
+        results = {
+            'joblib/pickle': _probe(_PICKLE_PROBE.format(artifact_dir=os.getcwd()), args.runs),
+            'memory-mapped bundle': _probe(_BUNDLE_PROBE.format(bundle_path=bundle_path), args.runs),
+        }
+
+    for name, timing in results.items():
+        total = sum(timing.values())
+        print(f"{name:>22}: import {timing['import'] * 1000:7.1f} ms  "
+              f"load {timing['load'] * 1000:7.1f} ms  "
+              f"first prediction {timing['first_prediction'] * 1000:6.1f} ms  "
+              f"total {total * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
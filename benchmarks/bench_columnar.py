@@ -0,0 +1,201 @@
+"""Ingestion bytes/sec and peak memory: Arrow columnar path vs pandas.
+
+Writes synthetic customers (with the extra RowNumber, CustomerId, Surname
+and Exited columns of the bank customer table) as Parquet and Arrow IPC,
+then builds the full scaled feature matrix of each file with:
+
+    dataframe   pandas read -> encode_customers -> scale_features, the
+                input_df[feature_names] + scaler.transform chain of the apps
+    pipeline    pandas read -> FeaturePipeline.transform_columns
+    chunks      churn_scoring.batch.read_chunks (Arrow batches -> pandas)
+                -> transform_columns per chunk, as batch scoring did
+    arrow       churn_scoring.columnar.feature_matrix: projected,
+                dictionary-encoded Arrow batches into one preallocated matrix
+    arrow_chunks  churn_scoring.columnar.feature_batches, one reused buffer
+
+Each (method, format) case runs in a fresh subprocess so its peak RSS is its
+own; "peak MB" is the peak RSS above the process after imports and artifact
+loading.  Throughput is the file size over the best of ``--repeat`` runs
+(page cache warm after the first).
+
+Usage:
+    python -m benchmarks.bench_columnar --rows 1000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from benchmarks import bench_suite
+from churn_scoring.synthetic import synthetic_customers
+
+METHODS = ['dataframe', 'pipeline', 'chunks', 'arrow', 'arrow_chunks']
+FORMATS = {'parquet': 'customers.parquet', 'arrow': 'customers.arrow'}
+CHUNK_SIZE = 50_000
+
+
+def _peak_rss_mb():
+    """Peak RSS of this process.
+
+    ru_maxrss survives fork + exec on Linux, so a case started from this
+    (large) parent would report the parent's peak; VmHWM starts afresh.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return bench_suite._peak_rss_mb()
+
+
+def write_files(directory, n_rows):
+    """Synthetic customer table as Parquet and Arrow IPC files in ``directory``"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    customers = synthetic_customers(n_rows)
+    rng = np.random.default_rng(1)
+    customers.insert(0, 'RowNumber', np.arange(1, n_rows + 1))
+    customers.insert(1, 'CustomerId', 15_000_000 + rng.permutation(n_rows))
+    customers.insert(2, 'Surname', rng.choice(['Smith', 'Chen', 'Rossi', 'Okafor', 'Novak',
+                                               'Garcia', 'Müller', 'Dubois'], n_rows))
+    customers['Exited'] = rng.integers(0, 2, n_rows)
+    table = pa.Table.from_pandas(customers, preserve_index=False)
+
+    paths = {name: os.path.join(directory, filename) for name, filename in FORMATS.items()}
+    pq.write_table(table, paths['parquet'])
+    with pa.ipc.new_file(paths['arrow'], table.schema) as writer:
+        writer.write_table(table, max_chunksize=CHUNK_SIZE)
+    return paths
+
+
+def _read_frame(path):
+    import pandas as pd
+
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_feather(path)
+
+
+def _make_method(name, path, scaler, feature_names):
+    """Return fn() building the scaled feature matrix of ``path`` with ``name``"""
+    from churn_scoring import columnar
+    from churn_scoring.pipeline import FeaturePipeline
+
+    pipeline = FeaturePipeline(scaler, feature_names)
+
+    if name == 'dataframe':
+        from churn_scoring.encoding import encode_customers, scale_features
+        return lambda: scale_features(encode_customers(_read_frame(path), feature_names), scaler)
+
+    if name == 'pipeline':
+        return lambda: pipeline.transform_columns(_read_frame(path))
+
+    if name == 'chunks':
+        from churn_scoring.batch import read_chunks
+
+        def chunks():
+            for chunk in read_chunks(path, CHUNK_SIZE):
+                X = pipeline.transform_columns(chunk)
+            return X
+        return chunks
+
+    if name == 'arrow':
+        return lambda: columnar.feature_matrix(path, pipeline, CHUNK_SIZE)
+
+    def arrow_chunks():
+        for X in columnar.feature_batches(path, pipeline, CHUNK_SIZE):
+            pass
+        return X
+    return arrow_chunks
+
+
+def run_case(method, path, repeat):
+    """Time one (method, file) case in this process"""
+    from churn_scoring.artifacts import load_artifacts
+
+    warnings.filterwarnings('ignore')
+    _, scaler, feature_names = load_artifacts()
+    fn = _make_method(method, path, scaler, feature_names)
+    rss_before = _peak_rss_mb()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        'method': method,
+        'seconds': min(times),
+        'peak_mb': _peak_rss_mb() - rss_before,
+    }
+
+
+def _run_subprocess(method, path, repeat):
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_columnar', '--case', method, path, str(repeat)],
+        check=True, stdout=subprocess.PIPE, text=True)
+    return json.loads(out.stdout)
+
+
+def check_parity(paths):
+    """Whether every method builds the same matrix as the DataFrame path"""
+    from churn_scoring.artifacts import load_artifacts
+
+    _, scaler, feature_names = load_artifacts()
+    reference = _make_method('dataframe', paths['parquet'], scaler, feature_names)()
+    for path in paths.values():
+        for method in ('pipeline', 'arrow'):
+            if not np.array_equal(_make_method(method, path, scaler, feature_names)(), reference):
+                return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--methods', nargs='+', choices=METHODS, default=METHODS)
+    parser.add_argument('--formats', nargs='+', choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help="Also write the results as JSON")
+    parser.add_argument('--case', nargs=3, metavar=('METHOD', 'PATH', 'REPEAT'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], args.case[1], int(args.case[2]))))
+        return
+
+    warnings.filterwarnings('ignore')
+    results = {'rows': args.rows, 'results': []}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, args.rows)
+        print(f"{args.rows:,} customers; identical matrices: {check_parity(paths)}")
+        matrix_mb = args.rows * 12 * 8 / 2**20
+        print(f"feature matrix {matrix_mb:.0f} MB (chunked methods keep {CHUNK_SIZE:,} rows)")
+        print(f"{'format':>8} {'file MB':>8} {'method':>13} {'seconds':>8} {'MB/sec':>8} "
+              f"{'rows/sec':>12} {'peak MB':>8}")
+        for fmt in args.formats:
+            size = os.path.getsize(paths[fmt])
+            for method in args.methods:
+                result = _run_subprocess(method, paths[fmt], args.repeat)
+                result.update(format=fmt, file_bytes=size,
+                              bytes_per_sec=size / result['seconds'],
+                              rows_per_sec=args.rows / result['seconds'])
+                results['results'].append(result)
+                print(f"{fmt:>8} {size / 2**20:>8.1f} {method:>13} {result['seconds']:>8.3f} "
+                      f"{result['bytes_per_sec'] / 2**20:>8.1f} {result['rows_per_sec']:>12,.0f} "
+                      f"{result['peak_mb']:>8.0f}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Throughput and parity of FastSVM against the sklearn SVC.
+
+Usage:
+    python -m benchmarks.bench_fast_svm --rows 100000
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from churn_scoring.artifacts import load_artifacts
+from churn_scoring.encoding import encode_customers, scale_features
+from churn_scoring.fast_svm import REDUCED_PRECISIONS, FastSVM, accuracy_delta
+from churn_scoring.pipeline import FeaturePipeline
+from churn_scoring.precision import reduced_engine
+from churn_scoring.synthetic import synthetic_customers
+
+
+def _rows_per_second(engine, X):
+    start = time.perf_counter()
+    engine.predict_proba(X)
+    return len(X) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--sklearn-rows', type=int, default=10_000,
+                        help="Rows timed through the (slow) sklearn model")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    model, scaler, feature_names = load_artifacts()
+    X = scale_features(encode_customers(synthetic_customers(args.rows), feature_names), scaler)
+    engine = FastSVM.from_model(model)
+
+    # Parity against the pickled model
+    sample = X[:args.sklearn_rows]
+    reference = model.predict_proba(sample)
+    print(f"parity: max |FastSVM - predict_proba| = "
+          f"{np.abs(engine.predict_proba(sample) - reference).max():.2e}")
+
+    baseline = _rows_per_second(model, sample)
+    print(f"{'sklearn SVC':>28}: {baseline:>12,.0f} rows/sec")
+    exact = _rows_per_second(engine, X)
+    print(f"{'FastSVM (exact)':>28}: {exact:>12,.0f} rows/sec  ({exact / baseline:.1f}x)")
+
+    for keep in (0.5, 0.25, 0.1):
+        approx = engine.pruned(keep)
+        name = f"pruned {keep:.0%} ({approx.n_support} SVs)"
+        rate = _rows_per_second(approx, X)
+        delta = accuracy_delta(engine, approx, sample)
+        print(f"{name:>28}: {rate:>12,.0f} rows/sec  ({rate / baseline:.1f}x)  "
+              f"max |dp| {delta['max_abs_error']:.3f}  mean |dp| {delta['mean_abs_error']:.4f}  "
+              f"labels agree {delta['label_agreement']:.2%}")
+
+    pipeline = FeaturePipeline(scaler, feature_names)
+    for precision in REDUCED_PRECISIONS:
+        approx = reduced_engine(engine, pipeline, precision)
+        rate = _rows_per_second(approx, X)
+        delta = accuracy_delta(engine, approx, sample)
+        print(f"{precision:>28}: {rate:>12,.0f} rows/sec  ({rate / baseline:.1f}x)  "
+              f"max |dp| {delta['max_abs_error']:.3f}  mean |dp| {delta['mean_abs_error']:.4f}  "
+              f"labels agree {delta['label_agreement']:.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Parity and per-call cost of FeaturePipeline vs the DataFrame + scaler path.
+
+Usage:
+    python -m benchmarks.bench_features --rows 100000
+"""
+import argparse
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from churn_scoring.artifacts import load_artifacts
+from churn_scoring.encoding import encode_customers, scale_features
+from churn_scoring.pipeline import FeaturePipeline
+from churn_scoring.synthetic import synthetic_customers
+
+
+def form_records(customers):
+    """Raw records as the Streamlit form produces them (Yes/No selectboxes)"""
+    records = customers.to_dict('records')
+    for record in records:
+        record['HasCrCard'] = 'Yes' if record['HasCrCard'] else 'No'
+        record['IsActiveMember'] = 'Yes' if record['IsActiveMember'] else 'No'
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    _, scaler, feature_names = load_artifacts()
+    pipeline = FeaturePipeline(scaler, feature_names)
+    customers = synthetic_customers(args.rows)
+
+    # Batch parity: struct-of-arrays input vs encode + scale
+    reference = scale_features(encode_customers(customers, feature_names), scaler)
+    batch = pipeline.transform_columns({col: customers[col].to_numpy() for col in customers})
+    print(f"batch parity ({args.rows:,} rows): identical = {np.array_equal(batch, reference)}")
+
+    # Single-record parity with form-style values
+    records = form_records(customers.head(1000))
+    mismatches = sum(
+        not np.array_equal(pipeline.transform_record(record)[0], reference[i])
+        for i, record in enumerate(records)
+    )
+    print(f"record parity (1,000 records): mismatches = {mismatches}")
+
+    record = records[0]
+
+    def dataframe_path():
+        return scale_features(encode_customers(pd.DataFrame([record]), feature_names), scaler)
+
+    def pipeline_path():
+        return pipeline.transform_record(record)
+
+    for name, fn in (('DataFrame + scaler', dataframe_path), ('FeaturePipeline', pipeline_path)):
+        seconds = min(timeit.repeat(fn, number=1000, repeat=5)) / 1000
+        print(f"{name:>20}: {seconds * 1e6:8.1f} us per record")
+
+    columns = {col: customers[col].to_numpy() for col in customers}
+    for name, fn in (
+        ('DataFrame + scaler', lambda: scale_features(encode_customers(customers, feature_names), scaler)),
+        ('FeaturePipeline', lambda: pipeline.transform_columns(columns)),
+    ):
+        seconds = min(timeit.repeat(fn, number=3, repeat=3)) / 3
+        print(f"{name:>20}: {args.rows / seconds:12,.0f} rows/sec (batch)")
+
+
+if __name__ == '__main__':
+    main()
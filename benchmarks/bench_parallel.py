@@ -0,0 +1,47 @@
+"""Rows/sec of ParallelScorer at 1, 2, 4, 8 and 16 worker processes.
+
+Usage:
+    python -m benchmarks.bench_parallel --rows 200000 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+
+from churn_scoring.artifacts import load_artifacts
+from churn_scoring.fast_svm import FastSVM
+from churn_scoring.parallel import ParallelScorer
+from churn_scoring.pipeline import FeaturePipeline
+from churn_scoring.synthetic import synthetic_customers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    model, scaler, feature_names = load_artifacts()
+    pipeline = FeaturePipeline(scaler, feature_names)
+    X = pipeline.transform_columns(synthetic_customers(args.rows)).copy()
+    reference = FastSVM.from_model(model).predict_proba(X[:2000])[:, 1]
+
+    print(f"{os.cpu_count()} CPUs available, {args.rows:,} rows")
+    single = None
+    for n_workers in args.workers:
+        with ParallelScorer(n_workers) as scorer:
+            scorer.warm_up()
+            start = time.perf_counter()
+            churn = scorer.predict_proba(X)[:, 1]
+            rate = args.rows / (time.perf_counter() - start)
+        single = single or rate
+        parity = np.abs(churn[:2000] - reference).max()
+        print(f"{n_workers:>3} workers: {rate:>12,.0f} rows/sec  "
+              f"(speedup {rate / single:4.1f}x, max |dp| vs in-process {parity:.1e})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Per-request latency of predict_proba + predict vs the single-pass wrapper.
+
+Usage:
+    python -m benchmarks.bench_prediction --requests 500
+"""
+import argparse
+import statistics
+import time
+import warnings
+
+import numpy as np
+
+from churn_scoring.artifacts import load_artifacts
+from churn_scoring.encoding import encode_customers, scale_features
+from churn_scoring.prediction import predict_churn
+from churn_scoring.synthetic import synthetic_customers
+
+
+def _latencies(fn, rows):
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    model, scaler, feature_names = load_artifacts()
+    X = scale_features(encode_customers(synthetic_customers(args.requests), feature_names), scaler)
+    rows = [X[i:i + 1] for i in range(len(X))]
+
+    def two_pass(row):
+        return model.predict_proba(row)[0][1], model.predict(row)[0]
+
+    def single_pass(row):
+        return predict_churn(model, row)
+
+    # Warm up both paths before timing
+    _latencies(two_pass, rows[:20])
+    _latencies(single_pass, rows[:20])
+    baseline = _latencies(two_pass, rows)
+    wrapped = _latencies(single_pass, rows)
+
+    probabilities, labels = predict_churn(model, X)
+    reference = model.predict_proba(X)[:, 1]
+    print(f"max |probability - predict_proba|: {np.abs(probabilities - reference).max():.2e}")
+    print(f"predict() disagreeing with predict_proba() > 0.5: "
+          f"{int((model.predict(X) != (reference > 0.5)).sum())} of {len(X)}")
+
+    for name, times in (('predict_proba + predict', baseline), ('predict_churn', wrapped)):
+        ms = sorted(t * 1000 for t in times)
+        print(f"{name:>24}: p50 {statistics.median(ms):.3f} ms  "
+              f"p99 {ms[int(len(ms) * 0.99) - 1]:.3f} ms")
+    print(f"speedup (p50): {statistics.median(baseline) / statistics.median(wrapped):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
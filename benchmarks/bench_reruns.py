@@ -0,0 +1,234 @@
+"""Server CPU and rerun latency per interaction under concurrent sessions.
+
+Each app is started with ``streamlit run`` (headless) and driven by
+``--sessions`` simulated browsers over Streamlit's websocket protocol.
+Every session loads the page, then repeats its app's interaction scenario
+``--rounds`` times, all sessions performing each step of the scenario at
+once.  An interaction sends the widget's new state, scoped to the widget's
+fragment when it lives in one (as the browser does), and waits for the run
+to finish.
+
+Reported per app and interaction:
+
+* ``p50``/``p95``  time from sending the interaction to the end of the rerun
+* ``cpu``          server CPU (user + system, from /proc) spent on each
+                   step divided by the sessions that performed it
+
+To compare against an earlier version of an app, check it out somewhere
+else and pass its path; the scenario is picked by file name.
+
+Usage:
+    python -m benchmarks.bench_reruns --sessions 20 --rounds 5
+    python -m benchmarks.bench_reruns --apps /tmp/before/mobile_churn_app.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APPS = ['churn_app.py', 'mobile_churn_app.py', 'churn_prediction_app.py']
+
+# Interactions per app: (widget label, values cycled per round or None to click)
+SCENARIOS = {
+    'churn_app.py': [
+        ('🔮 Predict Churn Risk', None),
+    ],
+    'mobile_churn_app.py': [
+        ('Age', [55, 45]),
+        ('🎯 PREDICT CHURN RISK', None),
+        ('📞 Call', None),
+    ],
+    'churn_prediction_app.py': [
+        ('🔮 Predict Churn Risk', None),
+        ('⏱️ Show latency breakdown', [True, False]),
+    ],
+}
+
+_CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def _cpu_seconds(pid):
+    """User + system CPU time of process ``pid``"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class Session:
+    """One simulated browser tab"""
+
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+        # label -> (element type, widget id, fragment id)
+        self.widgets = {}
+        self.values = {}
+        self.errors = []
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=['streamlit'], max_size=None)
+        await self._rerun(None)
+
+    async def close(self):
+        await self.ws.close()
+
+    async def interact(self, label, value):
+        """Apply one interaction; returns its latency in seconds"""
+        kind, widget_id, fragment_id = self.widgets[label]
+        if value is not None:
+            self.values[label] = value
+        start = time.perf_counter()
+        await self._rerun(widget_id if value is None else None, fragment_id)
+        return time.perf_counter() - start
+
+    async def _rerun(self, trigger_id, fragment_id=''):
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.query_string = ''
+        client.page_script_hash = ''
+        client.fragment_id = fragment_id or ''
+        for label, value in self.values.items():
+            kind, widget_id, _ = self.widgets[label]
+            state = client.widget_states.widgets.add()
+            state.id = widget_id
+            if kind == 'checkbox':
+                state.bool_value = bool(value)
+            else:
+                state.double_array_value.data.append(value)
+        if trigger_id is not None:
+            state = client.widget_states.widgets.add()
+            state.id = trigger_id
+            state.trigger_value = True
+        await self.ws.send(msg.SerializeToString())
+        await self._read_until_finished()
+
+    async def _read_until_finished(self):
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof('type')
+            if kind == 'script_finished':
+                return
+            if kind != 'delta' or forward.delta.WhichOneof('type') != 'new_element':
+                continue
+            element = forward.delta.new_element
+            element_type = element.WhichOneof('type')
+            if element_type == 'exception':
+                self.errors.append(element.exception.message)
+                continue
+            widget = getattr(element, element_type)
+            label = getattr(widget, 'label', None)
+            widget_id = getattr(widget, 'id', None)
+            if label and widget_id:
+                self.widgets[label] = (element_type, widget_id, forward.delta.fragment_id)
+
+
+async def _run_sessions(url, pid, scenario, sessions, rounds):
+    """Per-interaction latencies and CPU seconds, plus errors the app raised"""
+    clients = [Session(url) for _ in range(sessions)]
+    await asyncio.gather(*(client.connect() for client in clients))
+    latencies = {label: [] for label, _ in scenario}
+    cpu = {label: [] for label, _ in scenario}
+
+    # Round 0 is unmeasured: it warms caches and records every widget's fragment
+    for round_no in range(rounds + 1):
+        for label, values in scenario:
+            value = None if values is None else values[round_no % len(values)]
+            cpu_start = _cpu_seconds(pid)
+            seconds = await asyncio.gather(*(client.interact(label, value)
+                                             for client in clients))
+            if round_no:
+                cpu[label].append((_cpu_seconds(pid) - cpu_start) / sessions)
+                latencies[label].extend(seconds)
+
+    errors = [error for client in clients for error in client.errors]
+    await asyncio.gather(*(client.close() for client in clients))
+    return latencies, cpu, errors
+
+
+def measure(app, sessions, rounds, env):
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', app, '--server.headless', 'true',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1)
+                break
+            except OSError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError(f"Streamlit did not start for {app}")
+                time.sleep(0.2)
+
+        scenario = SCENARIOS[os.path.basename(app)]
+        url = f'ws://127.0.0.1:{port}/_stcore/stream'
+
+        latencies, cpu, errors = asyncio.run(
+            _run_sessions(url, server.pid, scenario, sessions, rounds))
+    finally:
+        server.terminate()
+        server.wait()
+
+    if errors:
+        raise RuntimeError(f"{app} raised: {errors[0]}")
+    return {
+        label: {
+            'interactions': len(samples),
+            'cpu_ms': 1000 * statistics.mean(cpu[label]),
+            'p50_ms': 1000 * statistics.median(samples),
+            'p95_ms': 1000 * statistics.quantiles(samples, n=20)[-1],
+        }
+        for label, samples in latencies.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--apps', nargs='+', default=APPS)
+    parser.add_argument('--sessions', type=int, default=20,
+                        help="Concurrent browser sessions per app (default: %(default)s)")
+    parser.add_argument('--rounds', type=int, default=5,
+                        help="Scenario repetitions per session (default: %(default)s)")
+    parser.add_argument('--output', default=None, help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # Apps checked out elsewhere still import this tree's churn_scoring
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+
+    results = {}
+    for app in args.apps:
+        results[app] = measure(app, args.sessions, args.rounds, env)
+        print(f"{app} ({args.sessions} concurrent sessions):", flush=True)
+        for label, result in results[app].items():
+            print(f"  {label:>28}: server CPU {result['cpu_ms']:6.1f} ms  "
+                  f"rerun p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms",
+                  flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'sessions': args.sessions, 'rounds': args.rounds, 'results': results},
+                      f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Parity and throughput of the compiled rule tables vs the Python rules.
+
+Parity is checked on the representative of every bucket combination plus
+random customers that hit the thresholds exactly; tests/test_rules.py
+fails on any mismatch, this script only reports them next to the timings.
+
+Usage:
+    python -m benchmarks.bench_rules --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from churn_scoring.rule_engine import (
+    N_BUCKETS, RISK_FACTORS, bucket_index, compile_rules, desktop_rule, mobile_rule,
+    representative_records
+)
+from churn_scoring.synthetic import boundary_customers
+
+
+def _records(columns):
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*(columns[c].tolist() for c in names))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--parity-rows', type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    reps = list(representative_records())
+    rep_columns = {col: np.array([r[col] for r in reps]) for col in reps[0]}
+    assert np.array_equal(bucket_index(rep_columns), np.arange(N_BUCKETS))
+
+    parity_columns = boundary_customers(args.parity_rows, seed=1)
+    parity_records = _records(parity_columns)
+    expected_masks = np.array([
+        sum(1 << bit for bit, (_, predicate) in enumerate(RISK_FACTORS) if predicate(r))
+        for r in parity_records
+    ])
+
+    bulk = boundary_customers(args.rows)
+    bulk_records = _records({c: v[:100_000] for c, v in bulk.items()})
+    for name, rule in (('predict_churn_risk', desktop_rule), ('predict_churn_mobile', mobile_rule)):
+        compiled = compile_rules(rule)
+        for label, columns, records in (('buckets', rep_columns, reps),
+                                        ('boundary rows', parity_columns, parity_records)):
+            probabilities, labels, masks = compiled.score(columns)
+            expected = np.array([rule(r) for r in records])
+            mismatches = int((probabilities != expected).sum())
+            if label == 'boundary rows':
+                mismatches += int((masks != expected_masks).sum())
+            print(f"{name}: parity over {len(records):,} {label}: {mismatches} mismatches")
+
+        start = time.perf_counter()
+        for record in bulk_records:
+            rule(record)
+        python_rate = len(bulk_records) / (time.perf_counter() - start)
+        start = time.perf_counter()
+        compiled.score(bulk)
+        compiled_rate = args.rows / (time.perf_counter() - start)
+        print(f"{name}: Python {python_rate:,.0f} rows/sec, compiled {compiled_rate:,.0f} "
+              f"rows/sec ({compiled_rate / python_rate:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
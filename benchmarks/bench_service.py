@@ -0,0 +1,113 @@
+"""Load generator for the HTTP scoring service: p50/p99 latency and throughput.
+
+Starts ``python -m churn_scoring.service`` on a free local port (unless
+``--url`` points at a running instance) and drives it with concurrent
+keep-alive clients posting single-record /score requests.
+
+Usage:
+    python -m benchmarks.bench_service --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+from churn_scoring.synthetic import synthetic_customers
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_healthy(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urlopen(f"{url}/health", timeout=1) as response:
+                return json.load(response)
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Service at {url} did not become healthy")
+
+
+async def _client(host, port, bodies, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            writer.write(
+                f"POST /score HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def _run_load(url, concurrency, n_requests):
+    parts = urlsplit(url)
+    customers = synthetic_customers(min(n_requests, 10_000)).to_dict('records')
+    bodies = [json.dumps({k: (v.item() if hasattr(v, 'item') else v) for k, v in c.items()}).encode()
+              for c in customers]
+    per_client = [[bodies[(i * concurrency + c) % len(bodies)]
+                   for i in range(n_requests // concurrency)] for c in range(concurrency)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(parts.hostname, parts.port, b, latencies) for b in per_client))
+    return latencies, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=None, help="Benchmark an already running service")
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--max-latency-ms', type=float, default=2.0,
+                        help="Batching budget for the service started by the benchmark")
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        process = subprocess.Popen(
+            [sys.executable, '-W', 'ignore', '-m', 'churn_scoring.service',
+             '--port', str(port), '--max-latency-ms', str(args.max_latency_ms)],
+            stderr=subprocess.DEVNULL)
+    try:
+        _wait_until_healthy(url)
+        latencies, elapsed = asyncio.run(_run_load(url, args.concurrency, args.requests))
+        health = _wait_until_healthy(url)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    ms = sorted(t * 1000 for t in latencies)
+    print(f"requests: {len(ms):,}  concurrency: {args.concurrency}")
+    print(f"throughput: {len(ms) / elapsed:,.0f} req/sec")
+    print(f"latency p50: {statistics.median(ms):.2f} ms  p99: {ms[int(len(ms) * 0.99) - 1]:.2f} ms")
+    if health.get('batches'):
+        print(f"mean records per batch: {health['records'] / health['batches']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Startup time of the Streamlit apps: time to first paint and first prediction.
+
+Each measurement runs one app in a fresh interpreter with Streamlit's
+``AppTest`` harness, in both startup modes:
+
+* background  the default; artifacts load on a thread while the form renders
+* eager       ``$CHURN_EAGER_LOAD=1``; the first script run waits for the load
+
+``first_paint`` is the time from interpreter start until the first script run
+has rendered the form.  The probe then waits ``--think-time`` seconds (a
+user filling in the form) and submits it; ``prediction`` is the latency of
+that first submission and ``first_prediction`` the time from interpreter
+start until its result is on screen.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 3 --think-time 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APPS = ['churn_app.py', 'mobile_churn_app.py', 'churn_prediction_app.py']
+MODES = {'background': '0', 'eager': '1'}
+
+_PROBE = """
+import time
+t0 = time.perf_counter()
+import json, warnings
+warnings.filterwarnings('ignore')
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+t1 = time.perf_counter()
+assert not at.exception, at.exception
+time.sleep({think_time!r})
+t2 = time.perf_counter()
+next(b for b in at.button if 'PREDICT' in b.label.upper()).click()
+at.run()
+t3 = time.perf_counter()
+assert not at.exception and at.metric, at.exception
+print(json.dumps({{'first_paint': t1 - t0, 'prediction': t3 - t2,
+                   'first_prediction': t3 - t0 - {think_time!r}}}))
+"""
+
+
+def _probe(app, mode, runs, think_time, backend):
+    env = dict(os.environ, CHURN_EAGER_LOAD=MODES[mode])
+    if backend:
+        env['CHURN_SCORING_BACKEND'] = backend
+    code = _PROBE.format(app=os.path.abspath(app), think_time=think_time)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                             check=True, cwd=os.getcwd(), env=env)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--apps', nargs='+', default=APPS)
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help="Seconds between first paint and submitting the form")
+    parser.add_argument('--backend', default=None,
+                        help="Override every app's backend ($CHURN_SCORING_BACKEND)")
+    parser.add_argument('--output', default=None, help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for app in args.apps:
+        for mode in MODES:
+            timing = _probe(app, mode, args.runs, args.think_time, args.backend)
+            results[f"{app} [{mode}]"] = timing
+            print(f"{app:>24} {mode:>10}: first paint {timing['first_paint'] * 1000:7.1f} ms  "
+                  f"prediction {timing['prediction'] * 1000:7.1f} ms  "
+                  f"first prediction {timing['first_prediction'] * 1000:7.1f} ms", flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'think_time': args.think_time, 'backend': args.backend,
+                       'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Benchmark suite for every scoring path, with JSON results and baseline checks.
+
+Scorers timed on synthetic customers spanning the app input ranges:
+
+    predict_churn_risk    churn_app.py rules, one Python call per record
+    predict_churn_mobile  mobile_churn_app.py rules, one Python call per record
+    rules, rules_mobile   the same rules through the compiled lookup tables
+    svc                   churn_prediction_app.py's model: pipeline + sklearn SVC
+    fast_svm              the same model evaluated by FastSVM
+
+Each (scorer, batch size) case runs in a fresh subprocess, so its peak RSS
+is its own.  A case scores one batch repeatedly and reports rows/sec and
+per-batch latency percentiles.
+
+Record a baseline once, then compare later runs against it:
+
+    python -m benchmarks.bench_suite --output baseline.json
+    python -m benchmarks.bench_suite --baseline baseline.json
+
+The exit status is 1 when any case is slower than the baseline by more than
+``--tolerance`` (rows/sec or p50 latency).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from churn_scoring.synthetic import synthetic_customers
+
+SCORERS = ['predict_churn_risk', 'predict_churn_mobile', 'rules', 'rules_mobile',
+           'svc', 'fast_svm']
+DEFAULT_SIZES = [1, 100, 10_000, 1_000_000]
+DEFAULT_TOLERANCE = 0.2
+SEED = 42
+
+# Rows scored per case (before the repeat cap), so small batches get many samples
+TARGET_ROWS = 200_000
+MAX_REPEATS = 200
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _make_scorer(name, customers):
+    """Return fn() scoring ``customers`` (a DataFrame) with scorer ``name``"""
+    if name == 'predict_churn_risk':
+        from churn_scoring.rules import predict_churn_risk
+        records = customers.to_dict('records')
+        return lambda: [predict_churn_risk(record) for record in records]
+
+    if name == 'predict_churn_mobile':
+        from churn_scoring.rules import predict_churn_mobile
+        args = list(zip(customers['Age'].tolist(), customers['NumOfProducts'].tolist(),
+                        customers['Balance'].tolist(), (customers['IsActiveMember'] != 0).tolist(),
+                        customers['Geography'].tolist(), customers['CreditScore'].tolist(),
+                        customers['Gender'].tolist()))
+        return lambda: [predict_churn_mobile(*a) for a in args]
+
+    from churn_scoring.core import get_scorer
+    scorer = get_scorer(name)
+    columns = {col: customers[col].to_numpy() for col in customers.columns}
+    return lambda: scorer.score_columns(columns)
+
+
+def run_case(scorer_name, batch_size):
+    """Time one (scorer, batch size) case in this process"""
+    warnings.filterwarnings('ignore')
+    customers = synthetic_customers(batch_size, SEED)
+    rss_before = _peak_rss_mb()
+    fn = _make_scorer(scorer_name, customers)
+    fn()  # warm-up
+
+    repeats = max(1, min(MAX_REPEATS, TARGET_ROWS // batch_size))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    ms = np.array(times) * 1000
+    return {
+        'scorer': scorer_name,
+        'batch_size': batch_size,
+        'repeats': repeats,
+        'rows_per_sec': batch_size * repeats / sum(times),
+        'latency_ms': {
+            'mean': float(ms.mean()),
+            'p50': float(np.percentile(ms, 50)),
+            'p95': float(np.percentile(ms, 95)),
+            'p99': float(np.percentile(ms, 99)),
+        },
+        'rss_after_load_mb': rss_before,
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _run_subprocess(scorer_name, batch_size):
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_suite', '--case', scorer_name, str(batch_size)],
+        check=True, stdout=subprocess.PIPE, text=True)
+    return json.loads(out.stdout)
+
+
+def environment():
+    import sklearn
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': SEED,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return (scorer, batch_size, reason) for each case regressed beyond ``tolerance``"""
+    reference = {(r['scorer'], r['batch_size']): r for r in baseline['results']}
+    regressions = []
+    for r in results['results']:
+        base = reference.get((r['scorer'], r['batch_size']))
+        if base is None:
+            continue
+        ratio = r['rows_per_sec'] / base['rows_per_sec']
+        if ratio < 1 - tolerance:
+            regressions.append((r['scorer'], r['batch_size'],
+                                f"throughput {ratio:.0%} of baseline"))
+        p50_ratio = r['latency_ms']['p50'] / base['latency_ms']['p50']
+        if p50_ratio > 1 + tolerance:
+            regressions.append((r['scorer'], r['batch_size'],
+                                f"p50 latency {p50_ratio:.2f}x baseline"))
+    return regressions
+
+
+def _print_table(results, baseline):
+    reference = {(r['scorer'], r['batch_size']): r for r in (baseline or {}).get('results', [])}
+    print(f"{'scorer':>21} {'batch':>9} {'rows/sec':>13} {'p50 ms':>10} {'p95 ms':>10} "
+          f"{'p99 ms':>10} {'peak MB':>8}  vs baseline")
+    for r in results['results']:
+        base = reference.get((r['scorer'], r['batch_size']))
+        delta = f"{r['rows_per_sec'] / base['rows_per_sec']:.2f}x" if base else '-'
+        lat = r['latency_ms']
+        peak = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        print(f"{r['scorer']:>21} {r['batch_size']:>9,} {r['rows_per_sec']:>13,.0f} "
+              f"{lat['p50']:>10.3f} {lat['p95']:>10.3f} {lat['p99']:>10.3f} {peak:>8}  {delta}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scorers', nargs='+', choices=SCORERS, default=SCORERS)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--output', default='bench_results.json',
+                        help="Where to write the JSON results (default: %(default)s)")
+    parser.add_argument('--baseline', default=None,
+                        help="Earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown before a case counts as a regression")
+    parser.add_argument('--case', nargs=2, metavar=('SCORER', 'BATCH_SIZE'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]))))
+        return 0
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {'environment': environment(), 'results': []}
+    for scorer_name in args.scorers:
+        for batch_size in args.sizes:
+            print(f"running {scorer_name} x {batch_size:,}...", file=sys.stderr, flush=True)
+            results['results'].append(_run_subprocess(scorer_name, batch_size))
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    _print_table(results, baseline)
+    print(f"results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for scorer_name, batch_size, reason in regressions:
+            print(f"REGRESSION {scorer_name} x {batch_size:,}: {reason}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
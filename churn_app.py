@@ -1,7 +1,11 @@
 
 import streamlit as st
-import pandas as pd
-import numpy as np
+
+from churn_scoring.artifacts import load_metrics
+from churn_scoring.core import RISK_FACTOR_MESSAGES, configured_backend, get_scorer
+from churn_scoring.loader import BackgroundLoader
+from churn_scoring.prediction import TIER_IMMEDIATE, TIER_PROACTIVE
+from churn_scoring.store import ScoreStore, source_caption
 
 # Set page configuration
 st.set_page_config(
@@ -10,98 +14,91 @@ st.set_page_config(
     layout="wide"
 )
 
+# Shared scoring core; this app defaults to the desktop rule-based scorer.
+# It loads on a background thread so the form paints before any model is ready.
+@st.cache_resource
+def start_loading(backend):
+    return BackgroundLoader(lambda: get_scorer(backend))
+
+def wait_for_scorer():
+    if not loader.ready:
+        with st.spinner("Loading the churn model..."):
+            loader.result()
+    return loader.result()
+
+loader = start_loading(configured_backend('rules'))
+
+# Precomputed scores by customer ID, when $CHURN_SCORE_STORE names a built store.
+# Lookups only have the ID, so a score is as fresh as the store's last refresh.
+@st.cache_resource
+def load_store():
+    return ScoreStore.from_env()
+
+store = load_store()
+
+# Test-set metrics written by churn_scoring.train for the shipped artifacts;
+# None until the model is retrained here, when the original figures are shown
+metrics = load_metrics()
+accuracy_text = f"{metrics['test']['accuracy']:.0%}" if metrics else "85%"
+
 # App title and description
 st.title("🏦 Customer Churn Prediction Dashboard")
 st.markdown("Predict which customers are likely to leave and take proactive action!")
 
-# Simulated prediction function based on our analysis
-def predict_churn_risk(input_data):
-    """
-    Simulate churn prediction based on patterns we discovered:
-    - High risk: Older customers with 1 product, high balance, inactive, from Germany
-    """
-    risk_score = 0
-    
-    # Age factor (older = higher risk) - Our EDA showed this
-    if input_data['Age'] > 45:
-        risk_score += 0.3
-    elif input_data['Age'] > 35:
-        risk_score += 0.15
-    
-    # Number of products (1 product = highest risk) - Top feature from our analysis
-    if input_data['NumOfProducts'] == 1:
-        risk_score += 0.3
-    elif input_data['NumOfProducts'] == 2:
-        risk_score += 0.1
-    
-    # Balance (high balance = higher risk)
-    if input_data['Balance'] > 100000:
-        risk_score += 0.2
-    elif input_data['Balance'] > 50000:
-        risk_score += 0.1
-    
-    # Active status (inactive = higher risk)
-    if input_data['IsActiveMember'] == 0:
-        risk_score += 0.2
-    
-    # Geography (Germany = highest risk) - Our EDA showed 32% churn in Germany
-    if input_data['Geography'] == 'Germany':
-        risk_score += 0.3
-    elif input_data['Geography'] == 'Spain':
-        risk_score += 0.1
-    
-    # Credit score (lower = higher risk)
-    if input_data['CreditScore'] < 500:
-        risk_score += 0.2
-    elif input_data['CreditScore'] < 650:
-        risk_score += 0.1
-    
-    # Gender (Female = higher risk) - Our EDA showed 25% vs 16%
-    if input_data['Gender'] == 'Female':
-        risk_score += 0.1
-    
-    # Ensure score is between 0 and 1
-    churn_probability = min(0.95, max(0.05, risk_score))
-    
-    return churn_probability, churn_probability > 0.5
-
 # Sidebar for user input
 st.sidebar.header("📋 Customer Information")
 
-# Create input form
-with st.form("customer_input_form"):
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Demographic Information")
-        age = st.slider("Age", 18, 92, 40)
-        gender = st.selectbox("Gender", ["Female", "Male"])
+# The prediction panel is a fragment: submitting the form reruns only the form
+# and results, not the sidebar.  The last result lives in session state, so
+# a full rerun (e.g. a lookup) redraws it without scoring again.
+
+# Existing customers are served from the score store
+if store is not None:
+    with st.sidebar.form("customer_lookup_form"):
+        customer_id = st.text_input("Customer ID")
+        looked_up = st.form_submit_button("🔎 Look Up Customer")
+    if looked_up and customer_id.strip():
+        lookup_result = store.lookup(customer_id.strip(), wait_for_scorer())
+        if lookup_result is None:
+            st.sidebar.error(f"No stored score for customer {customer_id.strip()}")
+        else:
+            st.session_state.result = lookup_result
+
+def customer_form():
+    """Input form; returns the entered record once it is submitted, else None"""
+    with st.form("customer_input_form"):
+        col1, col2 = st.columns(2)
         
-    with col2:
-        st.subheader("Financial Information")
-        credit_score = st.slider("Credit Score", 350, 850, 650)
-        balance = st.number_input("Account Balance ($)", 0.0, 300000.0, 50000.0)
-        estimated_salary = st.number_input("Estimated Salary ($)", 0.0, 250000.0, 75000.0)
-        has_cr_card = st.selectbox("Has Credit Card?", ["No", "Yes"])
-    
-    col3, col4 = st.columns(2)
-    
-    with col3:
-        st.subheader("Account Information")
-        tenure = st.slider("Tenure (Years with Company)", 0, 10, 5)
-        num_products = st.slider("Number of Products", 1, 4, 1)
-        is_active_member = st.selectbox("Is Active Member?", ["No", "Yes"])
-    
-    with col4:
-        st.subheader("Geographic Information")
-        geography = st.selectbox("Country", ["France", "Germany", "Spain"])
+        with col1:
+            st.subheader("Demographic Information")
+            age = st.slider("Age", 18, 92, 40)
+            gender = st.selectbox("Gender", ["Female", "Male"])
+            
+        with col2:
+            st.subheader("Financial Information")
+            credit_score = st.slider("Credit Score", 350, 850, 650)
+            balance = st.number_input("Account Balance ($)", 0.0, 300000.0, 50000.0)
+            estimated_salary = st.number_input("Estimated Salary ($)", 0.0, 250000.0, 75000.0)
+            has_cr_card = st.selectbox("Has Credit Card?", ["No", "Yes"])
+        
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            st.subheader("Account Information")
+            tenure = st.slider("Tenure (Years with Company)", 0, 10, 5)
+            num_products = st.slider("Number of Products", 1, 4, 1)
+            is_active_member = st.selectbox("Is Active Member?", ["No", "Yes"])
+        
+        with col4:
+            st.subheader("Geographic Information")
+            geography = st.selectbox("Country", ["France", "Germany", "Spain"])
+        
+        submitted = st.form_submit_button("🔮 Predict Churn Risk")
     
-    submitted = st.form_submit_button("🔮 Predict Churn Risk")
-
-# Process input and make prediction
-if submitted:
+    if not submitted:
+        return None
     # Prepare input data
-    input_data = {
+    return {
         'Age': age,
         'NumOfProducts': num_products,
         'Balance': balance,
@@ -113,12 +110,16 @@ if submitted:
         'HasCrCard': 1 if has_cr_card == "Yes" else 0,
         'EstimatedSalary': estimated_salary
     }
-    
-    # Make prediction
-    churn_probability, will_churn = predict_churn_risk(input_data)
+
+def show_results(result):
+    churn_probability = result['probability']
+    will_churn = result['prediction'] == 1
     
     # Display results
     st.success("✅ Prediction Complete!")
+    if 'customer_id' in result:
+        # Looked-up customer: stored score, or live if it was out of date
+        st.caption(f"Customer {result['customer_id']}: {source_caption(result)}")
     
     # Create results columns
     result_col1, result_col2 = st.columns(2)
@@ -134,27 +135,17 @@ if submitted:
         
         if will_churn:
             st.error(f"🚨 HIGH RISK: This customer is likely to churn!")
-            st.write("**Prediction Confidence:** 85% (based on SVM model performance)")
+            st.write(f"**Prediction Confidence:** {accuracy_text} (based on SVM model performance)")
         else:
             st.success(f"✅ LOW RISK: This customer is likely to stay!")
-            st.write("**Prediction Confidence:** 85% (based on SVM model performance)")
+            st.write(f"**Prediction Confidence:** {accuracy_text} (based on SVM model performance)")
     
     with result_col2:
         st.subheader("Key Risk Factors")
-        risk_factors = []
-        
-        if age > 45:
-            risk_factors.append("👴 Older customer (higher churn risk)")
-        if num_products == 1:
-            risk_factors.append("📦 Only one product (highest churn risk)")
-        if balance > 100000:
-            risk_factors.append("💰 High balance (increased churn risk)")
-        if is_active_member == "No":
-            risk_factors.append("💤 Inactive member (higher churn risk)")
-        if geography == "Germany":
-            risk_factors.append("🇩🇪 German customer (32% churn rate)")
-        if gender == "Female":
-            risk_factors.append("👩 Female customer (25% churn rate)")
+        risk_factors = [
+            f"{title} ({reason})"
+            for title, reason in (RISK_FACTOR_MESSAGES[name] for name in result['risk_factors'])
+        ]
         
         if risk_factors:
             for factor in risk_factors:
@@ -165,13 +156,13 @@ if submitted:
     # Recommendation section
     st.subheader("🎯 Retention Recommendations")
     
-    if churn_probability > 0.7:
+    if result['risk_tier'] == TIER_IMMEDIATE:
         st.error("**🚨 IMMEDIATE ACTION REQUIRED:**")
         st.write("• Personal retention call from account manager")
         st.write("• Special loyalty offer or discount")
         st.write("• Product bundle upgrade opportunity")
         st.write("• Priority customer service handling")
-    elif churn_probability > 0.5:
+    elif result['risk_tier'] == TIER_PROACTIVE:
         st.warning("**⚠️ PROACTIVE ENGAGEMENT NEEDED:**")
         st.write("• Targeted email campaign")
         st.write("• Customer satisfaction survey")
@@ -183,17 +174,37 @@ if submitted:
         st.write("• Monitor for changes in behavior")
         st.write("• Maintain excellent service quality")
 
+@st.fragment
+def prediction_panel():
+    input_data = customer_form()
+    if input_data is not None:
+        # Make prediction
+        st.session_state.result = wait_for_scorer().score([input_data])[0]
+    if st.session_state.get('result') is not None:
+        show_results(st.session_state.result)
+
+prediction_panel()
+
 # Add sidebar information
 st.sidebar.markdown("---")
 st.sidebar.subheader("About This App")
+customers_text = f"{metrics['customers']:,}" if metrics else "10,000+"
 st.sidebar.info(
     "This churn prediction model is based on machine learning analysis of "
-    "10,000+ customer records. The model achieves 85% accuracy in predicting "
-    "customer churn using patterns discovered during data analysis."
+    f"{customers_text} customer records. The model achieves {accuracy_text} accuracy in "
+    "predicting customer churn using patterns discovered during data analysis."
 )
 
 st.sidebar.subheader("📊 Model Performance")
-st.sidebar.write("""
+if metrics:
+    st.sidebar.write(f"""
+- **Accuracy**: {metrics['test']['accuracy']:.0%}
+- **Recall**: {metrics['test']['recall']:.0%} (share of churners caught)
+- **ROC-AUC**: {metrics['test']['roc_auc']:.3f}
+- **Training Data**: {metrics['train_rows']:,} customers ({metrics['test_rows']:,} held out for testing)
+""")
+else:
+    st.sidebar.write("""
 - **Accuracy**: 85%
 - **Recall**: 74% (catches most churners)
 - **ROC-AUC**: 0.858
@@ -1,10 +1,26 @@
 
+import os
+import tempfile
+import time
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
-import pickle
-from sklearn.preprocessing import StandardScaler
+
+# pandas and sklearn are only imported once a result needs them (see load_resources)
+from churn_scoring import PredictionCache
+from churn_scoring.artifacts import load_metrics
+from churn_scoring.core import RISK_FACTOR_MESSAGES, configured_backend
+from churn_scoring.loader import BackgroundLoader
+from churn_scoring.registry import DEFAULT_POLL_INTERVAL, ModelRegistry
+from churn_scoring.metrics import METRICS, serve_metrics_from_env
+from churn_scoring.explain import SVMExplainer
+from churn_scoring.whatif import WhatIfSweep
+from churn_scoring.prediction import TIER_IMMEDIATE, TIER_PROACTIVE
+from churn_scoring.store import ScoreStore, source_caption
+from churn_scoring.shadow import ShadowRunner
+
+# Whole-script timing for the latency panel; exporter runs if $CHURN_METRICS_PORT is set
+rerun_start = time.perf_counter()
+serve_metrics_from_env()
 
 # Set page configuration
 st.set_page_config(
@@ -13,16 +29,70 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load model and preprocessing objects
+# Shared scoring core (compiled SVM by default); every model version gets its
+# own prediction cache, what-if sweep and Shapley explainer (rule backends
+# keep their fixed factor list)
+def prepare_model(scorer):
+    # Prediction cache keyed on the encoded feature vector, scoped to the model version
+    scorer.cache = PredictionCache.from_env(
+        encoder=getattr(scorer.backend, 'pipeline', None),
+        model_version=scorer.backend.version
+    )
+    explainer = None
+    if getattr(scorer.backend, 'pipeline', None) is not None:
+        explainer = SVMExplainer(scorer.backend.model, scorer.backend.pipeline)
+    return WhatIfSweep(scorer), explainer
+
+# The model registry loads on a background thread so the form paints
+# immediately, then swaps in retrained artifacts without a restart
 @st.cache_resource
-def load_model():
-    model = joblib.load('churn_prediction_model.pkl')
-    scaler = joblib.load('feature_scaler.pkl')
-    with open('feature_names.pkl', 'rb') as f:
-        feature_names = pickle.load(f)
-    return model, scaler, feature_names
+def start_loading(backend):
+    return BackgroundLoader(
+        lambda: ModelRegistry(backend, prepare=prepare_model).start(DEFAULT_POLL_INTERVAL))
 
-model, scaler, feature_names = load_model()
+def wait_for_model():
+    """Active model version; only a very early first prediction waits"""
+    if not loader.ready:
+        with st.spinner("Loading the churn model..."):
+            loader.result()
+    return loader.result().active
+
+# Precomputed scores by customer ID, when $CHURN_SCORE_STORE names a built store.
+# Lookups only have the ID, so a score is as fresh as the store's last refresh.
+@st.cache_resource
+def load_store():
+    return ScoreStore.from_env()
+
+# Backends listed in $CHURN_SHADOW_BACKENDS score every prediction in the
+# background for comparison; they never change what the user sees
+@st.cache_resource
+def load_shadow_runner():
+    return ShadowRunner.from_env()
+
+def live_scorer(model):
+    if shadow_runner is None:
+        return model.scorer
+    return shadow_runner.wrap(model.scorer)
+
+loader = start_loading(configured_backend('fast_svm'))
+store = load_store()
+shadow_runner = load_shadow_runner()
+
+# Attributions below this size (probability points) are not listed
+MIN_CONTRIBUTION = 0.01
+
+def format_field_value(field, value):
+    if field in ('Balance', 'EstimatedSalary'):
+        return f"${value:,.0f}"
+    return f"{value}"
+
+# Labels for the what-if changes
+WHATIF_LABELS = {
+    'NumOfProducts': lambda v: f"Products → {v}",
+    'IsActiveMember': lambda v: f"Active member → {'Yes' if v else 'No'}",
+    'Tenure': lambda v: f"Tenure → {v} years",
+    'Balance': lambda v: f"Balance → ${v:,.0f}",
+}
 
 # App title and description
 st.title("🏦 Customer Churn Prediction Dashboard")
@@ -31,68 +101,103 @@ st.markdown("Predict which customers are likely to leave and take proactive acti
 # Sidebar for user input
 st.sidebar.header("📋 Customer Information")
 
-# Create input form
-with st.form("customer_input_form"):
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("Demographic Information")
-        age = st.slider("Age", 18, 92, 40)
-        gender = st.selectbox("Gender", ["Female", "Male"])
+# The prediction, batch scoring, model and latency panels are fragments: a
+# widget inside one reruns only that panel, not the sidebar or the model
+# lookup.  A prediction's scores, attributions and what-if sweep are computed
+# once and kept in session state, so a full rerun only redraws them.
+
+def analyse(model, result, input_data):
+    """Everything the results panel shows for one scored customer"""
+    whatif, explainer = model.extras
+    contributions = None
+    if explainer is not None:
+        # What this customer's own fields contributed, vs an average customer
+        contributions = explainer.explain_record(input_data)
+    _, whatif_rows = whatif.sweep(input_data)
+    return {
+        'result': result,
+        'contributions': contributions,
+        'whatif_rows': whatif_rows,
+    }
+
+# Existing customers are served from the score store
+if store is not None:
+    with st.sidebar.form("customer_lookup_form"):
+        customer_id = st.text_input("Customer ID")
+        looked_up = st.form_submit_button("🔎 Look Up Customer")
+    if looked_up and customer_id.strip():
+        # One model version serves this whole result, even if a swap happens meanwhile
+        model = wait_for_model()
+        lookup_result = store.lookup(customer_id.strip(), model.scorer)
+        if lookup_result is None:
+            st.sidebar.error(f"No stored score for customer {customer_id.strip()}")
+        else:
+            # Looked-up customer: stored score, or live if it was out of date
+            input_data = dict(lookup_result['record'])
+            for field in ('HasCrCard', 'IsActiveMember'):
+                input_data[field] = "Yes" if input_data[field] else "No"
+            st.session_state.prediction = analyse(model, lookup_result, input_data)
+
+def customer_form():
+    """Input form; returns the entered record once it is submitted, else None"""
+    with st.form("customer_input_form"):
+        col1, col2 = st.columns(2)
         
-    with col2:
-        st.subheader("Financial Information")
-        credit_score = st.slider("Credit Score", 350, 850, 650)
-        balance = st.number_input("Account Balance ($)", 0.0, 300000.0, 50000.0)
-        estimated_salary = st.number_input("Estimated Salary ($)", 0.0, 250000.0, 75000.0)
-        has_cr_card = st.selectbox("Has Credit Card?", ["No", "Yes"])
-    
-    col3, col4 = st.columns(2)
-    
-    with col3:
-        st.subheader("Account Information")
-        tenure = st.slider("Tenure (Years with Company)", 0, 10, 5)
-        num_products = st.slider("Number of Products", 1, 4, 1)
-        is_active_member = st.selectbox("Is Active Member?", ["No", "Yes"])
-    
-    with col4:
-        st.subheader("Geographic Information")
-        geography = st.selectbox("Country", ["France", "Germany", "Spain"])
+        with col1:
+            st.subheader("Demographic Information")
+            age = st.slider("Age", 18, 92, 40)
+            gender = st.selectbox("Gender", ["Female", "Male"])
+            
+        with col2:
+            st.subheader("Financial Information")
+            credit_score = st.slider("Credit Score", 350, 850, 650)
+            balance = st.number_input("Account Balance ($)", 0.0, 300000.0, 50000.0)
+            estimated_salary = st.number_input("Estimated Salary ($)", 0.0, 250000.0, 75000.0)
+            has_cr_card = st.selectbox("Has Credit Card?", ["No", "Yes"])
+        
+        col3, col4 = st.columns(2)
+        
+        with col3:
+            st.subheader("Account Information")
+            tenure = st.slider("Tenure (Years with Company)", 0, 10, 5)
+            num_products = st.slider("Number of Products", 1, 4, 1)
+            is_active_member = st.selectbox("Is Active Member?", ["No", "Yes"])
+        
+        with col4:
+            st.subheader("Geographic Information")
+            geography = st.selectbox("Country", ["France", "Germany", "Spain"])
+        
+        submitted = st.form_submit_button("🔮 Predict Churn Risk")
     
-    submitted = st.form_submit_button("🔮 Predict Churn Risk")
-
-# Process input and make prediction
-if submitted:
-    # Create input dataframe
-    input_data = {
+    if not submitted:
+        return None
+    # Raw customer record; the pipeline encodes and scales it in one pass
+    return {
         'CreditScore': credit_score,
-        'Gender': 0 if gender == "Female" else 1,
+        'Gender': gender,
         'Age': age,
         'Tenure': tenure,
         'Balance': balance,
         'NumOfProducts': num_products,
-        'HasCrCard': 1 if has_cr_card == "Yes" else 0,
-        'IsActiveMember': 1 if is_active_member == "Yes" else 0,
+        'HasCrCard': has_cr_card,
+        'IsActiveMember': is_active_member,
         'EstimatedSalary': estimated_salary,
-        'Geo_France': 1 if geography == "France" else 0,
-        'Geo_Germany': 1 if geography == "Germany" else 0,
-        'Geo_Spain': 1 if geography == "Spain" else 0
+        'Geography': geography
     }
+
+def show_results(prediction):
+    import pandas as pd
     
-    input_df = pd.DataFrame([input_data])
-    
-    # Ensure correct column order
-    input_df = input_df[feature_names]
-    
-    # Scale features
-    input_scaled = scaler.transform(input_df)
-    
-    # Make prediction
-    churn_probability = model.predict_proba(input_scaled)[0][1]
-    churn_prediction = model.predict(input_scaled)[0]
+    result = prediction['result']
+    contributions = prediction['contributions']
+    churn_probability = result['probability']
+    churn_prediction = result['prediction']
     
     # Display results
     st.success("✅ Prediction Complete!")
+    if 'customer_id' in result:
+        st.caption(f"Customer {result['customer_id']}: {source_caption(result)}")
+    st.caption(f"Model version {result['model_version']}")
     
     # Create results columns
     result_col1, result_col2 = st.columns(2)
@@ -119,35 +224,44 @@ if submitted:
     with result_col2:
         st.subheader("Key Risk Factors")
         
-        # Display top risk factors based on input
-        risk_factors = []
-        
-        if age > 45:
-            risk_factors.append("👴 Older customer (higher churn risk)")
-        if num_products == 1:
-            risk_factors.append("📦 Only one product (higher churn risk)")
-        if balance > 100000:
-            risk_factors.append("💰 High balance (increased churn risk)")
-        if is_active_member == "No":
-            risk_factors.append("💤 Inactive member (higher churn risk)")
-        if geography == "Germany":
-            risk_factors.append("🇩🇪 German customer (higher churn rate)")
+        protective_factors = []
+        if contributions is not None:
+            risk_factors = [
+                f"{c['label']} {format_field_value(c['field'], c['value'])}: "
+                f"+{100 * c['contribution']:.1f} pts churn risk"
+                for c in contributions if c['contribution'] >= MIN_CONTRIBUTION
+            ]
+            protective_factors = [
+                f"{c['label']} {format_field_value(c['field'], c['value'])}: "
+                f"{100 * c['contribution']:.1f} pts churn risk"
+                for c in contributions if c['contribution'] <= -MIN_CONTRIBUTION
+            ][:3]
+        else:
+            # Risk factors reported by the scoring core
+            risk_factors = [
+                f"{title} ({reason})"
+                for title, reason in (RISK_FACTOR_MESSAGES[name] for name in result['risk_factors'])
+            ]
         
         if risk_factors:
             for factor in risk_factors:
                 st.warning(factor)
         else:
             st.info("🎉 No major risk factors identified!")
+        for factor in protective_factors:
+            st.success(factor)
+        if contributions is not None:
+            st.caption("Exact Shapley contributions of each field, relative to an average customer.")
     
     # Recommendation section
     st.subheader("🎯 Retention Recommendations")
     
-    if churn_probability > 0.7:
+    if result['risk_tier'] == TIER_IMMEDIATE:
         st.error("**Immediate Action Required:**")
         st.write("- Personal retention call from account manager")
         st.write("- Special loyalty offer or discount")
         st.write("- Product bundle upgrade opportunity")
-    elif churn_probability > 0.5:
+    elif result['risk_tier'] == TIER_PROACTIVE:
         st.warning("**Proactive Engagement Needed:**")
         st.write("- Targeted email campaign")
         st.write("- Customer satisfaction survey")
@@ -157,15 +271,166 @@ if submitted:
         st.write("- Continue regular engagement")
         st.write("- Monitor for changes in behavior")
         st.write("- Maintain excellent service quality")
+    
+    # What-if analysis: every single change scored in one vectorized call
+    st.subheader("🔀 What-If Analysis")
+    st.markdown("How churn risk would change if one thing about this customer changed:")
+    whatif_df = pd.DataFrame([
+        {
+            "Change": WHATIF_LABELS[row['field']](row['value']),
+            "Churn Probability": f"{row['probability']:.1%}",
+            "Risk Change (pts)": round(100 * row['delta'], 1),
+        }
+        for row in prediction['whatif_rows'] if not row['current']
+    ]).sort_values("Risk Change (pts)")
+    
+    whatif_col1, whatif_col2 = st.columns(2)
+    with whatif_col1:
+        st.dataframe(whatif_df, hide_index=True)
+    with whatif_col2:
+        st.bar_chart(whatif_df.set_index("Change")["Risk Change (pts)"])
+
+# Process input and make prediction
+@st.fragment
+def prediction_panel():
+    panel_start = time.perf_counter()
+    input_data = customer_form()
+    if input_data is not None:
+        model = wait_for_model()
+        # Make prediction, reusing the result for a profile that was already scored
+        result = live_scorer(model).score_record(input_data)
+        st.session_state.prediction = analyse(model, result, input_data)
+    if st.session_state.get('prediction') is not None:
+        show_results(st.session_state.prediction)
+    METRICS.observe("rerun_prediction_panel", time.perf_counter() - panel_start)
+
+prediction_panel()
+
+# Batch scoring section
+@st.fragment
+def batch_scoring_panel():
+    st.markdown("---")
+    st.subheader("📁 Batch Scoring")
+    st.markdown("Upload a CSV or Parquet file of customer records to score the whole file at once.")
+    
+    with st.expander("Expected columns"):
+        st.write(
+            "CreditScore, Geography, Gender, Age, Tenure, Balance, NumOfProducts, "
+            "HasCrCard, IsActiveMember, EstimatedSalary. Any other columns (e.g. "
+            "CustomerId) are passed through to the output."
+        )
+    
+    uploaded_file = st.file_uploader("Customer file", type=["csv", "parquet"])
+    
+    if uploaded_file is not None and st.button("📊 Score File"):
+        suffix = ".parquet" if uploaded_file.name.lower().endswith(".parquet") else ".csv"
+        # Stream the scored chunks to disk instead of building the result in memory
+        output_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        output_file.close()
+        try:
+            from churn_scoring.batch import score_file_with
+            
+            with st.spinner("Scoring customers..."):
+                rows = score_file_with(uploaded_file, output_file.name,
+                                       live_scorer(wait_for_model()))
+            st.success(f"✅ Scored {rows:,} customers!")
+            with open(output_file.name, "rb") as f:
+                st.download_button(
+                    "⬇️ Download Scored File",
+                    data=f,
+                    file_name=f"scored_{os.path.splitext(uploaded_file.name)[0]}{suffix}",
+                    mime="text/csv" if suffix == ".csv" else "application/octet-stream"
+                )
+        except ValueError as e:
+            st.error(f"Could not score file: {e}")
+        finally:
+            os.remove(output_file.name)
+
+batch_scoring_panel()
 
 # Add sidebar information
 st.sidebar.markdown("---")
 st.sidebar.subheader("About This App")
-st.sidebar.info(
-    "This churn prediction model uses machine learning to identify "
-    "customers at risk of leaving. The model was trained on historical "
-    "customer data and achieves 85% accuracy in predicting churn."
-)
+# Metrics written by churn_scoring.train for the active version, if it was trained here
+def active_metrics():
+    if not loader.ready:
+        return None
+    registry = loader.result()
+    return load_metrics(registry.artifact_dir, registry.active.version)
+
+metrics = active_metrics()
+if metrics:
+    st.sidebar.info(
+        "This churn prediction model uses machine learning to identify "
+        "customers at risk of leaving. On customers held out from training it "
+        f"achieves {metrics['test']['accuracy']:.0%} accuracy, catches "
+        f"{metrics['test']['recall']:.0%} of churners and has a ROC-AUC of "
+        f"{metrics['test']['roc_auc']:.3f}."
+    )
+else:
+    st.sidebar.info(
+        "This churn prediction model uses machine learning to identify "
+        "customers at risk of leaving. The model was trained on historical "
+        "customer data and achieves 85% accuracy in predicting churn."
+    )
+
+# Sidebar panels below refresh on full reruns or when their own widgets change
+@st.fragment
+def model_panel():
+    if not loader.ready:
+        st.caption("⏳ Loading the churn model in the background...")
+        return
+    registry = loader.result()
+    metrics = active_metrics()
+    cache_stats = registry.active.scorer.cache.stats()
+    st.caption(
+        f"⚡ Prediction cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"({cache_stats['size']} profiles cached)"
+    )
+    # Retrained models are swapped in automatically; earlier ones stay loaded
+    with st.expander(f"🧠 Model version {registry.active.version}"):
+        if metrics:
+            st.caption(
+                f"Trained on {metrics['train_rows']:,} customers from {metrics['data']} "
+                f"({metrics['trained_at'][:10]}), tested on {metrics['test_rows']:,}: "
+                f"precision {metrics['test']['precision']:.0%}, F1 {metrics['test']['f1']:.2f}. "
+                f"C={metrics['params']['C']}, gamma={metrics['params']['gamma']}, "
+                f"class_weight={metrics['params']['class_weight']}"
+            )
+        previous = [v['version'] for v in registry.versions() if not v['active']]
+        if previous:
+            rollback_version = st.selectbox("Previous versions", previous)
+            if st.button("↩️ Switch Model Version"):
+                registry.rollback(rollback_version)
+                st.rerun()
+        else:
+            st.caption("No previous versions loaded yet.")
+
+with st.sidebar:
+    model_panel()
+if store is not None:
+    store_stats = store.stats()
+    st.sidebar.caption(
+        f"🗄️ Score store: {store_stats['store_hits']} served, "
+        f"{store_stats['live_scores']} re-scored live"
+    )
+
+if shadow_runner is not None:
+    with st.sidebar.expander("🕵️ Shadow comparison"):
+        shadow_report = shadow_runner.report()
+        if shadow_report[0]['calls']:
+            import pandas as pd
+            
+            st.dataframe(
+                pd.DataFrame(shadow_report).set_index("scorer")[
+                    ["calls", "label_agreement", "tier_agreement", "mean_abs_diff",
+                     "calibration_gap", "p50_ms"]
+                ].round(3)
+            )
+            counters = shadow_runner.counters()
+            st.caption(f"{counters['dropped']} batches skipped under load")
+        else:
+            st.caption("Comparisons appear after the next prediction.")
 
 st.sidebar.subheader("Top Churn Drivers")
 st.sidebar.write("""
@@ -174,3 +439,28 @@ st.sidebar.write("""
 - 🟠 Account Balance
 - 🟠 Active Member Status
 """)
+
+# Optional per-stage latency breakdown (recent reruns and predictions).
+# Showing it is a per-session choice; collection is process-wide and only
+# switched on by $CHURN_METRICS, so one session cannot toggle it for others.
+@st.fragment
+def latency_panel():
+    if st.checkbox("⏱️ Show latency breakdown", key="show_latency"):
+        if not METRICS.enabled:
+            st.caption("Latency collection is off; start the app with CHURN_METRICS=1.")
+            return
+        latency = METRICS.summary()
+        if latency:
+            import pandas as pd
+            
+            st.dataframe(
+                pd.DataFrame(latency).set_index("stage")[["count", "p50_ms", "p95_ms", "p99_ms"]].round(3)
+            )
+        else:
+            st.caption("Timings appear after the next prediction.")
+
+st.sidebar.markdown("---")
+with st.sidebar:
+    latency_panel()
+
+METRICS.observe("rerun", time.perf_counter() - rerun_start)
@@ -0,0 +1,40 @@
+"""Shared, Streamlit-free scoring code used by the churn apps.
+
+Names are re-exported lazily so that importing one submodule (for example
+``churn_scoring.bundle`` in a freshly started worker) does not pull in
+pandas, joblib or sklearn.
+"""
+import importlib
+
+_EXPORTS = {
+    'load_artifacts': 'churn_scoring.artifacts',
+    'artifact_version': 'churn_scoring.artifacts',
+    'encode_customers': 'churn_scoring.encoding',
+    'scale_features': 'churn_scoring.encoding',
+    'FastSVM': 'churn_scoring.fast_svm',
+    'FeaturePipeline': 'churn_scoring.pipeline',
+    'predict_churn': 'churn_scoring.prediction',
+    'risk_tier': 'churn_scoring.prediction',
+    'score_file': 'churn_scoring.batch',
+    'ParallelScorer': 'churn_scoring.parallel',
+    'load_bundle': 'churn_scoring.bundle',
+    'export_bundle': 'churn_scoring.bundle',
+    'PredictionCache': 'churn_scoring.cache',
+    'ChurnScorer': 'churn_scoring.core',
+    'get_scorer': 'churn_scoring.core',
+    'score': 'churn_scoring.core',
+    'SVMExplainer': 'churn_scoring.explain',
+    'DriftMonitor': 'churn_scoring.drift',
+    'ModelRegistry': 'churn_scoring.registry',
+    'ShadowRunner': 'churn_scoring.shadow',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'churn_scoring' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
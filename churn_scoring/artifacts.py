@@ -0,0 +1,75 @@
+"""Loading of the trained model artifacts shipped with the apps."""
+import hashlib
+import json
+import os
+import pickle
+
+# Artifacts live next to the Streamlit apps in the repository root
+ARTIFACT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_FILE = 'churn_prediction_model.pkl'
+SCALER_FILE = 'feature_scaler.pkl'
+FEATURE_NAMES_FILE = 'feature_names.pkl'
+# Written by churn_scoring.train next to the artifacts it produced
+METRICS_FILE = 'metrics.json'
+
+# artifact_dir -> (file fingerprint, version) of the last hashed artifacts
+_versions = {}
+
+
+def load_artifacts(artifact_dir=ARTIFACT_DIR):
+    """Load the SVC model, the feature scaler and the model's feature order"""
+    # Imported here so bundle-only processes never load joblib
+    import joblib
+
+    model = joblib.load(os.path.join(artifact_dir, MODEL_FILE))
+    scaler = joblib.load(os.path.join(artifact_dir, SCALER_FILE))
+    with open(os.path.join(artifact_dir, FEATURE_NAMES_FILE), 'rb') as f:
+        feature_names = pickle.load(f)
+    return model, scaler, feature_names
+
+
+def load_metrics(artifact_dir=ARTIFACT_DIR, version=None):
+    """Evaluation metrics written by churn_scoring.train for model ``version``.
+
+    ``version`` defaults to the current artifacts.  Returns None when there
+    is no metrics file or it describes a different model, e.g. artifacts
+    copied in by hand after training.
+    """
+    try:
+        with open(os.path.join(artifact_dir, METRICS_FILE)) as f:
+            metrics = json.load(f)
+    except FileNotFoundError:
+        return None
+    if version is None:
+        version = artifact_version(artifact_dir)
+    return metrics if metrics.get('model_version') == version else None
+
+
+def artifact_version(artifact_dir=ARTIFACT_DIR):
+    """Short content hash of the three artifact files.
+
+    The files are only re-hashed when their size or mtime changes, so this is
+    cheap enough to call on every request.
+    """
+    paths = [os.path.join(artifact_dir, name)
+             for name in (MODEL_FILE, SCALER_FILE, FEATURE_NAMES_FILE)]
+    fingerprint = tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+    cached = _versions.get(artifact_dir)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    contents = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            contents.append(f.read())
+    version = content_version(contents)
+    _versions[artifact_dir] = (fingerprint, version)
+    return version
+
+
+def content_version(contents):
+    """``artifact_version`` of the model, scaler and feature-name file bytes"""
+    digest = hashlib.sha256()
+    for data in contents:
+        digest.update(data)
+    return digest.hexdigest()[:16]
@@ -0,0 +1,188 @@
+"""Chunked batch scoring of customer files.
+
+Reads a CSV, Parquet or Arrow IPC file of raw customer records in
+bounded-size chunks, encodes and scales each chunk with vectorized operations
+and streams the scored rows to the output file, so memory stays flat whatever
+the file size.  Parquet and Arrow sources are scored from Arrow record
+batches without pandas (see churn_scoring.columnar).
+
+Usage:
+    python -m churn_scoring.batch customers.csv scored.csv --chunk-size 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from churn_scoring import columnar
+from churn_scoring.artifacts import ARTIFACT_DIR, load_artifacts
+from churn_scoring.bundle import load_bundle
+from churn_scoring.fast_svm import FastSVM
+from churn_scoring.parallel import ParallelScorer
+from churn_scoring.pipeline import FeaturePipeline
+from churn_scoring.prediction import predict_churn
+from churn_scoring.schema import PREDICTION_COLUMN, PROBABILITY_COLUMN
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _is_parquet(path):
+    name = getattr(path, 'name', path)
+    return str(name).lower().endswith(('.parquet', '.pq'))
+
+
+def read_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield raw customer DataFrames of at most ``chunk_size`` rows"""
+    if columnar.is_columnar(source):
+        for batch in columnar.read_batches(source, chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size)
+
+
+def _scored(chunk, probabilities, labels):
+    scored = chunk.copy()
+    scored[PROBABILITY_COLUMN] = probabilities
+    scored[PREDICTION_COLUMN] = labels
+    return scored
+
+
+def _scored_empty(chunk):
+    """An empty chunk with the score columns, so header-only input gives header-only output"""
+    return _scored(chunk, np.empty(0), np.empty(0, dtype=np.int8))
+
+
+def score_chunks(chunks, model, scaler, feature_names):
+    """Score each raw chunk, yielding it with probability and label columns"""
+    pipeline = FeaturePipeline(scaler, feature_names)
+    for chunk in chunks:
+        if chunk.empty:
+            yield _scored_empty(chunk)
+            continue
+        X = pipeline.transform_columns(chunk)
+        yield _scored(chunk, *predict_churn(model, X))
+
+
+def score_chunks_with(chunks, scorer):
+    """Like ``score_chunks`` but through a ``ChurnScorer`` and its backend"""
+    for chunk in chunks:
+        if chunk.empty:
+            yield _scored_empty(chunk)
+            continue
+        result = scorer.score_columns(chunk)
+        yield _scored(chunk, result['probability'], result['prediction'])
+
+
+def write_chunks(scored_chunks, destination):
+    """Stream scored chunks to a CSV or Parquet file, returning the row count.
+
+    If every chunk is empty (e.g. a header-only input) the first one is
+    written, so the output still exists with its columns.
+    """
+    rows = 0
+    empty = None
+    if _is_parquet(destination):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in scored_chunks:
+                if chunk.empty:
+                    empty = chunk if empty is None else empty
+                    continue
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(destination, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+            if writer is None and empty is not None:
+                pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), destination)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    header = True
+    for chunk in scored_chunks:
+        if chunk.empty:
+            empty = chunk if empty is None else empty
+            continue
+        chunk.to_csv(destination, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        rows += len(chunk)
+    if header and empty is not None:
+        empty.to_csv(destination, index=False)
+    return rows
+
+
+def score_file(source, destination, model, scaler, feature_names,
+               chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score ``source`` into ``destination`` chunk by chunk"""
+    if columnar.is_columnar(source):
+        # Arrow batches go straight into the feature matrix, skipping pandas
+        return columnar.score_file(source, destination, model, scaler, feature_names,
+                                   batch_size=chunk_size)
+    chunks = read_chunks(source, chunk_size)
+    return write_chunks(score_chunks(chunks, model, scaler, feature_names), destination)
+
+
+def score_file_with(source, destination, scorer, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score ``source`` into ``destination`` with a ``ChurnScorer``"""
+    chunks = read_chunks(source, chunk_size)
+    return write_chunks(score_chunks_with(chunks, scorer), destination)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score a customer CSV/Parquet/Arrow file")
+    parser.add_argument('source',
+                        help="Input CSV, Parquet or Arrow IPC file of raw customer records")
+    parser.add_argument('destination', help="Output CSV or Parquet file")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows scored per chunk (default: %(default)s)")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the model artifacts")
+    parser.add_argument('--engine', choices=['fast', 'sklearn'], default='fast',
+                        help="Score with the compiled FastSVM engine or the pickled SVC")
+    parser.add_argument('--prune', type=float, default=None, metavar='FRACTION',
+                        help="Approximate FastSVM keeping this fraction of support vectors")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Score on a pool of this many processes (default: %(default)s)")
+    parser.add_argument('--bundle', default=None,
+                        help="Score with this memory-mapped model bundle (in every pool worker)")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.source) == os.path.abspath(args.destination):
+        parser.error("source and destination must be different files")
+
+    if args.engine != 'fast' and (args.prune is not None or args.workers > 1 or args.bundle):
+        parser.error("--prune, --workers and --bundle require --engine fast")
+    if args.prune is not None and args.workers > 1:
+        parser.error("--prune cannot be combined with --workers")
+
+    model, scaler, feature_names = load_artifacts(args.artifact_dir)
+    if args.workers > 1:
+        model = ParallelScorer(args.workers, artifact_dir=args.artifact_dir,
+                               bundle_path=args.bundle)
+        model.warm_up()
+    elif args.engine == 'fast':
+        model = load_bundle(args.bundle).engine() if args.bundle else FastSVM.from_model(model)
+        if args.prune is not None:
+            model = model.pruned(args.prune)
+
+    start = time.perf_counter()
+    try:
+        rows = score_file(args.source, args.destination, model, scaler, feature_names,
+                          chunk_size=args.chunk_size)
+    finally:
+        if isinstance(model, ParallelScorer):
+            model.close()
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows:,} rows in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
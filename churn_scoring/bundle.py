@@ -0,0 +1,187 @@
+"""Single-file, memory-mapped model bundle.
+
+``load_artifacts`` unpickles three files (model, scaler, feature names) and
+copies every array into the process.  A bundle stores the same information
+as raw little-endian arrays behind a small JSON header:
+
+    b'CHURNBDL' | uint64 header length | JSON header | padding | arrays...
+
+Every array starts on a 64-byte boundary and is opened with ``np.memmap``,
+so loading copies nothing and processes on one host share the page cache.
+Loading a bundle never unpickles anything, so it is safe to read from
+shared storage.
+
+Usage:
+    python -m churn_scoring.bundle export churn_model.bundle
+    python -m churn_scoring.bundle info churn_model.bundle
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.fast_svm import FastSVM, platt_params
+from churn_scoring.pipeline import FeaturePipeline
+
+MAGIC = b'CHURNBDL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+DEFAULT_BUNDLE_FILE = 'churn_model.bundle'
+
+_PREFIX = struct.Struct('<8sQ')
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _content_hash(header, arrays):
+    digest = hashlib.sha256(json.dumps(header, sort_keys=True).encode())
+    for name in sorted(arrays):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def export_bundle(path, model, scaler, feature_names):
+    """Write ``model``, ``scaler`` and ``feature_names`` to a bundle at ``path``.
+
+    Returns the bundle's model version, a hash of its contents.
+    """
+    engine = FastSVM.from_model(model)
+    scaled_names = getattr(scaler, 'feature_names_in_', None)
+    if scaled_names is None:
+        scaled_names = feature_names
+    prob_a, prob_b = platt_params(model)
+
+    arrays = {
+        'support_vectors': engine.support_vectors,
+        'support_vectors_t': engine._sv_t,
+        'sv_sq_norms': engine._sv_sq_norms,
+        'dual_coef': engine.dual_coef,
+        'scaler_mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scaler_scale': np.asarray(scaler.scale_, dtype=np.float64),
+    }
+    header = {
+        'format_version': FORMAT_VERSION,
+        'kernel': 'rbf',
+        'gamma': engine.gamma,
+        'intercept': engine.intercept,
+        'prob_a': prob_a,
+        'prob_b': prob_b,
+        'feature_names': list(feature_names),
+        'scaled_features': [str(name) for name in scaled_names],
+    }
+    model_version = _content_hash(header, arrays)
+    header['model_version'] = model_version
+    header['created'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+    # Array offsets depend on the header length, which depends on the offsets;
+    # lay out relative to a padded header size and grow it until it fits.
+    header_room = 4096
+    while True:
+        offset = _aligned(_PREFIX.size + header_room)
+        layout = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array, dtype='<f8')
+            layout[name] = {'offset': offset, 'shape': list(array.shape), 'dtype': '<f8'}
+            offset = _aligned(offset + array.nbytes)
+        header['arrays'] = layout
+        header_bytes = json.dumps(header, indent=1).encode()
+        if len(header_bytes) <= header_room:
+            break
+        header_room *= 2
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(layout[name]['offset'])
+            f.write(np.ascontiguousarray(array, dtype='<f8').tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+    return model_version
+
+
+def read_header(path):
+    """Return the JSON header of the bundle at ``path``"""
+    with open(path, 'rb') as f:
+        magic, header_length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a churn model bundle")
+        header = json.loads(f.read(header_length))
+    if header.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format version {header.get('format_version')} "
+                         f"(expected {FORMAT_VERSION})")
+    return header
+
+
+class ModelBundle:
+    """Memory-mapped view of a bundle: arrays, engine and feature pipeline"""
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        self.arrays = {
+            name: np.memmap(path, dtype=spec['dtype'], mode='r',
+                            offset=spec['offset'], shape=tuple(spec['shape']))
+            for name, spec in self.header['arrays'].items()
+        }
+
+    @property
+    def model_version(self):
+        return self.header['model_version']
+
+    @property
+    def feature_names(self):
+        return self.header['feature_names']
+
+    def engine(self, **kwargs):
+        """FastSVM evaluating directly on the mapped arrays"""
+        header, arrays = self.header, self.arrays
+        return FastSVM(arrays['support_vectors'], arrays['dual_coef'], header['intercept'],
+                       header['gamma'], header['prob_a'], header['prob_b'],
+                       sv_sq_norms=arrays['sv_sq_norms'],
+                       support_vectors_t=arrays['support_vectors_t'], **kwargs)
+
+    def pipeline(self, **kwargs):
+        """FeaturePipeline using the bundled scaler statistics and feature order"""
+        return FeaturePipeline.from_stats(self.feature_names, self.header['scaled_features'],
+                                          self.arrays['scaler_mean'],
+                                          self.arrays['scaler_scale'], **kwargs)
+
+
+def load_bundle(path):
+    """Open the bundle at ``path`` without copying or unpickling anything"""
+    return ModelBundle(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or inspect churn model bundles")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="Write the pickled artifacts as a bundle")
+    export.add_argument('path', nargs='?', default=os.path.join(ARTIFACT_DIR, DEFAULT_BUNDLE_FILE))
+    export.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the pickled model artifacts")
+    info = commands.add_parser('info', help="Print a bundle's header")
+    info.add_argument('path')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        from churn_scoring.artifacts import load_artifacts
+        version = export_bundle(args.path, *load_artifacts(args.artifact_dir))
+        print(f"Wrote {args.path} (model version {version}, "
+              f"{os.path.getsize(args.path):,} bytes)")
+    else:
+        print(json.dumps(read_header(args.path), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""In-process LRU prediction cache with TTL and an optional SQLite tier.
+
+Form inputs are mostly discrete, so analysts keep re-submitting the same
+profiles.  ``PredictionCache`` maps a canonical key for a customer record to
+its churn probability:
+
+* with an ``encoder`` (e.g. a ``FeaturePipeline``) the key is the encoded
+  feature vector, otherwise the record's fields in sorted order;
+* ``quantize`` rounds selected fields (e.g. ``{'Balance': 100.0}``) before
+  keying *and* scoring, so near-identical profiles share one entry
+  (``$CHURN_CACHE_QUANTIZE``, e.g. ``Balance=100,EstimatedSalary=1000``);
+* entries expire after ``ttl`` seconds and the least recently used entry is
+  evicted beyond ``maxsize``;
+* every key is scoped to a model version; ``set_model_version`` drops the
+  in-process entries scored by a previous model.
+
+``SQLiteBackend`` adds a shared on-disk tier so several app processes on one
+host reuse each other's results.  Processes may run different model
+versions at once (during a rollout or a rollback), so the shared file only
+loses expired rows and versions explicitly passed to ``retire_versions``
+(``ModelRegistry`` retires the versions it unloads).  Every ``purge_every``
+writes it purges expired rows and, beyond ``max_rows``
+(``$CHURN_CACHE_DB_MAX_ROWS``), the rows closest to expiry, so the file
+stays bounded.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from churn_scoring.schema import NUMERIC_COLUMNS
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_TTL = 3600.0
+# Row cap of the shared SQLite tier and how many writes run between purges
+DEFAULT_MAX_ROWS = 1_000_000
+DEFAULT_PURGE_EVERY = 1000
+
+QUANTIZE_ENV_VAR = 'CHURN_CACHE_QUANTIZE'
+MAX_ROWS_ENV_VAR = 'CHURN_CACHE_DB_MAX_ROWS'
+
+
+class SQLiteBackend:
+    """Shared on-disk cache tier; safe to use from several processes"""
+
+    def __init__(self, path, max_rows=DEFAULT_MAX_ROWS, purge_every=DEFAULT_PURGE_EVERY):
+        self.path = path
+        self.max_rows = int(max_rows)
+        self.purge_every = int(purge_every)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._puts = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " model_version TEXT NOT NULL,"
+                " key BLOB NOT NULL,"
+                " probability REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (model_version, key))"
+            )
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, model_version, key, now):
+        row = self._connection().execute(
+            "SELECT probability, expires_at FROM predictions WHERE model_version = ? AND key = ?",
+            (model_version, key)).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return row
+
+    def put(self, model_version, key, probability, expires_at):
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                         (model_version, key, probability, expires_at))
+        with self._lock:
+            self._puts += 1
+            due = self._puts % self.purge_every == 0
+        if due:
+            self.purge(time.time())
+
+    def purge(self, now, retired_versions=()):
+        """Delete expired rows, the ``retired_versions`` and the rows beyond ``max_rows``.
+
+        Over the cap, the rows closest to expiry go first.
+        """
+        retired_versions = list(retired_versions)
+        placeholders = ', '.join('?' * len(retired_versions))
+        with self._connection() as conn:
+            conn.execute("DELETE FROM predictions WHERE expires_at <= ?"
+                         + (f" OR model_version IN ({placeholders})" if retired_versions else ''),
+                         [now] + retired_versions)
+            excess = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_rows
+            if excess > 0:
+                conn.execute("DELETE FROM predictions WHERE rowid IN ("
+                             " SELECT rowid FROM predictions ORDER BY expires_at LIMIT ?)",
+                             (excess,))
+
+
+def configured_quantize():
+    """Quantization steps from $CHURN_CACHE_QUANTIZE ('Field=step,...'), or None"""
+    steps = {}
+    for item in os.environ.get(QUANTIZE_ENV_VAR, '').split(','):
+        if not item.strip():
+            continue
+        field, _, step = item.partition('=')
+        if field.strip() not in NUMERIC_COLUMNS:
+            raise ValueError(f"Cannot quantize {field.strip()!r}; "
+                             f"choose from {', '.join(NUMERIC_COLUMNS)}")
+        try:
+            steps[field.strip()] = float(step)
+        except ValueError:
+            raise ValueError(f"Bad ${QUANTIZE_ENV_VAR} entry {item.strip()!r}; "
+                             f"expected Field=step")
+        if steps[field.strip()] <= 0:
+            raise ValueError(f"Quantization step for {field.strip()} must be positive")
+    return steps or None
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache of churn probabilities"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, quantize=None,
+                 encoder=None, backend=None, model_version=''):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self.quantize = dict(quantize or {})
+        self.encoder = encoder
+        self.backend = backend
+        self.model_version = model_version
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Build a cache from the environment.
+
+        Uses the SQLite file named by $CHURN_CACHE_DB, if set, capped at
+        $CHURN_CACHE_DB_MAX_ROWS rows, and the quantization steps in
+        $CHURN_CACHE_QUANTIZE unless ``quantize`` is passed.
+        """
+        path = os.environ.get('CHURN_CACHE_DB')
+        kwargs.setdefault('quantize', configured_quantize())
+        backend = None
+        if path:
+            max_rows = os.environ.get(MAX_ROWS_ENV_VAR) or DEFAULT_MAX_ROWS
+            try:
+                max_rows = int(max_rows)
+            except ValueError:
+                raise ValueError(f"${MAX_ROWS_ENV_VAR} must be an integer, got {max_rows!r}")
+            backend = SQLiteBackend(path, max_rows=max_rows)
+        return cls(backend=backend, **kwargs)
+
+    def quantized(self, record):
+        """Copy of ``record`` with the quantized fields rounded to their step"""
+        if not self.quantize:
+            return record
+        record = dict(record)
+        for field, step in self.quantize.items():
+            if field in record:
+                record[field] = round(record[field] / step) * step
+        return record
+
+    def key(self, record):
+        """Canonical cache key of an (already quantized) record"""
+        if self.encoder is not None:
+            return self.encoder.transform_record(record)[0].tobytes()
+        return repr(sorted(record.items())).encode()
+
+    def set_model_version(self, model_version):
+        """Switch to a new model version, dropping in-process results of the old one.
+
+        Shared rows of the old version stay: other processes may still serve
+        it.  Only expired rows are removed from the backend.
+        """
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            self.model_version = model_version
+            self._entries.clear()
+        if self.backend is not None:
+            self.backend.purge(time.time())
+
+    def retire_versions(self, versions):
+        """Delete the shared rows of model versions no process serves any more"""
+        if self.backend is not None:
+            self.backend.purge(time.time(), versions)
+
+    def get(self, key):
+        """Cached probability for ``key``, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                probability, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return probability
+                del self._entries[key]
+                self.expirations += 1
+            model_version = self.model_version
+
+        if self.backend is not None:
+            row = self.backend.get(model_version, key, now)
+            if row is not None:
+                with self._lock:
+                    self.hits += 1
+                    self._store(key, row[0], row[1])
+                return row[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, probability):
+        expires_at = time.time() + self.ttl
+        probability = float(probability)
+        with self._lock:
+            self._store(key, probability, expires_at)
+            model_version = self.model_version
+        if self.backend is not None:
+            self.backend.put(model_version, key, probability, expires_at)
+
+    def _store(self, key, probability, expires_at):
+        self._entries[key] = (probability, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, record, compute):
+        """Return the cached probability for ``record`` or ``compute`` and cache it.
+
+        ``compute`` receives the quantized record and returns a probability.
+        """
+        record = self.quantized(record)
+        key = self.key(record)
+        probability = self.get(key)
+        if probability is None:
+            probability = float(compute(record))
+            self.put(key, probability)
+        return probability
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'model_version': self.model_version,
+            }
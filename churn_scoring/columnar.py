@@ -0,0 +1,190 @@
+"""Columnar ingestion of Arrow IPC and Parquet customer files.
+
+Record batches are read with Arrow instead of pandas: Parquet files with
+column projection and Geography/Gender kept dictionary-encoded, Arrow IPC
+files memory-mapped so batches reference the page cache instead of copies.
+``FeaturePipeline.transform_arrow`` then writes each batch straight into a
+preallocated float64 matrix in the model's feature order, building the
+Gender and Geo_* columns from the dictionary codes.  No DataFrame, object
+array or intermediate encoded frame is created on the way.
+
+``feature_matrix`` reads a whole file into one matrix sized from the file
+metadata; ``feature_batches`` reuses one batch-sized buffer for files that
+do not fit in memory.  ``score_file`` is the batch scoring path for Arrow and
+Parquet sources (``churn_scoring.batch.score_file`` dispatches to it).
+"""
+import os
+
+import numpy as np
+
+from churn_scoring.pipeline import FeaturePipeline
+from churn_scoring.prediction import predict_churn
+from churn_scoring.schema import PREDICTION_COLUMN, PROBABILITY_COLUMN, RAW_COLUMNS
+
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc', '.arrows')
+DEFAULT_BATCH_SIZE = 50_000
+
+# String columns read as dictionary arrays: a handful of distinct values each
+DICTIONARY_COLUMNS = ['Geography', 'Gender', 'HasCrCard', 'IsActiveMember']
+
+
+def _suffix_in(path, suffixes):
+    name = getattr(path, 'name', path)
+    return str(name).lower().endswith(suffixes)
+
+
+def is_columnar(path):
+    """Whether ``path`` is a Parquet or Arrow IPC file by its extension"""
+    return _suffix_in(path, PARQUET_SUFFIXES + ARROW_SUFFIXES)
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Columnar ingestion requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+class _Source:
+    """Row count and record batches of one Parquet or Arrow IPC file (path or file object)"""
+
+    def __init__(self, source, columns=None):
+        pa = _pyarrow()
+        if isinstance(source, (str, os.PathLike)):
+            source = os.fspath(source)
+        self.columns = columns
+        self._parquet = None
+        if _suffix_in(source, PARQUET_SUFFIXES):
+            import pyarrow.parquet as pq
+
+            names = pq.ParquetFile(source).schema_arrow.names
+            self._parquet = pq.ParquetFile(
+                source, read_dictionary=[col for col in DICTIONARY_COLUMNS if col in names])
+            self.num_rows = self._parquet.metadata.num_rows
+            schema = self._parquet.schema_arrow
+        else:
+            import pyarrow.ipc as ipc
+
+            stream = pa.memory_map(source) if isinstance(source, str) else source
+            try:
+                reader = ipc.open_file(stream)
+                self._batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+                schema = reader.schema
+            except pa.ArrowInvalid:
+                # Streaming format (.arrows): no footer, batches read in order
+                stream.seek(0)
+                reader = ipc.open_stream(stream)
+                schema = reader.schema
+                self._batches = list(reader)
+            self.num_rows = sum(batch.num_rows for batch in self._batches)
+
+        missing = [col for col in columns or [] if col not in schema.names]
+        if missing:
+            raise ValueError(f"Missing customer columns: {', '.join(missing)}")
+        self.schema = schema if columns is None else pa.schema([schema.field(c) for c in columns])
+
+    def batches(self, batch_size):
+        if self.num_rows == 0:
+            # One empty batch, so readers still see the columns of an empty file
+            yield _pyarrow().RecordBatch.from_pylist([], schema=self.schema)
+            return
+        if self._parquet is not None:
+            yield from self._parquet.iter_batches(batch_size=batch_size, columns=self.columns)
+            return
+        for batch in self._batches:
+            if self.columns is not None:
+                batch = batch.select(self.columns)
+            # Slices are zero-copy views of the mapped file
+            for start in range(0, batch.num_rows, batch_size):
+                yield batch.slice(start, batch_size)
+
+
+def read_batches(source, batch_size=DEFAULT_BATCH_SIZE, columns=None):
+    """Yield Arrow record batches of at most ``batch_size`` rows.
+
+    ``columns`` limits the columns read (default: all of them).  An empty
+    file yields one empty batch carrying its schema.
+    """
+    yield from _Source(source, columns).batches(batch_size)
+
+
+def feature_batches(source, pipeline, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield scaled feature matrices of at most ``batch_size`` rows.
+
+    Every matrix is a view of the same preallocated buffer, overwritten by
+    the next batch; copy it if it must outlive the iteration step.
+    """
+    out = np.empty((batch_size, pipeline.n_features), dtype=np.float64)
+    for batch in read_batches(source, batch_size, RAW_COLUMNS):
+        yield pipeline.transform_arrow(batch, out)
+
+
+def feature_matrix(source, pipeline, batch_size=DEFAULT_BATCH_SIZE):
+    """Scaled (n_rows, n_features) matrix of a whole file, allocated once"""
+    reader = _Source(source, RAW_COLUMNS)
+    out = np.empty((reader.num_rows, pipeline.n_features), dtype=np.float64)
+    start = 0
+    for batch in reader.batches(batch_size):
+        pipeline.transform_arrow(batch, out[start:])
+        start += batch.num_rows
+    return out
+
+
+def score_batches(batches, model, pipeline, batch_size=DEFAULT_BATCH_SIZE):
+    """Append probability and label columns to each record batch"""
+    pa = _pyarrow()
+    out = np.empty((batch_size, pipeline.n_features), dtype=np.float64)
+    for batch in batches:
+        if batch.num_rows == 0:
+            yield pa.RecordBatch.from_arrays(
+                batch.columns + [pa.array([], pa.float64()), pa.array([], pa.int8())],
+                names=batch.schema.names + [PROBABILITY_COLUMN, PREDICTION_COLUMN])
+            continue
+        if batch.num_rows > len(out):
+            out = np.empty((batch.num_rows, pipeline.n_features), dtype=np.float64)
+        probabilities, labels = predict_churn(model, pipeline.transform_arrow(batch, out))
+        yield pa.RecordBatch.from_arrays(
+            batch.columns + [pa.array(probabilities), pa.array(labels)],
+            names=batch.schema.names + [PROBABILITY_COLUMN, PREDICTION_COLUMN])
+
+
+def write_batches(scored_batches, destination):
+    """Stream scored batches to a Parquet, Arrow IPC or CSV file, returning the row count.
+
+    Empty batches are written too, so an empty input still gives an output
+    file with the scored schema.
+    """
+    rows = 0
+    if not is_columnar(destination):
+        # CSV goes through the pandas writer so the output matches churn_scoring.batch
+        from churn_scoring.batch import write_chunks
+
+        return write_chunks((batch.to_pandas() for batch in scored_batches), destination)
+
+    pa = _pyarrow()
+    writer = None
+    try:
+        for batch in scored_batches:
+            if writer is None:
+                if _suffix_in(destination, PARQUET_SUFFIXES):
+                    import pyarrow.parquet as pq
+
+                    writer = pq.ParquetWriter(destination, batch.schema)
+                else:
+                    writer = pa.ipc.new_file(destination, batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def score_file(source, destination, model, scaler, feature_names,
+               batch_size=DEFAULT_BATCH_SIZE):
+    """Score a Parquet or Arrow IPC ``source`` into ``destination`` batch by batch"""
+    pipeline = FeaturePipeline(scaler, feature_names)
+    batches = read_batches(source, batch_size)
+    return write_batches(score_batches(batches, model, pipeline, batch_size), destination)
@@ -0,0 +1,251 @@
+"""Shared scoring core behind the three Streamlit front ends.
+
+Every app scores through a ``ChurnScorer`` wrapping one pluggable backend:
+
+    rules         predict_churn_risk from churn_app.py, compiled to tables
+    rules_mobile  predict_churn_mobile from mobile_churn_app.py, compiled
+    svc           the pickled sklearn SVC
+    fast_svm      the pickled SVC evaluated by FastSVM (same probabilities, or
+                  float32/int8 when ``$CHURN_SVM_PRECISION`` asks for it and
+                  the mode passes validation; see ``churn_scoring.precision``)
+
+The backend is chosen by the caller or, when ``$CHURN_SCORING_BACKEND`` is
+set, by configuration.  Whatever the backend, the 0.5 label threshold, the
+0.5/0.7 recommendation tiers and the risk-factor list come from here, so
+the apps only differ in layout.
+"""
+import os
+import sys
+from collections.abc import Mapping
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR, artifact_version, load_artifacts
+from churn_scoring.fast_svm import FastSVM
+from churn_scoring.metrics import timed
+from churn_scoring.pipeline import FeaturePipeline
+from churn_scoring.prediction import (
+    CHURN_THRESHOLD, HIGH_RISK_THRESHOLD, TIER_IMMEDIATE, TIER_MAINTENANCE, TIER_PROACTIVE,
+    predict_churn, risk_tier
+)
+from churn_scoring.rule_engine import (
+    FACTOR_NAMES, bucket_index, compile_rules, desktop_rule, factor_names, mobile_rule
+)
+
+BACKEND_ENV_VAR = 'CHURN_SCORING_BACKEND'
+DEFAULT_BACKEND = 'fast_svm'
+
+# Values used when a front end does not collect a field a backend needs
+# (the mobile form has no salary or credit card inputs)
+MISSING_FIELD_DEFAULTS = {
+    'Tenure': 5,
+    'HasCrCard': 1,
+    'EstimatedSalary': 100000.0,
+}
+
+# Display text per risk factor: (title, reason)
+RISK_FACTOR_MESSAGES = {
+    'older_customer': ("👴 Older customer", "Customers over 45 churn more"),
+    'single_product': ("📦 Only one product", "Highest churn driver"),
+    'high_balance': ("💰 High balance", "Wealthier customers leave more often"),
+    'inactive_member': ("💤 Inactive member", "2x higher churn risk"),
+    'germany': ("🇩🇪 German customer", "32% churn rate"),
+    'female': ("👩 Female customer", "25% churn rate"),
+    'low_credit': ("📉 Low credit score", "Financial stress indicator"),
+}
+assert set(RISK_FACTOR_MESSAGES) == set(FACTOR_NAMES)
+
+
+class RuleBackend:
+    """Compiled rule tables; ``rule_fn`` maps a raw record to a probability"""
+
+    def __init__(self, name, rule_fn):
+        self.name = name
+        self.version = name
+        self._compiled = compile_rules(rule_fn)
+
+    def probabilities(self, columns):
+        with timed('predict'):
+            return self._compiled.probabilities[bucket_index(columns)]
+
+
+class SVCBackend:
+    """The pickled SVC (or any model with ``predict_proba``) on scaled features"""
+
+    def __init__(self, name, model, pipeline, version, precision='float64',
+                 precision_report=None):
+        self.name = name
+        self.model = model
+        self.pipeline = pipeline
+        self.version = version
+        self.precision = precision
+        # Validation of a reduced-precision mode against the float64 model
+        self.precision_report = precision_report
+
+    @classmethod
+    def from_artifacts(cls, name='svc', artifact_dir=ARTIFACT_DIR, fast=False, precision=None):
+        report = None
+        with timed('load_model'):
+            model, scaler, feature_names = load_artifacts(artifact_dir)
+            pipeline = FeaturePipeline(scaler, feature_names)
+            if fast:
+                reference, model = model, FastSVM.from_model(model)
+                model, precision, report = cls._reduce(reference, model, pipeline, precision)
+        return cls(name, model, pipeline, artifact_version(artifact_dir),
+                   precision or 'float64', report)
+
+    @staticmethod
+    def _reduce(reference, engine, pipeline, precision):
+        """Engine at the requested precision if it passes validation, else the exact one"""
+        from churn_scoring.precision import PrecisionLimitError, checked_engine, configured_precision
+
+        precision = precision or configured_precision()
+        if precision == 'float64':
+            return engine, precision, None
+        try:
+            reduced, report = checked_engine(reference, engine, pipeline, precision)
+        except PrecisionLimitError as e:
+            print(f"{e}; scoring at float64", file=sys.stderr)
+            return engine, 'float64', e.report
+        return reduced, precision, report
+
+    def probabilities(self, columns):
+        with timed('encode'):
+            X = self.pipeline.transform_columns(columns)
+        with timed('predict'):
+            return predict_churn(self.model, X)[0]
+
+
+BACKENDS = {
+    'rules': lambda artifact_dir: RuleBackend('rules', desktop_rule),
+    'rules_mobile': lambda artifact_dir: RuleBackend('rules_mobile', mobile_rule),
+    'svc': lambda artifact_dir: SVCBackend.from_artifacts('svc', artifact_dir),
+    'fast_svm': lambda artifact_dir: SVCBackend.from_artifacts('fast_svm', artifact_dir, fast=True),
+}
+
+
+def configured_backend(default=DEFAULT_BACKEND):
+    """Backend name from $CHURN_SCORING_BACKEND, falling back to ``default``"""
+    return os.environ.get(BACKEND_ENV_VAR) or default
+
+
+def create_backend(name=None, artifact_dir=ARTIFACT_DIR):
+    name = name or configured_backend()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown scoring backend {name!r}; "
+                         f"choose one of {', '.join(sorted(BACKENDS))}")
+    return BACKENDS[name](artifact_dir)
+
+
+def to_columns(records):
+    """Struct-of-arrays view of a list of raw records, a column mapping or a DataFrame"""
+    if isinstance(records, Mapping) or hasattr(records, 'columns'):
+        columns = records
+        present = set(records.keys()) if isinstance(records, Mapping) else set(records.columns)
+        n_rows = len(next(iter(records.values()))) if isinstance(records, Mapping) else len(records)
+        missing = {f: v for f, v in MISSING_FIELD_DEFAULTS.items() if f not in present}
+        if not missing:
+            return columns
+        columns = {col: np.asarray(columns[col]) for col in present}
+        columns.update({f: np.full(n_rows, v) for f, v in missing.items()})
+        return columns
+
+    records = list(records)
+    fields = set(MISSING_FIELD_DEFAULTS).union(*records) if records else set()
+    return {
+        field: np.asarray([r.get(field, MISSING_FIELD_DEFAULTS.get(field)) for r in records])
+        for field in fields
+    }
+
+
+class ChurnScorer:
+    """Common batch scoring API over any backend"""
+
+    def __init__(self, backend, cache=None, monitor=None):
+        self.backend = backend
+        self.cache = cache
+        # Optional DriftMonitor fed with every scored batch
+        self.monitor = monitor
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    def score_columns(self, columns):
+        """Vectorized scores: dict of probability, prediction, risk_tier and factor_mask arrays"""
+        with timed('collect'):
+            columns = to_columns(columns)
+        probabilities = np.asarray(self.backend.probabilities(columns), dtype=np.float64)
+        if self.monitor is not None:
+            with timed('monitor'):
+                self.monitor.observe_columns(columns, probabilities)
+        with timed('postprocess'):
+            tiers = np.where(probabilities > HIGH_RISK_THRESHOLD, TIER_IMMEDIATE,
+                             np.where(probabilities > CHURN_THRESHOLD, TIER_PROACTIVE,
+                                      TIER_MAINTENANCE))
+            return {
+                'probability': probabilities,
+                'prediction': (probabilities > CHURN_THRESHOLD).astype(np.int8),
+                'risk_tier': tiers,
+                'factor_mask': self._factor_masks(columns),
+            }
+
+    def _factor_masks(self, columns):
+        return _FACTOR_TABLE[bucket_index(columns)]
+
+    def score(self, records):
+        """Score raw records; returns one result dict per record"""
+        scored = self.score_columns(records)
+        return [
+            {
+                'probability': float(p),
+                'prediction': int(label),
+                'risk_tier': str(tier),
+                'risk_factors': factor_names(int(mask)),
+                'backend': self.name,
+                'model_version': self.backend.version,
+            }
+            for p, label, tier, mask in zip(scored['probability'], scored['prediction'],
+                                            scored['risk_tier'], scored['factor_mask'])
+        ]
+
+    def score_record(self, record):
+        """Score one record, reusing the prediction cache when one is attached"""
+        with timed('score'):
+            if self.cache is None:
+                return self.score([record])[0]
+            with timed('cache'):
+                probability = self.cache.get_or_compute(
+                    record, lambda r: self.backend.probabilities(to_columns([r]))[0])
+            if self.monitor is not None:
+                with timed('monitor'):
+                    self.monitor.observe_columns(to_columns([record]), [probability])
+            with timed('postprocess'):
+                return {
+                    'probability': probability,
+                    'prediction': int(probability > CHURN_THRESHOLD),
+                    'risk_tier': risk_tier(probability),
+                    'risk_factors': factor_names(int(self._factor_masks(to_columns([record]))[0])),
+                    'backend': self.name,
+                    'model_version': self.backend.version,
+                }
+
+
+# Risk factors only depend on the rule buckets, so one table serves every backend
+_FACTOR_TABLE = compile_rules(lambda record: 0.0).factor_masks
+
+
+def get_scorer(backend=None, artifact_dir=ARTIFACT_DIR, cache=None):
+    """Build a ChurnScorer for ``backend`` (or the configured default)"""
+    return ChurnScorer(create_backend(backend, artifact_dir), cache=cache)
+
+
+_default_scorers = {}
+
+
+def score(records, backend=None):
+    """Score raw customer records with a process-wide scorer per backend"""
+    name = backend or configured_backend()
+    if name not in _default_scorers:
+        _default_scorers[name] = get_scorer(name)
+    return _default_scorers[name].score(records)
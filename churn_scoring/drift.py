@@ -0,0 +1,371 @@
+"""Incremental input and score drift monitoring with mergeable sketches.
+
+``DriftMonitor`` keeps one fixed-bin histogram per model feature (in the
+scaled space the SVC sees) plus one for the output probability.  Each
+sketch is a few dozen counters plus count/sum/sum-of-squares, so memory is
+O(1) per feature, no raw rows are stored, and sketches from batch shards
+combine with ``merge``.
+
+Drift is measured against a reference:
+
+* by default the training reference implied by feature_scaler.pkl: a
+  scaled feature should have mean 0 and standard deviation 1, and PSI/KS
+  are reported against the standard normal with those moments.  The
+  scaler keeps no shape information (Tenure is uniform, Balance has a spike
+  at 0), so only the exact checks, mean shift and std ratio, raise alerts
+  against this reference.
+* or a sketch recorded from a known-good batch (``--reference``), which
+  also covers the unscaled features and the probability output and raises
+  PSI/KS alerts as well.
+
+Usage:
+    python -m churn_scoring.drift observe customers.csv --state drift.json
+    python -m churn_scoring.drift merge shard1.json shard2.json -o drift.json
+    python -m churn_scoring.drift report drift.json [--reference good.json]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.pipeline import FeaturePipeline
+
+STATE_VERSION = 1
+
+PROBABILITY_FEATURE = 'ChurnProbability'
+
+# Bin edges: 0.25-sigma bins for scaled features, unit bins for the raw
+# count/flag features, 5-point bins for probabilities
+SCALED_EDGES = np.linspace(-4.0, 4.0, 33)
+DISCRETE_EDGES = np.arange(0.5, 4.0)
+PROBABILITY_EDGES = np.linspace(0.0, 1.0, 21)[1:-1]
+
+# Alert thresholds
+PSI_ALERT = 0.2
+KS_ALERT = 0.1
+MEAN_SHIFT_ALERT = 0.25
+STD_RATIO_ALERT = (0.75, 1.33)
+MIN_ALERT_ROWS = 500
+
+# The scaler reference is compared on 1-sigma bins (4 sketch bins each) so
+# integer fields such as Tenure do not alias against the 0.25-sigma grid
+SCALER_BIN_GROUP = 4
+
+# Probabilities are clipped to this before taking PSI logarithms
+PSI_EPSILON = 1e-4
+
+Alert = namedtuple('Alert', ['feature', 'metric', 'value', 'threshold', 'message'])
+
+
+class FeatureSketch:
+    """Fixed-bin histogram plus moments of one feature; mergeable"""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.counts += np.bincount(np.searchsorted(self.edges, values, side='right'),
+                                   minlength=len(self.counts))
+        self.n += values.size
+        self.total += float(values.sum())
+        self.total_sq += float(np.dot(values, values))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge sketches with different bin edges")
+        self.counts += other.counts
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else math.nan
+
+    @property
+    def std(self):
+        if not self.n:
+            return math.nan
+        return math.sqrt(max(self.total_sq / self.n - self.mean ** 2, 0.0))
+
+    def proportions(self):
+        return self.counts / self.n if self.n else np.zeros(len(self.counts))
+
+    def to_dict(self):
+        return {
+            'edges': self.edges.tolist(), 'counts': self.counts.tolist(), 'n': self.n,
+            'total': self.total, 'total_sq': self.total_sq,
+            'min': self.min if self.n else None, 'max': self.max if self.n else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['edges'])
+        sketch.counts = np.asarray(state['counts'], dtype=np.int64)
+        sketch.n = state['n']
+        sketch.total = state['total']
+        sketch.total_sq = state['total_sq']
+        sketch.min = math.inf if state['min'] is None else state['min']
+        sketch.max = -math.inf if state['max'] is None else state['max']
+        return sketch
+
+
+def normal_proportions(edges):
+    """Standard-normal probability mass of the bins defined by ``edges``"""
+    cdf = [0.5 * (1 + math.erf(edge / math.sqrt(2))) for edge in edges]
+    return np.diff([0.0] + cdf + [1.0])
+
+
+def psi(observed, expected):
+    """Population stability index between two bin-proportion vectors"""
+    observed = np.clip(observed, PSI_EPSILON, None)
+    expected = np.clip(expected, PSI_EPSILON, None)
+    return float(np.sum((observed - expected) * np.log(observed / expected)))
+
+
+def ks_binned(observed, expected):
+    """Kolmogorov-Smirnov distance evaluated at the bin edges"""
+    return float(np.max(np.abs(np.cumsum(observed) - np.cumsum(expected))))
+
+
+class DriftMonitor:
+    """Streaming sketches of every model feature and the output probability"""
+
+    def __init__(self, feature_names, scaled_names, pipeline=None, reference=None):
+        self.feature_names = list(feature_names)
+        self.scaled_names = list(scaled_names)
+        self.pipeline = pipeline
+        self.reference = reference
+        scaled = set(self.scaled_names)
+        self.sketches = {
+            name: FeatureSketch(SCALED_EDGES if name in scaled else DISCRETE_EDGES)
+            for name in self.feature_names
+        }
+        self.sketches[PROBABILITY_FEATURE] = FeatureSketch(PROBABILITY_EDGES)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_scaler(cls, scaler, feature_names, reference=None):
+        scaled_names = getattr(scaler, 'feature_names_in_', feature_names)
+        return cls(feature_names, scaled_names, FeaturePipeline(scaler, feature_names),
+                   reference)
+
+    @property
+    def n(self):
+        return self.sketches[PROBABILITY_FEATURE].n
+
+    def observe_matrix(self, X, probabilities=None):
+        """Add a scaled feature matrix (n_rows, n_features) and its probabilities"""
+        X = np.asarray(X)
+        with self._lock:
+            for i, name in enumerate(self.feature_names):
+                self.sketches[name].update(X[:, i])
+            if probabilities is not None:
+                self.sketches[PROBABILITY_FEATURE].update(probabilities)
+
+    def observe_columns(self, columns, probabilities=None):
+        """Encode raw struct-of-arrays input with the monitor's pipeline and add it"""
+        self.observe_matrix(self.pipeline.transform_columns(columns), probabilities)
+
+    def merge(self, other):
+        if other.feature_names != self.feature_names:
+            raise ValueError("Cannot merge monitors over different features")
+        with self._lock:
+            for name, sketch in self.sketches.items():
+                sketch.merge(other.sketches[name])
+
+    def report(self):
+        """One dict per feature with moments and drift vs the reference"""
+        scaled = set(self.scaled_names)
+        rows = []
+        with self._lock:
+            for name, sketch in self.sketches.items():
+                row = {'feature': name, 'n': sketch.n, 'mean': sketch.mean, 'std': sketch.std,
+                       'mean_shift': None, 'std_ratio': None, 'psi': None, 'ks': None,
+                       'reference': None}
+                if sketch.n:
+                    expected = None
+                    if self.reference is not None and self.reference.sketches[name].n:
+                        ref = self.reference.sketches[name]
+                        expected = ref.proportions()
+                        row['reference'] = 'sketch'
+                        if ref.std > 0:
+                            row['mean_shift'] = (sketch.mean - ref.mean) / ref.std
+                            row['std_ratio'] = sketch.std / ref.std
+                    observed = sketch.proportions()
+                    if expected is None and name in scaled:
+                        # Underflow bin alone, then groups of SCALER_BIN_GROUP bins
+                        starts = np.r_[0, np.arange(1, len(observed), SCALER_BIN_GROUP)]
+                        expected = np.add.reduceat(normal_proportions(sketch.edges), starts)
+                        observed = np.add.reduceat(observed, starts)
+                        row['reference'] = 'scaler'
+                        # Scaled training data has mean 0 and std 1
+                        row['mean_shift'] = sketch.mean
+                        row['std_ratio'] = sketch.std
+                    if expected is not None:
+                        row['psi'] = psi(observed, expected)
+                        row['ks'] = ks_binned(observed, expected)
+                rows.append(row)
+        return rows
+
+    def alerts(self, min_rows=MIN_ALERT_ROWS):
+        """Alerts for every feature whose drift exceeds the thresholds"""
+        alerts = []
+        for row in self.report():
+            if row['n'] < min_rows:
+                continue
+            name = row['feature']
+            shape_checked = row['reference'] == 'sketch'
+            if shape_checked and row['psi'] >= PSI_ALERT:
+                alerts.append(Alert(name, 'psi', row['psi'], PSI_ALERT,
+                                    f"{name}: PSI {row['psi']:.3f} >= {PSI_ALERT}"))
+            if shape_checked and row['ks'] >= KS_ALERT:
+                alerts.append(Alert(name, 'ks', row['ks'], KS_ALERT,
+                                    f"{name}: KS {row['ks']:.3f} >= {KS_ALERT}"))
+            if row['mean_shift'] is not None and abs(row['mean_shift']) >= MEAN_SHIFT_ALERT:
+                alerts.append(Alert(name, 'mean_shift', row['mean_shift'], MEAN_SHIFT_ALERT,
+                                    f"{name}: mean moved {row['mean_shift']:+.2f} std"))
+            low, high = STD_RATIO_ALERT
+            if row['std_ratio'] is not None and not low <= row['std_ratio'] <= high:
+                alerts.append(Alert(name, 'std_ratio', row['std_ratio'], STD_RATIO_ALERT,
+                                    f"{name}: std is {row['std_ratio']:.2f}x the reference"))
+        return alerts
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'version': STATE_VERSION,
+                'feature_names': self.feature_names,
+                'scaled_names': self.scaled_names,
+                'sketches': {name: s.to_dict() for name, s in self.sketches.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, state, pipeline=None, reference=None):
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported drift state version {state.get('version')!r}")
+        monitor = cls(state['feature_names'], state['scaled_names'], pipeline, reference)
+        monitor.sketches = {name: FeatureSketch.from_dict(s)
+                            for name, s in state['sketches'].items()}
+        return monitor
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, pipeline=None, reference=None):
+        with open(path) as f:
+            return cls.from_dict(json.load(f), pipeline, reference)
+
+
+def open_monitor(state_path=None, artifact_dir=ARTIFACT_DIR):
+    """Monitor resuming ``state_path`` if it exists, else a fresh one for the artifacts"""
+    from churn_scoring.artifacts import load_artifacts
+
+    _, scaler, feature_names = load_artifacts(artifact_dir)
+    if state_path is not None and os.path.exists(state_path):
+        return DriftMonitor.load(state_path, FeaturePipeline(scaler, feature_names))
+    return DriftMonitor.from_scaler(scaler, feature_names)
+
+
+def report_alerts(monitor, min_rows=MIN_ALERT_ROWS, out=sys.stderr):
+    """Print drift alerts; returns them"""
+    alerts = monitor.alerts(min_rows)
+    for alert in alerts:
+        print(f"DRIFT ALERT {alert.message}", file=out)
+    return alerts
+
+
+def _format(value, spec):
+    if value is None:
+        return '-'.rjust(int(spec.split('.')[0].lstrip('+')))
+    return format(value, spec)
+
+
+def print_report(monitor, out=sys.stdout):
+    print(f"{'feature':>18} {'n':>10} {'mean':>9} {'std':>8} {'shift':>7} {'std x':>6} "
+          f"{'PSI':>7} {'KS':>6}  reference", file=out)
+    for row in monitor.report():
+        print(f"{row['feature']:>18} {row['n']:>10,} {_format(row['mean'], '9.3f')} "
+              f"{_format(row['std'], '8.3f')} {_format(row['mean_shift'], '+7.2f')} "
+              f"{_format(row['std_ratio'], '6.2f')} {_format(row['psi'], '7.3f')} "
+              f"{_format(row['ks'], '6.3f')}  {row['reference'] or '-'}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Input and score drift monitoring")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    observe = commands.add_parser('observe', help="Score a file and add it to a drift state")
+    observe.add_argument('source', help="CSV or Parquet file of raw customer records")
+    observe.add_argument('--state', required=True,
+                         help="Drift state JSON; created if missing, updated in place")
+    observe.add_argument('--backend', default=None,
+                         help="Scoring backend (default: $CHURN_SCORING_BACKEND or fast_svm)")
+    observe.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                         help="Directory holding the model artifacts")
+
+    merge = commands.add_parser('merge', help="Combine drift states of several shards")
+    merge.add_argument('states', nargs='+')
+    merge.add_argument('-o', '--output', required=True)
+
+    report = commands.add_parser('report', help="Print drift and alerts; exit 1 on alerts")
+    report.add_argument('state')
+    report.add_argument('--reference', default=None,
+                        help="Drift state recorded on known-good data to compare against")
+    report.add_argument('--min-rows', type=int, default=MIN_ALERT_ROWS,
+                        help="Rows needed before alerting (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'observe':
+        from churn_scoring.batch import read_chunks
+        from churn_scoring.core import get_scorer
+
+        monitor = open_monitor(args.state, args.artifact_dir)
+        scorer = get_scorer(args.backend, args.artifact_dir)
+        scorer.monitor = monitor
+        for chunk in read_chunks(args.source):
+            if not chunk.empty:
+                scorer.score_columns(chunk)
+        monitor.save(args.state)
+        print(f"{monitor.n:,} rows in {args.state}", file=sys.stderr)
+        return 0
+
+    if args.command == 'merge':
+        monitor = DriftMonitor.load(args.states[0])
+        for path in args.states[1:]:
+            monitor.merge(DriftMonitor.load(path))
+        monitor.save(args.output)
+        print(f"{monitor.n:,} rows in {args.output}", file=sys.stderr)
+        return 0
+
+    reference = DriftMonitor.load(args.reference) if args.reference else None
+    monitor = DriftMonitor.load(args.state, reference=reference)
+    print_report(monitor)
+    return 1 if report_alerts(monitor, args.min_rows, out=sys.stdout) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
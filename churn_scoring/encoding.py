@@ -0,0 +1,53 @@
+"""Vectorized encoding of raw customer records into model features.
+
+Raw records use the columns of the bank customer table the model was trained
+on (``Geography`` and ``Gender`` as strings, everything else numeric).  The
+encoding matches the ``input_data`` dict built by churn_prediction_app.py.
+"""
+import numpy as np
+import pandas as pd
+
+from churn_scoring.schema import GEOGRAPHIES, NUMERIC_COLUMNS, RAW_COLUMNS
+
+
+def _encode_flag(values, true_label):
+    """Map a Yes/No (or Male/Female) column to 0/1, passing numbers through"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    return (values == true_label).to_numpy(dtype=np.float64)
+
+
+def encode_customers(raw_df, feature_names):
+    """Encode a frame of raw customer records into the model's feature order"""
+    missing = [col for col in RAW_COLUMNS if col not in raw_df.columns]
+    if missing:
+        raise ValueError(f"Missing customer columns: {', '.join(missing)}")
+
+    encoded = {col: raw_df[col].to_numpy(dtype=np.float64) for col in NUMERIC_COLUMNS}
+    # Gender: Female = 0, Male = 1
+    encoded['Gender'] = _encode_flag(raw_df['Gender'], 'Male')
+    encoded['HasCrCard'] = _encode_flag(raw_df['HasCrCard'], 'Yes')
+    encoded['IsActiveMember'] = _encode_flag(raw_df['IsActiveMember'], 'Yes')
+
+    # One-hot geography; unknown countries get all zeros
+    geography = raw_df['Geography'].to_numpy()
+    for country in GEOGRAPHIES:
+        encoded[f'Geo_{country}'] = (geography == country).astype(np.float64)
+
+    return pd.DataFrame(encoded, index=raw_df.index)[feature_names]
+
+
+def scale_features(features_df, scaler):
+    """Apply the fitted scaler and return a float64 feature matrix.
+
+    The shipped scaler was fit on the continuous columns only, so only the
+    columns it knows about are scaled; the binary and one-hot columns are
+    passed through unchanged.
+    """
+    X = features_df.to_numpy(dtype=np.float64, copy=True)
+    scaled_names = getattr(scaler, 'feature_names_in_', None)
+    if scaled_names is None:
+        return scaler.transform(X)
+    columns = [features_df.columns.get_loc(name) for name in scaled_names]
+    X[:, columns] = scaler.transform(features_df[list(scaled_names)])
+    return X
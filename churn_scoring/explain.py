@@ -0,0 +1,261 @@
+"""Per-prediction feature attributions for the SVM.
+
+``SVMExplainer`` attributes a churn probability to the ten raw customer
+fields (the three Geo_* columns form one Geography group) relative to a
+background customer:
+
+* ``shapley`` computes exact Shapley values.  With ten groups there are
+  only 2^10 = 1024 coalitions, so every "customer with these fields,
+  background for the rest" row is built up front and scored in one batched
+  kernel evaluation (~20 ms with FastSVM) instead of sampling as kernel SHAP
+  would.  Attributions sum to p(customer) - p(background).
+* ``occlusion`` replaces one group at a time with the background: 11 rows
+  per customer, cheap enough for whole files.
+
+The default background is a single "average customer" derived from the
+model artifacts: the scaler mean for the scaled fields and, for the
+unscaled fields (products, flags, Geo_* shares), the mean over the support
+vectors, which make up most of the training set.  Explanations are cached
+per encoded customer vector.
+
+Usage (batch files):
+    python -m churn_scoring.explain customers.csv explained.csv --top-k 3
+
+The output keeps the input columns and adds the probability and label plus,
+for k = 1..top-k, ``TopFactor{k}`` (the field, e.g. ``Geography``) and
+``TopFactor{k}Impact`` (its signed change in churn probability), ordered by
+absolute impact.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from math import factorial
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.metrics import timed
+from churn_scoring.prediction import predict_churn
+from churn_scoring.schema import PREDICTION_COLUMN, PROBABILITY_COLUMN
+
+DEFAULT_CACHE_SIZE = 1024
+
+# Rows per predict call when explaining many customers
+DEFAULT_ROWS_PER_CALL = 8192
+
+METHODS = ('shapley', 'occlusion')
+
+# Display names of the attribution groups
+FIELD_LABELS = {
+    'CreditScore': 'Credit score',
+    'Gender': 'Gender',
+    'Age': 'Age',
+    'Tenure': 'Tenure',
+    'Balance': 'Balance',
+    'NumOfProducts': 'Products',
+    'HasCrCard': 'Has credit card',
+    'IsActiveMember': 'Active member',
+    'EstimatedSalary': 'Estimated salary',
+    'Geography': 'Country',
+}
+
+
+def typical_customer(pipeline, support_vectors):
+    """Scaled background row: scaler mean for scaled fields, SV mean for the rest"""
+    # Scaled fields sit at 0, the scaled value of the training mean
+    background = np.zeros(pipeline.n_features)
+    scaled = set(pipeline.scaled_names)
+    unscaled = [i for i, name in enumerate(pipeline.feature_names) if name not in scaled]
+    background[unscaled] = support_vectors[:, unscaled].mean(axis=0)
+    return background[None, :]
+
+
+def shapley_weights(n_players):
+    """(n_players, 2^n_players) matrix W with phi = W @ v over bitmask-ordered coalitions"""
+    n_coalitions = 1 << n_players
+    sizes = np.array([bin(mask).count('1') for mask in range(n_coalitions)])
+    weight = np.array([factorial(s) * factorial(n_players - s - 1) / factorial(n_players)
+                       for s in range(n_players)])
+    W = np.zeros((n_players, n_coalitions))
+    for i in range(n_players):
+        has_i = (np.arange(n_coalitions) >> i) & 1 == 1
+        W[i, has_i] = weight[sizes[has_i] - 1]
+        W[i, ~has_i] = -weight[sizes[~has_i]]
+    return W
+
+
+class SVMExplainer:
+    """Shapley / occlusion attributions for a model fed by a ``FeaturePipeline``"""
+
+    def __init__(self, model, pipeline, background=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.model = model
+        self.pipeline = pipeline
+        groups = pipeline.feature_groups()
+        self.group_names = list(groups)
+        self.n_groups = len(groups)
+        if background is None:
+            support_vectors = getattr(model, 'support_vectors', None)
+            if support_vectors is None:
+                support_vectors = model.support_vectors_
+            background = typical_customer(pipeline, support_vectors)
+        self.background = np.atleast_2d(np.asarray(background, dtype=np.float64))
+
+        # Feature-level coalition masks: row s keeps the customer's value for
+        # every feature whose group is in coalition s
+        n_coalitions = 1 << self.n_groups
+        group_of = np.empty(pipeline.n_features, dtype=np.intp)
+        for g, indices in enumerate(groups.values()):
+            group_of[indices] = g
+        self._group_of = group_of
+        self._coalition_mask = ((np.arange(n_coalitions)[:, None] >> group_of[None, :]) & 1) == 1
+        self._weights = shapley_weights(self.n_groups)
+
+        self.cache_size = int(cache_size)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _predict(self, Z):
+        probabilities = np.empty(len(Z))
+        for start in range(0, len(Z), DEFAULT_ROWS_PER_CALL):
+            stop = start + DEFAULT_ROWS_PER_CALL
+            probabilities[start:stop] = predict_churn(self.model, Z[start:stop])[0]
+        return probabilities
+
+    def shapley_values(self, X):
+        """Exact Shapley values, shape (n_rows, n_groups), and background probability"""
+        X = np.atleast_2d(X)
+        if len(X) == 0:
+            return np.zeros((0, self.n_groups)), float(self._predict(self.background).mean())
+        n_coalitions = self._coalition_mask.shape[0]
+        rows_per_pass = max(1, DEFAULT_ROWS_PER_CALL // n_coalitions)
+        phi = np.zeros((len(X), self.n_groups))
+        base = 0.0
+        for b in self.background:
+            for start in range(0, len(X), rows_per_pass):
+                chunk = X[start:start + rows_per_pass]
+                # Every coalition row of these customers, scored in one pass
+                Z = np.where(self._coalition_mask[None, :, :], chunk[:, None, :], b[None, None, :])
+                v = self._predict(Z.reshape(-1, X.shape[1])).reshape(len(chunk), n_coalitions)
+                phi[start:start + rows_per_pass] += v @ self._weights.T
+            base += v[0, 0]
+        return phi / len(self.background), base / len(self.background)
+
+    def occlusion_values(self, X):
+        """p(x) - p(x with one group set to the background), shape (n_rows, n_groups)"""
+        X = np.atleast_2d(X)
+        n_rows, n_features = X.shape
+        probability = self._predict(X)
+        values = np.zeros((n_rows, self.n_groups))
+        for b in self.background:
+            Z = np.repeat(X[:, None, :], self.n_groups, axis=1)
+            for g in range(self.n_groups):
+                columns = self._group_of == g
+                Z[:, g, columns] = b[columns]
+            occluded = self._predict(Z.reshape(-1, n_features)).reshape(n_rows, self.n_groups)
+            values += probability[:, None] - occluded
+        return values / len(self.background), probability
+
+    def explain_record(self, record):
+        """Shapley attributions for one raw record as a list of dicts, largest first.
+
+        Each dict carries ``field``, ``label``, ``value`` (raw) and
+        ``contribution`` (change in churn probability vs the background).
+        """
+        x = self.pipeline.transform_record(record)[0].copy()
+        key = x.tobytes()
+        with self._lock:
+            phi = self._cache.get(key)
+            if phi is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        if phi is None:
+            with timed('explain'):
+                phi = self.shapley_values(x)[0][0]
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = phi
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        order = np.argsort(-np.abs(phi))
+        return [
+            {
+                'field': self.group_names[g],
+                'label': FIELD_LABELS.get(self.group_names[g], self.group_names[g]),
+                'value': record[self.group_names[g]],
+                'contribution': float(phi[g]),
+            }
+            for g in order
+        ]
+
+    def top_contributors(self, X, top_k=3, method='occlusion'):
+        """(group indices, contributions) of the ``top_k`` largest |attributions| per row"""
+        if method not in METHODS:
+            raise ValueError(f"Unknown attribution method {method!r}; choose one of {METHODS}")
+        values = self.shapley_values(X)[0] if method == 'shapley' else self.occlusion_values(X)[0]
+        top_k = min(top_k, self.n_groups)
+        order = np.argsort(-np.abs(values), axis=1)[:, :top_k]
+        return order, np.take_along_axis(values, order, axis=1)
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._cache), 'hits': self.hits, 'misses': self.misses}
+
+
+def explain_chunks(chunks, explainer, top_k=3, method='occlusion'):
+    """Score and explain raw chunks, adding probability and top-factor columns"""
+    names = np.array(explainer.group_names, dtype=object)
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        X = explainer.pipeline.transform_columns(chunk).copy()
+        probabilities, labels = predict_churn(explainer.model, X)
+        order, contributions = explainer.top_contributors(X, top_k, method)
+        explained = chunk.copy()
+        explained[PROBABILITY_COLUMN] = probabilities
+        explained[PREDICTION_COLUMN] = labels
+        for k in range(order.shape[1]):
+            explained[f'TopFactor{k + 1}'] = names[order[:, k]]
+            explained[f'TopFactor{k + 1}Impact'] = contributions[:, k]
+        yield explained
+
+
+def main(argv=None):
+    from churn_scoring.batch import DEFAULT_CHUNK_SIZE, read_chunks, write_chunks
+    from churn_scoring.core import get_scorer
+
+    parser = argparse.ArgumentParser(description="Explain churn predictions for a customer file")
+    parser.add_argument('source', help="Input CSV or Parquet file of raw customer records")
+    parser.add_argument('destination', help="Output CSV or Parquet file")
+    parser.add_argument('--top-k', type=int, default=3,
+                        help="Attributions kept per customer (default: %(default)s)")
+    parser.add_argument('--method', choices=METHODS, default='occlusion',
+                        help="occlusion (11 evaluations/row) or exact shapley (1024/row)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE // 10,
+                        help="Rows explained per chunk (default: %(default)s)")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the model artifacts")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.source) == os.path.abspath(args.destination):
+        parser.error("source and destination must be different files")
+
+    backend = get_scorer('fast_svm', args.artifact_dir).backend
+    explainer = SVMExplainer(backend.model, backend.pipeline)
+    start = time.perf_counter()
+    rows = write_chunks(
+        explain_chunks(read_chunks(args.source, args.chunk_size), explainer,
+                       args.top_k, args.method),
+        args.destination)
+    elapsed = time.perf_counter() - start
+    print(f"Explained {rows:,} rows in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/sec)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
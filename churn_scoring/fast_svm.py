@@ -0,0 +1,330 @@
+"""Compiled NumPy inference engine for the pickled RBF SVC.
+
+``FastSVM`` is built once from a fitted ``sklearn.svm.SVC`` and evaluates
+the RBF decision function as blocked matrix products::
+
+    ||x - sv||^2 = ||x||^2 + ||sv||^2 - 2 x . sv
+
+with the support-vector norms precomputed, so each block of rows costs one
+GEMM plus an in-place ``exp``.  Probabilities reproduce libsvm's Platt
+scaling and pairwise coupling, so ``predict_proba`` matches the sklearn
+model to floating-point precision and the engine can be passed anywhere a
+model is expected (e.g. ``predict_churn``).
+
+``FastSVM.pruned`` builds an approximate engine from a reduced support-vector
+set, refitting the kept coefficients so the reduced expansion tracks the full
+decision function; ``accuracy_delta`` reports how far it drifts from the
+exact probabilities.
+
+``FastSVM.reduced`` builds a ``ReducedPrecisionSVM``.  It evaluates the
+kernel in float32 (``'float32'``), additionally reading the scaled inputs as
+int8 codes with a per-feature quantization step (``'int8'``).  Both are
+approximations; ``churn_scoring.precision`` validates them before use.
+"""
+import numpy as np
+
+# Rows scored per GEMM block; keeps the kernel block around 10 MB
+DEFAULT_BLOCK_SIZE = 256
+
+# libsvm clamps pairwise probabilities to [MIN_PROB, 1 - MIN_PROB]
+MIN_PROB = 1e-7
+MAX_COUPLING_ITER = 100
+
+# Ridge penalty (per fitting point) used when refitting a pruned expansion
+PRUNE_RIDGE = 1e-6
+
+REDUCED_PRECISIONS = ('float32', 'int8')
+INT8_MAX = 127
+
+
+def _sigmoid_predict(dec_values, prob_a, prob_b):
+    """libsvm's numerically stable Platt sigmoid 1 / (1 + exp(A*f + B))"""
+    f_ab = dec_values * prob_a + prob_b
+    out = np.empty_like(f_ab)
+    pos = f_ab >= 0
+    exp_pos = np.exp(-f_ab[pos])
+    out[pos] = exp_pos / (1.0 + exp_pos)
+    out[~pos] = 1.0 / (1.0 + np.exp(f_ab[~pos]))
+    return out
+
+
+def _couple_pairwise(r01):
+    """Vectorized libsvm multiclass_probability for two classes.
+
+    libsvm does not return the clamped sigmoid directly: it runs its iterative
+    pairwise-coupling solver, which stops at a tolerance of 0.005 / k.  The
+    iteration is replicated here so the output matches ``predict_proba``.
+    Returns the probability of the second class (the churn class).
+    """
+    r10 = 1.0 - r01
+    q00 = r10 * r10
+    q11 = r01 * r01
+    q01 = -r10 * r01
+    p0 = np.full_like(r01, 0.5)
+    p1 = np.full_like(r01, 0.5)
+    active = np.ones(r01.shape, dtype=bool)
+    eps = 0.005 / 2
+
+    for _ in range(MAX_COUPLING_ITER):
+        qp0 = q00 * p0 + q01 * p1
+        qp1 = q01 * p0 + q11 * p1
+        pqp = p0 * qp0 + p1 * qp1
+        error = np.maximum(np.abs(qp0 - pqp), np.abs(qp1 - pqp))
+        active &= error >= eps
+        if not active.any():
+            break
+
+        # Update p0 then p1, only for rows that have not converged yet
+        diff = np.where(active, (pqp - qp0) / q00, 0.0)
+        p0 = p0 + diff
+        pqp = (pqp + diff * (diff * q00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp0, qp1 = (qp0 + diff * q00) / (1 + diff), (qp1 + diff * q01) / (1 + diff)
+        p0, p1 = p0 / (1 + diff), p1 / (1 + diff)
+
+        diff = np.where(active, (pqp - qp1) / q11, 0.0)
+        p1 = p1 + diff
+        pqp = (pqp + diff * (diff * q11 + 2 * qp1)) / (1 + diff) / (1 + diff)
+        qp0, qp1 = (qp0 + diff * q01) / (1 + diff), (qp1 + diff * q11) / (1 + diff)
+        p0, p1 = p0 / (1 + diff), p1 / (1 + diff)
+
+    return p1
+
+
+def probability_from_decision(decision, prob_a, prob_b):
+    """Churn probability from sklearn-convention decision values"""
+    # sklearn flips the sign of libsvm's binary decision values
+    r01 = _sigmoid_predict(-np.asarray(decision, dtype=np.float64), prob_a, prob_b)
+    r01 = np.clip(r01, MIN_PROB, 1 - MIN_PROB)
+    return _couple_pairwise(r01)
+
+
+def platt_params(model):
+    """Return the (probA, probB) sigmoid parameters of a binary SVC"""
+    # The public probA_/probB_ properties are deprecated in newer sklearn
+    prob_a = getattr(model, '_probA', None)
+    prob_b = getattr(model, '_probB', None)
+    if prob_a is None or prob_b is None:
+        prob_a, prob_b = model.probA_, model.probB_
+    if len(prob_a) != 1:
+        raise ValueError("Only binary SVC models with probability=True are supported")
+    return float(prob_a[0]), float(prob_b[0])
+
+
+class _PlattEngine:
+    """Shared probability output for engines exposing ``decision_function``"""
+
+    def predict_proba(self, X):
+        """Return an (n, 2) array of [stay, churn] probabilities like sklearn"""
+        churn = probability_from_decision(self.decision_function(X), self.prob_a, self.prob_b)
+        return np.column_stack((1.0 - churn, churn))
+
+    def predict(self, X):
+        """Return 0/1 labels from the sign of the decision function"""
+        return (self.decision_function(X) > 0).astype(np.int64)
+
+
+class FastSVM(_PlattEngine):
+    """Blocked-GEMM evaluation of a binary RBF SVC"""
+
+    def __init__(self, support_vectors, dual_coef, intercept, gamma, prob_a, prob_b,
+                 block_size=DEFAULT_BLOCK_SIZE, sv_sq_norms=None, support_vectors_t=None):
+        self.support_vectors = np.ascontiguousarray(support_vectors, dtype=np.float64)
+        self.dual_coef = np.ascontiguousarray(dual_coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        self.gamma = float(gamma)
+        self.prob_a = float(prob_a)
+        self.prob_b = float(prob_b)
+        self.block_size = int(block_size)
+        if self.support_vectors.shape[0] != self.dual_coef.shape[0]:
+            raise ValueError("support_vectors and dual_coef lengths differ")
+        # Precomputed once: squared norms and the transposed support vectors.
+        # A model bundle stores both, so a memory-mapped engine copies nothing.
+        if sv_sq_norms is None:
+            sv_sq_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        if support_vectors_t is None:
+            support_vectors_t = self.support_vectors.T
+        self._sv_sq_norms = np.ascontiguousarray(sv_sq_norms, dtype=np.float64)
+        self._sv_t = np.ascontiguousarray(support_vectors_t, dtype=np.float64)
+
+    @classmethod
+    def from_model(cls, model, block_size=DEFAULT_BLOCK_SIZE):
+        """Build the engine from a fitted binary ``SVC(kernel='rbf', probability=True)``"""
+        if model.kernel != 'rbf':
+            raise ValueError(f"Only RBF kernels are supported, got {model.kernel!r}")
+        if len(model.classes_) != 2:
+            raise ValueError("Only binary classifiers are supported")
+        prob_a, prob_b = platt_params(model)
+        return cls(model.support_vectors_, model.dual_coef_[0], model.intercept_[0],
+                   model._gamma, prob_a, prob_b, block_size=block_size)
+
+    @property
+    def n_support(self):
+        return self.support_vectors.shape[0]
+
+    @property
+    def n_features_in_(self):
+        return self.support_vectors.shape[1]
+
+    def decision_function(self, X):
+        """Signed distance to the margin; positive means churn"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows = X.shape[0]
+        out = np.empty(n_rows, dtype=np.float64)
+        block_size = min(self.block_size, max(n_rows, 1))
+        kernel = np.empty((block_size, self.n_support), dtype=np.float64)
+
+        for start in range(0, n_rows, block_size):
+            block = X[start:start + block_size]
+            k = kernel[:block.shape[0]]
+            # k = exp(-gamma * (||x||^2 + ||sv||^2 - 2 x.sv)), built in place
+            np.matmul(block, self._sv_t, out=k)
+            k *= -2.0
+            k += self._sv_sq_norms
+            k += np.einsum('ij,ij->i', block, block)[:, None]
+            np.maximum(k, 0.0, out=k)
+            k *= -self.gamma
+            np.exp(k, out=k)
+            np.matmul(k, self.dual_coef, out=out[start:start + block.shape[0]])
+
+        out += self.intercept
+        return out
+
+    def _kernel(self, X, support_vectors):
+        sq_dist = (np.einsum('ij,ij->i', X, X)[:, None]
+                   + np.einsum('ij,ij->i', support_vectors, support_vectors)[None, :]
+                   - 2.0 * X @ support_vectors.T)
+        return np.exp(-self.gamma * np.maximum(sq_dist, 0.0))
+
+    def pruned(self, keep, ridge=PRUNE_RIDGE):
+        """Approximate engine on a reduced support-vector set.
+
+        ``keep`` is either a fraction in (0, 1] or an absolute count.  The
+        support vectors with the largest |dual_coef| are kept and their
+        coefficients are refit by ridge least squares so the reduced expansion
+        matches the full decision function on the original support vectors.
+        Simply dropping the others would bias the class-weighted model.
+        """
+        n_keep = int(round(keep * self.n_support)) if keep <= 1 else int(keep)
+        n_keep = min(max(n_keep, 1), self.n_support)
+        if n_keep == self.n_support:
+            # Nothing to drop; a ridge refit would only perturb the exact expansion
+            return self
+        order = np.argsort(-np.abs(self.dual_coef), kind='stable')[:n_keep]
+        order.sort()
+        kept = self.support_vectors[order]
+
+        target = self.decision_function(self.support_vectors) - self.intercept
+        design = self._kernel(self.support_vectors, kept)
+        gram = design.T @ design
+        gram[np.diag_indices_from(gram)] += ridge * self.n_support
+        coef = np.linalg.solve(gram, design.T @ target)
+        return FastSVM(kept, coef, self.intercept, self.gamma, self.prob_a, self.prob_b,
+                       block_size=self.block_size)
+
+    def reduced(self, precision='float32', steps=None):
+        """Approximate engine evaluated in float32, optionally on int8 inputs.
+
+        ``steps`` (int8 only) is the per-feature quantization step in scaled
+        units: feature j is stored as ``round(x_j / steps[j])`` clipped to
+        +-127.
+        """
+        return ReducedPrecisionSVM(self, precision, steps)
+
+
+class ReducedPrecisionSVM(_PlattEngine):
+    """Float32 (or int8-quantized float32) evaluation of a ``FastSVM``.
+
+    The kernel block, support vectors and dual coefficients are float32,
+    halving the memory traffic of the exact engine.  In int8 mode the inputs
+    are quantized to int8 codes and decoded a block at a time, so callers
+    may also pass pre-quantized matrices from ``quantize``.  The support
+    vectors stay float32: quantizing them shifts every kernel value the same
+    way and the errors add up over thousands of support vectors.  Decision
+    values are returned as float64.
+    """
+
+    def __init__(self, engine, precision='float32', steps=None):
+        if precision not in REDUCED_PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}; "
+                             f"choose one of {', '.join(REDUCED_PRECISIONS)}")
+        if precision == 'int8' and steps is None:
+            raise ValueError("int8 precision needs per-feature quantization steps")
+        self.precision = precision
+        self.intercept = engine.intercept
+        self.gamma = engine.gamma
+        self.prob_a = engine.prob_a
+        self.prob_b = engine.prob_b
+        self.block_size = engine.block_size
+        self.dual_coef = engine.dual_coef.astype(np.float32)
+        self.steps = None
+        if precision == 'int8':
+            self.steps = np.asarray(steps, dtype=np.float32)
+            if self.steps.shape != (engine.n_features_in_,) or np.any(self.steps <= 0):
+                raise ValueError("steps must hold one positive step per feature")
+        support_vectors = engine.support_vectors.astype(np.float32)
+        self.support_vectors = support_vectors
+        self._sv_t = np.ascontiguousarray(support_vectors.T)
+        self._sv_sq_norms = np.einsum('ij,ij->i', support_vectors, support_vectors)
+
+    @property
+    def n_support(self):
+        return self.support_vectors.shape[0]
+
+    @property
+    def n_features_in_(self):
+        return self.support_vectors.shape[1]
+
+    def quantize(self, X):
+        """int8 codes of scaled features ``X`` (int8 mode only)"""
+        codes = np.rint(np.asarray(X, dtype=np.float32) / self.steps)
+        np.clip(codes, -INT8_MAX, INT8_MAX, out=codes)
+        return codes.astype(np.int8)
+
+    def dequantize(self, codes):
+        return codes.astype(np.float32) * self.steps
+
+    def decision_function(self, X):
+        """Signed distance to the margin; positive means churn"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows = X.shape[0]
+        out = np.empty(n_rows, dtype=np.float64)
+        block_size = min(self.block_size, max(n_rows, 1))
+        kernel = np.empty((block_size, self.n_support), dtype=np.float32)
+        scores = np.empty(block_size, dtype=np.float32)
+        gamma = np.float32(-self.gamma)
+
+        for start in range(0, n_rows, block_size):
+            block = X[start:start + block_size]
+            if self.precision == 'int8':
+                block = self.dequantize(block if block.dtype == np.int8 else self.quantize(block))
+            else:
+                block = block.astype(np.float32)
+            k = kernel[:block.shape[0]]
+            np.matmul(block, self._sv_t, out=k)
+            k *= np.float32(-2.0)
+            k += self._sv_sq_norms
+            k += np.einsum('ij,ij->i', block, block)[:, None]
+            np.maximum(k, np.float32(0.0), out=k)
+            k *= gamma
+            np.exp(k, out=k)
+            np.matmul(k, self.dual_coef, out=scores[:block.shape[0]])
+            out[start:start + block.shape[0]] = scores[:block.shape[0]]
+
+        out += self.intercept
+        return out
+
+
+def accuracy_delta(reference, candidate, X):
+    """Compare two engines' churn probabilities and 0.5-threshold labels on ``X``"""
+    expected = reference.predict_proba(X)[:, 1]
+    actual = candidate.predict_proba(X)[:, 1]
+    error = np.abs(actual - expected)
+    return {
+        'max_abs_error': float(error.max()),
+        'mean_abs_error': float(error.mean()),
+        'label_agreement': float(np.mean((actual > 0.5) == (expected > 0.5))),
+    }
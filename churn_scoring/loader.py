@@ -0,0 +1,59 @@
+"""Background loading of model resources for fast app startup.
+
+Unpickling the SVC pulls in sklearn and pandas and takes most of a second,
+which used to delay the first paint of the apps.  ``BackgroundLoader`` runs
+the load on a daemon thread as soon as a process starts, so the form renders
+immediately; the first prediction waits on ``result()`` only if the user
+submits before loading finishes.
+
+Set ``$CHURN_EAGER_LOAD=1`` to load in the calling thread instead (the old
+blocking behaviour, e.g. to fail fast on broken artifacts).
+"""
+import os
+import threading
+import time
+
+EAGER_ENV_VAR = 'CHURN_EAGER_LOAD'
+
+
+def eager_loading():
+    return os.environ.get(EAGER_ENV_VAR, '') not in ('', '0')
+
+
+class BackgroundLoader:
+    """Runs ``load`` once on a daemon thread; ``result()`` waits for its value"""
+
+    def __init__(self, load, name='churn-loader', background=None):
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+        self.elapsed = None
+        if background is None:
+            background = not eager_loading()
+        if background:
+            threading.Thread(target=self._run, args=(load,), name=name, daemon=True).start()
+        else:
+            self._run(load)
+
+    def _run(self, load):
+        start = time.perf_counter()
+        try:
+            self._value = load()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self._done.set()
+
+    @property
+    def ready(self):
+        """True once loading has finished, successfully or not"""
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """The loaded value; re-raises the load's exception"""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Model resources are still loading")
+        if self._error is not None:
+            raise self._error
+        return self._value
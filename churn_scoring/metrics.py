@@ -0,0 +1,214 @@
+"""In-process per-stage latency histograms for the scoring hot path.
+
+Code on the hot path wraps each step in ``timed(stage)``:
+
+    with timed('encode'):
+        X = pipeline.transform_columns(columns)
+
+When instrumentation is disabled (the default) ``timed`` returns a shared
+no-op context manager, so the cost is one attribute check per stage.  It is
+enabled by ``$CHURN_METRICS=1`` or ``METRICS.enable()``.
+
+Every stage keeps cumulative Prometheus-style bucket counts plus a window of
+recent samples for p50/p95/p99.  ``to_prometheus()`` / ``to_json()`` export
+them, and setting ``$CHURN_METRICS_PORT`` serves both on localhost
+(``/metrics`` and ``/metrics.json``) for a local scraper.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01,
+           0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Recent samples kept per stage for percentiles
+DEFAULT_WINDOW = 1024
+
+PERCENTILES = (50, 95, 99)
+
+_NULL_TIMER = nullcontext()
+
+
+class StageHistogram:
+    """Bucket counts, sum and a recent-sample window for one stage"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def percentiles(self):
+        """Recent p50/p95/p99 in seconds (nearest-rank), or None when empty"""
+        if not self.recent:
+            return None
+        samples = sorted(self.recent)
+        return {
+            p: samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+            for p in PERCENTILES
+        }
+
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class StageMetrics:
+    """Thread-safe registry of per-stage histograms"""
+
+    def __init__(self, enabled=False, window=DEFAULT_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.environ.get('CHURN_METRICS', '') not in ('', '0'))
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def timed(self, stage):
+        """Context manager timing one execution of ``stage``"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = StageHistogram(self.window)
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def summary(self):
+        """Per-stage count, mean and recent percentiles, in milliseconds"""
+        with self._lock:
+            rows = []
+            for stage, histogram in self._stages.items():
+                row = {'stage': stage, 'count': histogram.count,
+                       'mean_ms': 1000 * histogram.total / histogram.count}
+                for p, seconds in histogram.percentiles().items():
+                    row[f'p{p}_ms'] = 1000 * seconds
+                rows.append(row)
+            return rows
+
+    def to_json(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'sum_seconds': h.total,
+                    'buckets': dict(zip([*map(str, BUCKETS), '+Inf'], _cumulative(h.counts))),
+                    'recent_percentiles_seconds': {
+                        f'p{p}': v for p, v in (h.percentiles() or {}).items()
+                    },
+                }
+                for stage, h in self._stages.items()
+            }
+        return json.dumps({'enabled': self.enabled, 'stages': stages})
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (one histogram family)"""
+        lines = [
+            '# HELP churn_stage_seconds Time spent in each churn scoring stage',
+            '# TYPE churn_stage_seconds histogram',
+        ]
+        with self._lock:
+            for stage, h in sorted(self._stages.items()):
+                for bound, count in zip([*map(repr, BUCKETS), '+Inf'], _cumulative(h.counts)):
+                    lines.append(f'churn_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'churn_stage_seconds_sum{{stage="{stage}"}} {h.total!r}')
+                lines.append(f'churn_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _cumulative(counts):
+    total = 0
+    out = []
+    for count in counts:
+        total += count
+        out.append(total)
+    return out
+
+
+METRICS = StageMetrics.from_env()
+
+
+def timed(stage):
+    """``METRICS.timed(stage)``"""
+    return METRICS.timed(stage)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = METRICS
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, content_type = self.metrics.to_prometheus(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body, content_type = self.metrics.to_json(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port, host='127.0.0.1'):
+    """Serve /metrics and /metrics.json from a daemon thread (once per process)"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='metrics-exporter',
+                             daemon=True).start()
+    return _server
+
+
+def serve_metrics_from_env():
+    """Start the exporter when $CHURN_METRICS_PORT is set; returns the server or None"""
+    port = os.environ.get('CHURN_METRICS_PORT')
+    return serve_metrics(port) if port else None
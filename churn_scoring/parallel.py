@@ -0,0 +1,141 @@
+"""Multi-core scoring over a process pool.
+
+SVC kernel evaluation runs on one core, so ``ParallelScorer`` shards the
+rows of a scaled feature matrix across worker processes.  Each worker loads
+the model once, in its initializer, and keeps a ``FastSVM`` engine for its
+lifetime.  Given a model bundle, workers memory-map it instead of
+unpickling, so all of them share one copy of the support vectors.  Tasks
+only carry row ranges: the input matrix and the output probabilities live
+in shared memory, so rows are never pickled and results land in input
+order.
+
+``ParallelScorer`` exposes ``predict_proba`` and can be used anywhere a
+model is expected, e.g. ``score_file(..., model=ParallelScorer(8), ...)``.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR, load_artifacts
+from churn_scoring.bundle import load_bundle
+from churn_scoring.fast_svm import FastSVM
+
+# Smallest shard worth sending to a worker
+MIN_ROWS_PER_TASK = 512
+# Shards per worker, so faster workers pick up the slack
+TASKS_PER_WORKER = 4
+
+# Per-process state of a pool worker
+_worker_engine = None
+
+
+def _init_worker(artifact_dir, bundle_path):
+    """Load the model once per worker and pin BLAS to one thread"""
+    global _worker_engine
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+    if bundle_path is not None:
+        _worker_engine = load_bundle(bundle_path).engine()
+    else:
+        model, _, _ = load_artifacts(artifact_dir)
+        _worker_engine = FastSVM.from_model(model)
+
+
+def _ping(delay):
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _score_range(input_name, output_name, shape, start, stop):
+    """Score rows [start, stop) of the shared input into the shared output"""
+    shm_in = SharedMemory(name=input_name)
+    shm_out = SharedMemory(name=output_name)
+    X = out = None
+    try:
+        X = np.ndarray(shape, dtype=np.float64, buffer=shm_in.buf)
+        out = np.ndarray((shape[0],), dtype=np.float64, buffer=shm_out.buf)
+        out[start:stop] = _worker_engine.predict_proba(X[start:stop])[:, 1]
+    finally:
+        # Views must be released before the segments can be closed
+        del X, out
+        shm_in.close()
+        shm_out.close()
+    return stop - start
+
+
+class ParallelScorer:
+    """Process pool scoring scaled feature matrices in parallel"""
+
+    def __init__(self, n_workers=None, artifact_dir=ARTIFACT_DIR, bundle_path=None,
+                 min_rows_per_task=MIN_ROWS_PER_TASK):
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.min_rows_per_task = int(min_rows_per_task)
+        # spawn: forking a process that already runs BLAS/Streamlit threads is unsafe
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(artifact_dir, bundle_path),
+        )
+
+    def _ranges(self, n_rows):
+        n_tasks = max(1, min(self.n_workers * TASKS_PER_WORKER,
+                             n_rows // self.min_rows_per_task))
+        bounds = np.linspace(0, n_rows, n_tasks + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def warm_up(self, timeout=120):
+        """Start every worker and load its model before the first real batch"""
+        deadline = time.time() + timeout
+        seen = set()
+        while len(seen) < self.n_workers and time.time() < deadline:
+            seen.update(self._pool.map(_ping, [0.05] * self.n_workers))
+
+    def predict_proba(self, X):
+        """Return an (n, 2) array of [stay, churn] probabilities like sklearn"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_rows = X.shape[0]
+        if n_rows == 0:
+            return np.empty((0, 2))
+
+        segments = []
+        shared_X = None
+        try:
+            # Created inside the try so a failure on the second one frees the first
+            shm_in = SharedMemory(create=True, size=X.nbytes)
+            segments.append(shm_in)
+            shm_out = SharedMemory(create=True, size=n_rows * 8)
+            segments.append(shm_out)
+            shared_X = np.ndarray(X.shape, dtype=np.float64, buffer=shm_in.buf)
+            shared_X[:] = X
+            futures = [
+                self._pool.submit(_score_range, shm_in.name, shm_out.name, X.shape, a, b)
+                for a, b in self._ranges(n_rows)
+            ]
+            for future in futures:
+                future.result()
+            churn = np.ndarray((n_rows,), dtype=np.float64, buffer=shm_out.buf).copy()
+        finally:
+            # A live view of the segment would make close() raise BufferError
+            # and hide the original error
+            del shared_X
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+        return np.column_stack((1.0 - churn, churn))
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
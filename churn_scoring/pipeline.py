@@ -0,0 +1,243 @@
+"""Precompiled feature pipeline: raw customer fields straight to scaled floats.
+
+``FeaturePipeline`` is built once from the fitted scaler and the model's
+feature order.  It compiles the Gender/flag mapping, the Geo_* one-hot
+columns and the scaler's mean/scale into per-column specs and writes raw
+records directly into a contiguous float64 buffer, skipping the dict ->
+DataFrame -> reindex -> ``scaler.transform`` chain.  The result is identical
+to ``scale_features(encode_customers(...))``.  ``transform_arrow`` does the
+same from Arrow record batches (see churn_scoring.columnar).
+
+The returned arrays are views of a per-thread buffer that is reused by the
+next call on the same thread; copy them if they must outlive that call.
+"""
+import threading
+
+import numpy as np
+
+from churn_scoring.schema import GEOGRAPHIES, RAW_COLUMNS
+
+# Column kinds
+_NUMERIC = 'numeric'
+_FLAG = 'flag'
+_ONE_HOT = 'one_hot'
+
+# Raw value that maps to 1 for the binary columns
+_FLAG_TRUE_LABELS = {
+    'Gender': 'Male',
+    'HasCrCard': 'Yes',
+    'IsActiveMember': 'Yes',
+}
+
+DEFAULT_CAPACITY = 1024
+
+
+def _compile_column(name):
+    """Return (raw column, kind, argument) producing model feature ``name``"""
+    if name.startswith('Geo_') and name[len('Geo_'):] in GEOGRAPHIES:
+        return 'Geography', _ONE_HOT, name[len('Geo_'):]
+    if name in _FLAG_TRUE_LABELS:
+        return name, _FLAG, _FLAG_TRUE_LABELS[name]
+    if name in RAW_COLUMNS:
+        return name, _NUMERIC, None
+    raise ValueError(f"Don't know how to build feature {name!r} from customer records")
+
+
+class FeaturePipeline:
+    """Raw customer records -> scaled model feature matrix"""
+
+    def __init__(self, scaler, feature_names, capacity=DEFAULT_CAPACITY):
+        scaled_names = getattr(scaler, 'feature_names_in_', None)
+        if scaled_names is None:
+            scaled_names = feature_names
+        self._setup(feature_names, scaled_names, scaler.mean_, scaler.scale_, capacity)
+
+    @classmethod
+    def from_stats(cls, feature_names, scaled_names, mean, scale, capacity=DEFAULT_CAPACITY):
+        """Build the pipeline from raw scaler statistics instead of a fitted scaler"""
+        pipeline = cls.__new__(cls)
+        pipeline._setup(feature_names, scaled_names, mean, scale, capacity)
+        return pipeline
+
+    def _setup(self, feature_names, scaled_names, mean, scale, capacity):
+        self.feature_names = list(feature_names)
+        self.scaled_names = list(scaled_names)
+        self._specs = [_compile_column(name) for name in self.feature_names]
+        self._capacity = int(capacity)
+        self._local = threading.local()
+
+        # Columns the scaler was not fit on pass through as (x - 0) / 1
+        n_features = len(self.feature_names)
+        self._mean = np.zeros(n_features)
+        self._scale = np.ones(n_features)
+        positions = [self.feature_names.index(name) for name in self.scaled_names]
+        self._mean[positions] = mean
+        self._scale[positions] = scale
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def feature_groups(self):
+        """Model feature indices per raw column, in first-feature order"""
+        groups = {}
+        for i, (column, _, _) in enumerate(self._specs):
+            groups.setdefault(column, []).append(i)
+        return groups
+
+    def _buffer(self, n_rows):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or buffer.shape[0] < n_rows:
+            buffer = np.empty((max(n_rows, self._capacity), self.n_features), dtype=np.float64)
+            self._local.buffer = buffer
+        return buffer[:n_rows]
+
+    def transform_record(self, record):
+        """Encode and scale one raw record (a mapping) into a (1, n_features) view"""
+        out = self._buffer(1)
+        row = out[0]
+        for i, (column, kind, argument) in enumerate(self._specs):
+            value = record[column]
+            if kind == _NUMERIC:
+                row[i] = value
+            elif kind == _FLAG:
+                row[i] = value == argument if isinstance(value, str) else value
+            else:
+                row[i] = value == argument
+        row -= self._mean
+        row /= self._scale
+        return out
+
+    def transform_columns(self, columns):
+        """Encode and scale struct-of-arrays input into an (n_rows, n_features) view.
+
+        ``columns`` maps raw column names to equal-length arrays; a DataFrame
+        works as well.
+        """
+        missing = [col for col in RAW_COLUMNS if col not in columns]
+        if missing:
+            raise ValueError(f"Missing customer columns: {', '.join(missing)}")
+
+        arrays = {}
+        for column, kind, _ in self._specs:
+            if column not in arrays:
+                arrays[column] = np.asarray(columns[column])
+        n_rows = len(next(iter(arrays.values()))) if arrays else 0
+        out = self._buffer(n_rows)
+
+        for i, (column, kind, argument) in enumerate(self._specs):
+            values = arrays[column]
+            if kind == _NUMERIC or (kind == _FLAG and values.dtype.kind in 'biuf'):
+                out[:, i] = values
+            else:
+                out[:, i] = values == argument
+        out -= self._mean
+        out /= self._scale
+        return out
+
+    def transform_arrow(self, data, out=None):
+        """Encode and scale an Arrow RecordBatch or Table into an (n_rows, n_features) view.
+
+        Only the columns the model needs are read, straight from the Arrow
+        buffers and chunk by chunk: numeric columns are converted into the
+        output columns, and Gender, the flags and the Geo_* one-hot columns
+        are looked up from dictionary codes (plain string columns are
+        dictionary-encoded once).  Nulls encode like NaN in
+        ``transform_columns``.  ``out`` is an optional preallocated float64
+        array with at least ``num_rows`` rows; by default the per-thread
+        buffer is used.
+        """
+        missing = [col for col in RAW_COLUMNS if col not in data.schema.names]
+        if missing:
+            raise ValueError(f"Missing customer columns: {', '.join(missing)}")
+
+        n_rows = data.num_rows
+        if out is None:
+            out = self._buffer(n_rows)
+        else:
+            if out.dtype != np.float64 or out.ndim != 2 or out.shape[1] != self.n_features \
+                    or out.shape[0] < n_rows:
+                raise ValueError(f"out must be a float64 array of at least "
+                                 f"({n_rows}, {self.n_features})")
+            out = out[:n_rows]
+
+        chunks = {}
+        for column, _, _ in self._specs:
+            if column not in chunks:
+                chunks[column] = [_arrow_values(chunk) for chunk in _arrow_chunks(data, column)]
+
+        for i, (column, kind, argument) in enumerate(self._specs):
+            start = 0
+            for values in chunks[column]:
+                stop = start + len(values)
+                if isinstance(values, _DictionaryCodes):
+                    out[start:stop, i] = values.lookup(kind, argument)[values.codes]
+                elif kind == _NUMERIC or (kind == _FLAG and values.dtype.kind in 'biuf'):
+                    out[start:stop, i] = values
+                else:
+                    out[start:stop, i] = values == argument
+                start = stop
+        out -= self._mean
+        out /= self._scale
+        return out
+
+    def column_features(self, column, values):
+        """Scaled model features built from one raw column.
+
+        Returns a list of (feature index, scaled values) pairs, computed the
+        same way as ``transform_columns`` so patched rows stay identical.
+        """
+        values = np.asarray(values)
+        features = []
+        for i, (raw_column, kind, argument) in enumerate(self._specs):
+            if raw_column != column:
+                continue
+            if kind == _NUMERIC or (kind == _FLAG and values.dtype.kind in 'biuf'):
+                encoded = values.astype(np.float64)
+            else:
+                encoded = (values == argument).astype(np.float64)
+            encoded -= self._mean[i]
+            encoded /= self._scale[i]
+            features.append((i, encoded))
+        return features
+
+
+class _DictionaryCodes:
+    """Codes and distinct values of a dictionary-encoded Arrow column"""
+
+    def __init__(self, codes, dictionary):
+        # Null codes point at an extra trailing entry that encodes as NaN/0
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.codes)
+
+    def lookup(self, kind, argument):
+        """Unscaled feature value per code"""
+        values = self.dictionary
+        if kind == _NUMERIC or (kind == _FLAG and values.dtype.kind in 'biuf'):
+            return np.append(values.astype(np.float64), np.nan)
+        return np.append(values == argument, False).astype(np.float64)
+
+
+def _arrow_chunks(data, column):
+    """Arrays of ``column`` in a RecordBatch (one) or Table (one per chunk)"""
+    array = data.column(column)
+    return getattr(array, 'chunks', [array])
+
+
+def _arrow_values(array):
+    """NumPy values of an Arrow array, or its _DictionaryCodes for strings"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        array = pc.dictionary_encode(array)
+    if pa.types.is_dictionary(array.type):
+        codes = array.indices
+        if codes.null_count:
+            codes = pc.fill_null(codes, len(array.dictionary))
+        dictionary = array.dictionary.to_numpy(zero_copy_only=False)
+        return _DictionaryCodes(codes.to_numpy(), dictionary)
+    return array.to_numpy(zero_copy_only=False)
@@ -0,0 +1,204 @@
+"""Reduced-precision SVM inference with accuracy guardrails.
+
+The pickled SVC keeps its support vectors in float64, but 12 scaled features
+do not need double precision.  ``$CHURN_SVM_PRECISION`` selects how the
+``fast_svm`` backend evaluates the kernel:
+
+    float64  the exact FastSVM engine (default)
+    float32  float32 support vectors, inputs and kernel block
+    int8     float32, reading the scaled inputs as int8 codes
+
+The int8 quantization step of each feature is set so that the app input
+ranges, standardized by feature_scaler.pkl, fill the int8 codes.  Features
+the scaler does not touch (flags, one-hot countries, NumOfProducts) are
+small integers and are stored exactly.
+
+A reduced mode is only enabled after ``validate`` has compared it with the
+float64 ``predict_proba`` of the pickled SVC on synthetic customers.  When
+the probability error or the label flip rate exceeds the limits
+(``DEFAULT_LIMITS``, overridden by ``$CHURN_SVM_PRECISION_LIMITS`` such as
+``max_abs_error=0.02,label_flip_rate=0.002``) the backend refuses the mode
+and keeps the exact engine.
+
+Usage:
+    python -m churn_scoring.precision --precision float32 int8 --rows 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.fast_svm import INT8_MAX, REDUCED_PRECISIONS, FastSVM
+from churn_scoring.prediction import CHURN_THRESHOLD
+from churn_scoring.registry import warmup_columns
+
+PRECISION_ENV_VAR = 'CHURN_SVM_PRECISION'
+LIMITS_ENV_VAR = 'CHURN_SVM_PRECISION_LIMITS'
+PRECISIONS = ('float64',) + REDUCED_PRECISIONS
+
+DEFAULT_LIMITS = {
+    'max_abs_error': 0.01,
+    'mean_abs_error': 0.001,
+    'label_flip_rate': 0.001,
+}
+DEFAULT_VALIDATION_ROWS = 5000
+
+# Synthetic customers whose scaled ranges set the int8 steps
+CALIBRATION_ROWS = 4096
+CALIBRATION_SEED = 1
+
+
+class PrecisionLimitError(ValueError):
+    """A reduced-precision mode exceeded its accuracy limits"""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(f"{report['precision']} inference exceeds its accuracy limits: "
+                         f"{', '.join(report['violations'])}")
+
+
+def configured_precision(default='float64'):
+    """Precision from $CHURN_SVM_PRECISION, falling back to ``default``"""
+    precision = os.environ.get(PRECISION_ENV_VAR) or default
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; choose one of {', '.join(PRECISIONS)}")
+    return precision
+
+
+def configured_limits():
+    """DEFAULT_LIMITS updated from $CHURN_SVM_PRECISION_LIMITS"""
+    limits = dict(DEFAULT_LIMITS)
+    for item in os.environ.get(LIMITS_ENV_VAR, '').split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_LIMITS:
+            raise ValueError(f"Unknown precision limit {name!r}; "
+                             f"choose from {', '.join(DEFAULT_LIMITS)}")
+        limits[name] = float(value)
+    return limits
+
+
+def quantization_steps(pipeline, X=None):
+    """Per-feature int8 steps in scaled units.
+
+    Scaled features use the largest standardized magnitude of ``X``
+    (default: synthetic customers over the app input ranges) divided over
+    the 127 codes; unscaled features keep a step of 1.
+    """
+    if X is None:
+        X = pipeline.transform_columns(warmup_columns(CALIBRATION_ROWS, CALIBRATION_SEED))
+    steps = np.ones(pipeline.n_features)
+    for i, name in enumerate(pipeline.feature_names):
+        if name in pipeline.scaled_names:
+            steps[i] = max(np.abs(X[:, i]).max(), 1e-6) / INT8_MAX
+    return steps
+
+
+def reduced_engine(engine, pipeline, precision):
+    """``engine`` (a FastSVM) evaluated at ``precision``"""
+    if precision == 'float64':
+        return engine
+    steps = quantization_steps(pipeline) if precision == 'int8' else None
+    return engine.reduced(precision, steps)
+
+
+def validation_matrix(pipeline, n_rows=DEFAULT_VALIDATION_ROWS, seed=0):
+    """Scaled synthetic customers spanning the app input ranges"""
+    return pipeline.transform_columns(warmup_columns(n_rows, seed)).copy()
+
+
+def validate(reference, candidate, X, limits=None):
+    """Compare ``candidate`` with the float64 ``reference`` probabilities on ``X``"""
+    limits = configured_limits() if limits is None else limits
+    start = time.perf_counter()
+    expected = reference.predict_proba(X)[:, 1]
+    reference_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = candidate.predict_proba(X)[:, 1]
+    candidate_seconds = time.perf_counter() - start
+
+    error = np.abs(actual - expected)
+    flips = int(np.sum((actual > CHURN_THRESHOLD) != (expected > CHURN_THRESHOLD)))
+    report = {
+        'precision': getattr(candidate, 'precision', 'float64'),
+        'rows': len(X),
+        'max_abs_error': float(error.max()),
+        'mean_abs_error': float(error.mean()),
+        'p99_abs_error': float(np.percentile(error, 99)),
+        'label_flips': flips,
+        'label_flip_rate': flips / len(X),
+        'reference_rows_per_sec': len(X) / reference_seconds,
+        'rows_per_sec': len(X) / candidate_seconds,
+        'limits': dict(limits),
+    }
+    report['violations'] = [f"{name} {report[name]:.3g} > {limit:.3g}"
+                            for name, limit in limits.items() if report[name] > limit]
+    report['passed'] = not report['violations']
+    return report
+
+
+def checked_engine(model, engine, pipeline, precision, limits=None,
+                   n_rows=DEFAULT_VALIDATION_ROWS):
+    """Validated reduced-precision engine and its report.
+
+    ``model`` is the pickled SVC whose float64 ``predict_proba`` is the
+    reference.  Raises ``PrecisionLimitError`` when the mode exceeds
+    ``limits``.
+    """
+    candidate = reduced_engine(engine, pipeline, precision)
+    report = validate(model, candidate, validation_matrix(pipeline, n_rows), limits)
+    if not report['passed']:
+        raise PrecisionLimitError(report)
+    return candidate, report
+
+
+def print_report(report, out=sys.stdout):
+    verdict = 'ok' if report['passed'] else 'REFUSED (' + '; '.join(report['violations']) + ')'
+    print(f"{report['precision']:>8}: max |dp| {report['max_abs_error']:.2e}  "
+          f"mean |dp| {report['mean_abs_error']:.2e}  p99 |dp| {report['p99_abs_error']:.2e}  "
+          f"label flips {report['label_flips']}/{report['rows']:,}  "
+          f"{report['rows_per_sec']:>10,.0f} rows/sec  {verdict}", file=out)
+
+
+def main(argv=None):
+    from churn_scoring.artifacts import load_artifacts
+    from churn_scoring.pipeline import FeaturePipeline
+
+    parser = argparse.ArgumentParser(description="Validate reduced-precision SVM inference")
+    parser.add_argument('--precision', nargs='+', choices=REDUCED_PRECISIONS,
+                        default=list(REDUCED_PRECISIONS))
+    parser.add_argument('--rows', type=int, default=DEFAULT_VALIDATION_ROWS,
+                        help="Synthetic customers compared (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    for name, limit in DEFAULT_LIMITS.items():
+        parser.add_argument('--' + name.replace('_', '-'), type=float, default=None,
+                            help=f"Limit (default: ${LIMITS_ENV_VAR} or {limit})")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the model artifacts")
+    args = parser.parse_args(argv)
+
+    limits = configured_limits()
+    limits.update({name: getattr(args, name) for name in DEFAULT_LIMITS
+                   if getattr(args, name) is not None})
+    model, scaler, feature_names = load_artifacts(args.artifact_dir)
+    pipeline = FeaturePipeline(scaler, feature_names)
+    engine = FastSVM.from_model(model)
+    X = validation_matrix(pipeline, args.rows, args.seed)
+
+    print_report(validate(model, engine, X, limits))
+    passed = True
+    for precision in args.precision:
+        report = validate(model, reduced_engine(engine, pipeline, precision), X, limits)
+        print_report(report)
+        passed &= report['passed']
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Single-pass churn prediction.
+
+Calling ``model.predict_proba`` and then ``model.predict`` evaluates the RBF
+kernel against every support vector twice, and because ``predict`` uses the
+sign of the decision function while the probability is Platt-scaled, the two
+can disagree (the form could show 30% churn probability next to "HIGH RISK").
+``predict_churn`` evaluates the model once and derives the label from the
+probability, so the label always matches the displayed probability.
+"""
+import numpy as np
+
+# Probability above which a customer is labelled as a churner
+CHURN_THRESHOLD = 0.5
+# Probability above which the apps ask for immediate retention action
+HIGH_RISK_THRESHOLD = 0.7
+
+# Recommendation tiers shown under "Retention Recommendations"
+TIER_IMMEDIATE = 'immediate_action'
+TIER_PROACTIVE = 'proactive_engagement'
+TIER_MAINTENANCE = 'maintenance'
+
+# Recommendation headline the apps show for each tier
+TIER_LABELS = {
+    TIER_IMMEDIATE: 'Immediate action required',
+    TIER_PROACTIVE: 'Proactive engagement needed',
+    TIER_MAINTENANCE: 'Maintenance mode',
+}
+
+
+def predict_churn(model, X):
+    """Return (churn probabilities, 0/1 labels) from a single model evaluation"""
+    probabilities = model.predict_proba(X)[:, 1]
+    labels = (probabilities > CHURN_THRESHOLD).astype(np.int8)
+    return probabilities, labels
+
+
+def risk_tier(probability):
+    """Map a churn probability to the apps' retention recommendation tier"""
+    if probability > HIGH_RISK_THRESHOLD:
+        return TIER_IMMEDIATE
+    if probability > CHURN_THRESHOLD:
+        return TIER_PROACTIVE
+    return TIER_MAINTENANCE
@@ -0,0 +1,174 @@
+"""Top-K at-risk customers per segment over an arbitrarily large portfolio.
+
+Streams a CSV/Parquet portfolio through the scoring core chunk by chunk and
+keeps only the ``K`` highest-probability customers of each segment
+(Geography, product count and/or age band).  Each segment behaves like a
+bounded min-heap: rows at or below the segment's current K-th probability
+are dropped as soon as they are scored, and survivors are merged into the
+retained set, which is trimmed back to K per segment.  Memory is therefore
+one chunk plus ``K x segments`` rows, whatever the portfolio size.
+
+The ranked action list carries the apps' 0.5/0.7 recommendation tiers.
+
+Usage:
+    python -m churn_scoring.ranking portfolio.csv actions.csv \\
+        --top-k 5000 --segment-by Geography
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.batch import DEFAULT_CHUNK_SIZE, read_chunks, write_chunks
+from churn_scoring.core import BACKENDS, get_scorer
+from churn_scoring.prediction import (
+    CHURN_THRESHOLD, HIGH_RISK_THRESHOLD, TIER_IMMEDIATE, TIER_LABELS, TIER_MAINTENANCE,
+    TIER_PROACTIVE
+)
+from churn_scoring.schema import PROBABILITY_COLUMN
+
+DEFAULT_TOP_K = 5000
+SEGMENT_FIELDS = ['Geography', 'NumOfProducts', 'AgeBand']
+
+# Upper age bound (inclusive) and label of each age band
+AGE_BANDS = [(35, '18-35'), (45, '36-45'), (60, '46-60'), (np.inf, '61+')]
+
+RANK_COLUMN = 'Rank'
+TIER_COLUMN = 'RiskTier'
+ACTION_COLUMN = 'Action'
+_SEQ = '_seq'
+
+
+def age_band(ages):
+    """Age band label per age"""
+    bounds = [bound for bound, _ in AGE_BANDS[:-1]]
+    labels = np.array([label for _, label in AGE_BANDS], dtype=object)
+    return labels[np.searchsorted(bounds, np.asarray(ages), side='left')]
+
+
+class SegmentTopK:
+    """Keeps the ``top_k`` highest-probability rows of every segment"""
+
+    def __init__(self, top_k=DEFAULT_TOP_K, segment_by=('Geography',)):
+        if top_k < 1:
+            raise ValueError("top_k must be positive")
+        unknown = [field for field in segment_by if field not in SEGMENT_FIELDS]
+        if unknown:
+            raise ValueError(f"Cannot segment by {', '.join(unknown)}; "
+                             f"choose from {', '.join(SEGMENT_FIELDS)}")
+        self.top_k = int(top_k)
+        self.segment_by = list(segment_by)
+        self._kept = None
+        # K-th best probability of each full segment; lower scores are dropped
+        self._floors = {}
+        self.rows_seen = 0
+
+    def _segment_keys(self, chunk):
+        if not self.segment_by:
+            return pd.Series(0, index=chunk.index)
+        if len(self.segment_by) == 1:
+            return chunk[self.segment_by[0]]
+        return pd.Series(list(zip(*(chunk[field] for field in self.segment_by))),
+                         index=chunk.index)
+
+    def push(self, chunk, probabilities):
+        """Offer one scored chunk"""
+        chunk = chunk.copy()
+        if 'AgeBand' in self.segment_by:
+            chunk['AgeBand'] = age_band(chunk['Age'])
+        chunk[PROBABILITY_COLUMN] = probabilities
+        chunk[_SEQ] = np.arange(self.rows_seen, self.rows_seen + len(chunk))
+        self.rows_seen += len(chunk)
+
+        if self._floors:
+            floors = np.array([self._floors.get(key, -np.inf)
+                               for key in self._segment_keys(chunk)], dtype=np.float64)
+            chunk = chunk[chunk[PROBABILITY_COLUMN].to_numpy() > floors]
+            if chunk.empty:
+                return
+
+        merged = chunk if self._kept is None else pd.concat([self._kept, chunk], ignore_index=True)
+        merged = merged.sort_values([PROBABILITY_COLUMN, _SEQ], ascending=[False, True],
+                                    kind='mergesort')
+        if self.segment_by:
+            merged = merged.groupby(self.segment_by, sort=False, dropna=False).head(self.top_k)
+            counts = merged.groupby(self.segment_by, sort=False, dropna=False)[PROBABILITY_COLUMN]
+            floors = counts.min()[counts.size() >= self.top_k]
+            self._floors = dict(zip(floors.index, floors.to_numpy()))
+        else:
+            merged = merged.head(self.top_k)
+            if len(merged) >= self.top_k:
+                self._floors = {0: merged[PROBABILITY_COLUMN].iloc[-1]}
+        self._kept = merged.reset_index(drop=True)
+
+    def ranked(self):
+        """Ranked action list: segment columns, rank, probability, tier and action"""
+        if self._kept is None:
+            return pd.DataFrame()
+        ranked = self._kept.sort_values(self.segment_by + [PROBABILITY_COLUMN, _SEQ],
+                                        ascending=[True] * len(self.segment_by) + [False, True],
+                                        kind='mergesort')
+        if self.segment_by:
+            ranked[RANK_COLUMN] = ranked.groupby(self.segment_by, sort=False).cumcount() + 1
+        else:
+            ranked[RANK_COLUMN] = np.arange(1, len(ranked) + 1)
+        probabilities = ranked[PROBABILITY_COLUMN].to_numpy()
+        tiers = np.where(probabilities > HIGH_RISK_THRESHOLD, TIER_IMMEDIATE,
+                         np.where(probabilities > CHURN_THRESHOLD, TIER_PROACTIVE,
+                                  TIER_MAINTENANCE))
+        ranked[TIER_COLUMN] = tiers
+        ranked[ACTION_COLUMN] = pd.Series(tiers, index=ranked.index).map(TIER_LABELS)
+        leading = self.segment_by + [RANK_COLUMN]
+        trailing = [PROBABILITY_COLUMN, TIER_COLUMN, ACTION_COLUMN]
+        middle = [col for col in ranked.columns if col not in leading + trailing + [_SEQ]]
+        return ranked[leading + middle + trailing].reset_index(drop=True)
+
+
+def rank_file(source, destination, scorer, top_k=DEFAULT_TOP_K, segment_by=('Geography',),
+              chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rank ``source`` into ``destination``; returns (rows scored, rows written)"""
+    ranking = SegmentTopK(top_k, segment_by)
+    for chunk in read_chunks(source, chunk_size):
+        if chunk.empty:
+            continue
+        ranking.push(chunk, scorer.score_columns(chunk)['probability'])
+    ranked = ranking.ranked()
+    return ranking.rows_seen, write_chunks([ranked], destination)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank the customers most likely to churn per segment")
+    parser.add_argument('source', help="Portfolio CSV or Parquet file of raw customer records")
+    parser.add_argument('destination', help="Output CSV or Parquet action list")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help="Customers kept per segment (default: %(default)s)")
+    parser.add_argument('--segment-by', nargs='*', choices=SEGMENT_FIELDS, default=['Geography'],
+                        help="Segment fields; give none for one overall ranking")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows scored per chunk (default: %(default)s)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=None,
+                        help="Scoring backend (default: $CHURN_SCORING_BACKEND or fast_svm)")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the model artifacts")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.source) == os.path.abspath(args.destination):
+        parser.error("source and destination must be different files")
+    if args.top_k < 1:
+        parser.error("--top-k must be positive")
+
+    scorer = get_scorer(args.backend, args.artifact_dir)
+    start = time.perf_counter()
+    rows, written = rank_file(args.source, args.destination, scorer, args.top_k,
+                              args.segment_by, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"Ranked {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec); "
+          f"wrote {written:,} customers", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
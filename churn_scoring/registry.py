@@ -0,0 +1,193 @@
+"""Hot-swappable model registry for long-running processes.
+
+``ModelRegistry`` owns the active scorer of an artifact backend (``svc`` or
+``fast_svm``) and watches the artifact directory.  When the
+model/scaler/feature_names triple changes it loads the new triple off the
+request path, validates it, warms it with a synthetic batch and then swaps
+it in with a single reference assignment.  Callers take ``registry.active``
+once per request, so a request is always scored by one model from start to
+finish and never waits for a load.
+
+The ``keep`` previously active versions stay loaded; ``rollback`` makes one
+of them active again instantly.  A rolled-back version stays active until a
+new triple is written, and a triple that fails validation is remembered and
+not retried until the files change again.  A version dropped beyond ``keep``
+is retired from the shared tier of its scorer's prediction cache, if any.
+
+Rule backends have no artifacts; they are loaded once and never swapped, so
+callers can use one code path whatever the backend.
+"""
+import threading
+import time
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR, artifact_version
+from churn_scoring.core import ChurnScorer, configured_backend, create_backend
+from churn_scoring.metrics import timed
+from churn_scoring.synthetic import synthetic_columns
+
+# Backends whose model comes from the artifact directory
+ARTIFACT_BACKENDS = ('svc', 'fast_svm')
+
+DEFAULT_KEEP = 2
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_WARM_ROWS = 1024
+
+
+def warmup_columns(n_rows=DEFAULT_WARM_ROWS, seed=0):
+    """Synthetic raw customers spanning the apps' input ranges, as columns"""
+    return synthetic_columns(n_rows, seed)
+
+
+class _ArtifactsChanged(Exception):
+    """The artifact files changed while they were being loaded"""
+
+
+class LoadedModel:
+    """One validated model version and whatever ``prepare`` built on it"""
+
+    def __init__(self, version, scorer, extras, load_seconds, warm_probabilities):
+        self.version = version
+        self.scorer = scorer
+        self.extras = extras
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.warm_probabilities = warm_probabilities
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'load_seconds': round(self.load_seconds, 3),
+            'warm_mean_probability': round(float(self.warm_probabilities.mean()), 4),
+        }
+
+
+class ModelRegistry:
+    """Active model plus ``keep`` previous versions of one artifact backend.
+
+    ``prepare(scorer)`` is called on every new scorer before it goes live
+    (e.g. to attach a prediction cache or build explainers); its return
+    value is available as ``registry.active.extras``.
+    """
+
+    def __init__(self, backend=None, artifact_dir=ARTIFACT_DIR, keep=DEFAULT_KEEP,
+                 prepare=None, warm_rows=DEFAULT_WARM_ROWS):
+        self.backend = backend or configured_backend()
+        self.artifact_dir = artifact_dir
+        self.keep = int(keep)
+        self.prepare = prepare
+        self._warm_columns = warmup_columns(warm_rows)
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        # Newest first; index 0 is not necessarily active after a rollback
+        self._models = []
+        self.active = None
+        self.rejected = {}
+        self.last_error = None
+        self._seen_version = None
+        if not self.refresh():
+            raise ValueError(f"Could not load a valid model from {artifact_dir}: "
+                             f"{self.last_error}")
+
+    @property
+    def scorer(self):
+        return self.active.scorer
+
+    def _load(self, version):
+        start = time.perf_counter()
+        backend = create_backend(self.backend, self.artifact_dir)
+        if backend.version != version:
+            raise _ArtifactsChanged("Artifacts changed while loading; retrying on the next check")
+
+        # The model must accept exactly the pipeline's features
+        if getattr(backend, 'pipeline', None) is not None:
+            n_features = getattr(backend.model, 'n_features_in_', None)
+            if n_features is None:
+                n_features = backend.model.support_vectors.shape[1]
+            if n_features != backend.pipeline.n_features:
+                raise ValueError(f"Model expects {n_features} features but feature_names "
+                                 f"lists {backend.pipeline.n_features}")
+
+        scorer = ChurnScorer(backend)
+        with timed('warmup'):
+            probabilities = scorer.score_columns(self._warm_columns)['probability']
+        if not np.all(np.isfinite(probabilities)) or probabilities.min() < 0 \
+                or probabilities.max() > 1:
+            raise ValueError("Model produced invalid probabilities on the warm-up batch")
+        extras = self.prepare(scorer) if self.prepare is not None else None
+        return LoadedModel(version, scorer, extras, time.perf_counter() - start, probabilities)
+
+    def refresh(self):
+        """Load, validate and activate the on-disk triple if it is new; True on a swap"""
+        with self._reload_lock:
+            try:
+                version = self.backend
+                if self.backend in ARTIFACT_BACKENDS:
+                    version = artifact_version(self.artifact_dir)
+            except OSError as e:
+                self.last_error = str(e)
+                return False
+            if version == self._seen_version or version in self.rejected:
+                return False
+            try:
+                model = self._load(version)
+            except _ArtifactsChanged as e:
+                self.last_error = str(e)
+                return False
+            except Exception as e:
+                self.rejected[version] = f"{type(e).__name__}: {e}"
+                self.last_error = self.rejected[version]
+                return False
+            self._seen_version = version
+            self.last_error = None
+            with self._lock:
+                self._models = [model] + [m for m in self._models if m.version != version]
+                # Keep the new model plus ``keep`` previous versions loaded
+                dropped = self._models[self.keep + 1:]
+                del self._models[self.keep + 1:]
+                self.active = model
+            for old in dropped:
+                # Its rows in a shared prediction cache can no longer be served
+                cache = getattr(old.scorer, 'cache', None)
+                if cache is not None:
+                    cache.retire_versions([cache.model_version])
+            return True
+
+    def rollback(self, version=None):
+        """Activate ``version`` (default: the newest version older than the active one)"""
+        with self._lock:
+            if version is None:
+                position = self._models.index(self.active)
+                if position + 1 >= len(self._models):
+                    raise ValueError("No previous model version to roll back to")
+                target = self._models[position + 1]
+            else:
+                target = next((m for m in self._models if m.version == version), None)
+                if target is None:
+                    raise ValueError(f"Model version {version!r} is not loaded")
+            self.active = target
+            return target.version
+
+    def versions(self):
+        """Loaded versions, newest first, flagging the active one"""
+        with self._lock:
+            return [dict(m.describe(), active=m is self.active) for m in self._models]
+
+    def start(self, poll_interval=DEFAULT_POLL_INTERVAL):
+        """Watch the artifact directory on a daemon thread"""
+        if self._watcher is None and self.backend in ARTIFACT_BACKENDS:
+            self._watcher = threading.Thread(target=self._watch, args=(poll_interval,),
+                                             name='churn-model-watcher', daemon=True)
+            self._watcher.start()
+        return self
+
+    def _watch(self, poll_interval):
+        while not self._stop.wait(poll_interval):
+            self.refresh()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,143 @@
+"""Compiled lookup tables for the rule-based scorers.
+
+``predict_churn_risk`` (churn_app.py) and ``predict_churn_mobile``
+(mobile_churn_app.py) only compare a handful of inputs against fixed
+thresholds.  Using the union of their thresholds every customer falls into
+one of 3 * 3 * 3 * 2 * 3 * 4 * 2 = 1296 buckets:
+
+    age          <= 35 | 35-45 | > 45
+    products     1 | 2 | other
+    balance      <= 50k | 50k-100k | > 100k
+    activity     active | inactive
+    geography    other (France) | Germany | Spain
+    credit score >= 650 | 600-649 | 500-599 | < 500
+    gender       other (Male) | Female
+
+``compile_rules`` evaluates the original rule function once per bucket on a
+representative customer and stores the result, so bulk scoring is a
+vectorized bucket computation plus one NumPy gather.  The risk factors the
+apps display are pre-computed per bucket as a bitmask in the same table.
+"""
+import itertools
+
+import numpy as np
+
+from churn_scoring.prediction import CHURN_THRESHOLD
+from churn_scoring.rules import predict_churn_mobile, predict_churn_risk
+
+# Representative raw value of each bucket, per input, in bucket-index order
+_AGE = [30, 40, 50]
+_PRODUCTS = [1, 2, 3]
+_BALANCE = [0.0, 75000.0, 150000.0]
+_ACTIVE = [1, 0]
+_GEOGRAPHY = ['France', 'Germany', 'Spain']
+_CREDIT = [700, 620, 550, 400]
+_GENDER = ['Male', 'Female']
+
+BUCKET_SHAPE = (len(_AGE), len(_PRODUCTS), len(_BALANCE), len(_ACTIVE),
+                len(_GEOGRAPHY), len(_CREDIT), len(_GENDER))
+N_BUCKETS = int(np.prod(BUCKET_SHAPE))
+
+# Risk factors shown by the apps, as (name, predicate on a raw record)
+RISK_FACTORS = [
+    ('older_customer', lambda r: r['Age'] > 45),
+    ('single_product', lambda r: r['NumOfProducts'] == 1),
+    ('high_balance', lambda r: r['Balance'] > 100000),
+    ('inactive_member', lambda r: r['IsActiveMember'] == 0),
+    ('germany', lambda r: r['Geography'] == 'Germany'),
+    ('female', lambda r: r['Gender'] == 'Female'),
+    ('low_credit', lambda r: r['CreditScore'] < 600),
+]
+FACTOR_NAMES = [name for name, _ in RISK_FACTORS]
+
+
+def _as_flag(values, true_label):
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        return values != 0
+    return values == true_label
+
+
+def _is_female(values):
+    # Numeric Gender uses the model encoding: Female = 0, Male = 1
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        return values == 0
+    return values == 'Female'
+
+
+def bucket_index(columns):
+    """Vectorized bucket index for struct-of-arrays (or DataFrame) input"""
+    age = np.asarray(columns['Age'])
+    products = np.asarray(columns['NumOfProducts'])
+    balance = np.asarray(columns['Balance'])
+    credit = np.asarray(columns['CreditScore'])
+    geography = np.asarray(columns['Geography'])
+    female = _is_female(columns['Gender'])
+    inactive = ~_as_flag(columns['IsActiveMember'], 'Yes')
+
+    index = (age > 35).astype(np.intp) + (age > 45)
+    index = index * 3 + np.where(products == 1, 0, np.where(products == 2, 1, 2))
+    index = index * 3 + (balance > 50000) + (balance > 100000)
+    index = index * 2 + inactive
+    index = index * 3 + np.where(geography == 'Germany', 1, np.where(geography == 'Spain', 2, 0))
+    index = index * 4 + (credit < 650) + (credit < 600) + (credit < 500)
+    index = index * 2 + female
+    return index
+
+
+def representative_records():
+    """One raw customer record per bucket, in bucket-index order"""
+    for age, products, balance, active, geography, credit, gender in itertools.product(
+            _AGE, _PRODUCTS, _BALANCE, _ACTIVE, _GEOGRAPHY, _CREDIT, _GENDER):
+        yield {
+            'Age': age, 'NumOfProducts': products, 'Balance': balance,
+            'IsActiveMember': active, 'Geography': geography,
+            'CreditScore': credit, 'Gender': gender,
+        }
+
+
+class CompiledRules:
+    """Probability and risk-factor tables over the rule buckets"""
+
+    def __init__(self, probabilities, factor_masks):
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+        self.factor_masks = np.asarray(factor_masks, dtype=np.uint8)
+
+    def score(self, columns):
+        """Return (probabilities, 0/1 labels, risk-factor bitmasks) for every row"""
+        index = bucket_index(columns)
+        probabilities = self.probabilities[index]
+        labels = (probabilities > CHURN_THRESHOLD).astype(np.int8)
+        return probabilities, labels, self.factor_masks[index]
+
+
+def factor_names(mask):
+    """Names of the risk factors set in one bitmask"""
+    return [name for bit, name in enumerate(FACTOR_NAMES) if mask & (1 << bit)]
+
+
+def compile_rules(rule_fn):
+    """Tabulate ``rule_fn(record) -> probability`` over every bucket"""
+    probabilities = np.empty(N_BUCKETS)
+    masks = np.zeros(N_BUCKETS, dtype=np.uint8)
+    for i, record in enumerate(representative_records()):
+        probabilities[i] = rule_fn(record)
+        for bit, (_, predicate) in enumerate(RISK_FACTORS):
+            if predicate(record):
+                masks[i] |= 1 << bit
+    return CompiledRules(probabilities, masks)
+
+
+def desktop_rule(record):
+    """``predict_churn_risk`` (churn_app.py) probability for a raw record"""
+    return predict_churn_risk(record)[0]
+
+
+def mobile_rule(record):
+    """``predict_churn_mobile`` (mobile_churn_app.py) probability for a raw record"""
+    return predict_churn_mobile(
+        record['Age'], record['NumOfProducts'], record['Balance'],
+        record['IsActiveMember'] != 0, record['Geography'],
+        record['CreditScore'], record['Gender'],
+    )[0]
@@ -0,0 +1,83 @@
+"""Rule-based churn scorers used by churn_app.py and mobile_churn_app.py.
+
+Kept free of Streamlit calls so the rules can be imported, compiled and
+checked outside the apps.
+"""
+
+
+# Simulated prediction function based on our analysis
+def predict_churn_risk(input_data):
+    """
+    Simulate churn prediction based on patterns we discovered:
+    - High risk: Older customers with 1 product, high balance, inactive, from Germany
+    """
+    risk_score = 0
+    
+    # Age factor (older = higher risk) - Our EDA showed this
+    if input_data['Age'] > 45:
+        risk_score += 0.3
+    elif input_data['Age'] > 35:
+        risk_score += 0.15
+    
+    # Number of products (1 product = highest risk) - Top feature from our analysis
+    if input_data['NumOfProducts'] == 1:
+        risk_score += 0.3
+    elif input_data['NumOfProducts'] == 2:
+        risk_score += 0.1
+    
+    # Balance (high balance = higher risk)
+    if input_data['Balance'] > 100000:
+        risk_score += 0.2
+    elif input_data['Balance'] > 50000:
+        risk_score += 0.1
+    
+    # Active status (inactive = higher risk)
+    if input_data['IsActiveMember'] == 0:
+        risk_score += 0.2
+    
+    # Geography (Germany = highest risk) - Our EDA showed 32% churn in Germany
+    if input_data['Geography'] == 'Germany':
+        risk_score += 0.3
+    elif input_data['Geography'] == 'Spain':
+        risk_score += 0.1
+    
+    # Credit score (lower = higher risk)
+    if input_data['CreditScore'] < 500:
+        risk_score += 0.2
+    elif input_data['CreditScore'] < 650:
+        risk_score += 0.1
+    
+    # Gender (Female = higher risk) - Our EDA showed 25% vs 16%
+    if input_data['Gender'] == 'Female':
+        risk_score += 0.1
+    
+    # Ensure score is between 0 and 1
+    churn_probability = min(0.95, max(0.05, risk_score))
+    
+    return churn_probability, churn_probability > 0.5
+
+
+# Mobile-optimized prediction engine
+def predict_churn_mobile(age, num_products, balance, is_active, geography, credit_score, gender):
+    """Fast churn prediction optimized for mobile"""
+    risk_score = 0
+    
+    # Top 5 factors from our ML analysis
+    if num_products == 1:
+        risk_score += 0.35  # Most important factor
+    if age > 45:
+        risk_score += 0.25  # Second most important
+    if geography == 'Germany':
+        risk_score += 0.20  # High churn region
+    if balance > 100000:
+        risk_score += 0.15  # High balance risk
+    if not is_active:
+        risk_score += 0.15  # Inactivity risk
+    if credit_score < 600:
+        risk_score += 0.10  # Credit risk
+    if gender == 'Female':
+        risk_score += 0.05  # Gender pattern
+    
+    # Ensure reasonable bounds
+    churn_prob = min(0.95, max(0.05, risk_score))
+    return churn_prob, churn_prob > 0.5
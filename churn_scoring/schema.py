@@ -0,0 +1,77 @@
+"""Raw customer record schema shared by the encoders and scorers."""
+import math
+
+GEOGRAPHIES = ['France', 'Germany', 'Spain']
+
+# Raw input columns needed to build every model feature
+RAW_COLUMNS = [
+    'CreditScore', 'Geography', 'Gender', 'Age', 'Tenure', 'Balance',
+    'NumOfProducts', 'HasCrCard', 'IsActiveMember', 'EstimatedSalary'
+]
+
+NUMERIC_COLUMNS = [
+    'CreditScore', 'Age', 'Tenure', 'Balance', 'NumOfProducts', 'EstimatedSalary'
+]
+
+# Model feature order stored in feature_names.pkl
+FEATURE_NAMES = [
+    'CreditScore', 'Gender', 'Age', 'Tenure', 'Balance', 'NumOfProducts', 'HasCrCard',
+    'IsActiveMember', 'EstimatedSalary', 'Geo_France', 'Geo_Germany', 'Geo_Spain'
+]
+
+# Continuous columns standardized by feature_scaler.pkl
+SCALED_COLUMNS = ['CreditScore', 'Age', 'Tenure', 'Balance', 'EstimatedSalary']
+
+# Flag columns given as 'Yes'/'No' by the forms or 1/0 in exported data
+FLAG_COLUMNS = ['HasCrCard', 'IsActiveMember']
+
+# Lower-cased flag strings and the 1/0 value they stand for
+FLAG_VALUES = {'yes': 1.0, 'no': 0.0, 'true': 1.0, 'false': 0.0}
+
+# Gender strings; numeric input uses the model encoding Female = 0, Male = 1
+GENDERS = ['Female', 'Male']
+
+# Columns appended to scored output files
+PROBABILITY_COLUMN = 'ChurnProbability'
+PREDICTION_COLUMN = 'ChurnPrediction'
+
+# Customer identifier used by the score store
+ID_COLUMN = 'CustomerId'
+
+# Churn label of the training data
+TARGET_COLUMN = 'Exited'
+
+
+def canonical_number(col, value):
+    """Finite float for a number or numeric string; raises ValueError otherwise"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"field {col} must be a number, got {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"field {col} must be a finite number, got {value!r}")
+    return number
+
+
+def canonical_flag(col, value):
+    """1.0/0.0 for a numeric flag or a Yes/No, True/False or 1/0 string"""
+    if isinstance(value, str):
+        flag = FLAG_VALUES.get(value.strip().lower())
+        if flag is not None:
+            return flag
+    try:
+        return canonical_number(col, value)
+    except ValueError:
+        raise ValueError(f"field {col} must be Yes/No or 1/0, got {value!r}")
+
+
+def canonical_gender(value):
+    """'Female' or 'Male' for a gender string or its 0/1 model encoding"""
+    if isinstance(value, str):
+        value = value.strip()
+        gender = GENDERS[int(value)] if value in ('0', '1') else value.capitalize()
+    else:
+        gender = GENDERS[int(value)] if value in (0, 1) else None
+    if gender not in GENDERS:
+        raise ValueError(f"field Gender must be Female/Male or 0/1, got {value!r}")
+    return gender
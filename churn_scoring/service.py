@@ -0,0 +1,402 @@
+"""Local HTTP scoring service with adaptive micro-batching.
+
+Serves the same model/scaler/feature_names artifacts as the Streamlit apps
+over a small asyncio HTTP/1.1 server (no web framework required):
+
+    GET  /health           -> {"status": "ok", ...}
+    POST /score            -> one raw customer record in, one result out
+    POST /score/batch      -> {"records": [...]} in, {"results": [...]} out
+    GET  /models           -> loaded model versions
+    POST /models/rollback  -> {"version": ...} (optional) in, active version out
+    GET  /shadow           -> shadow scoring comparison report
+
+Concurrent requests are grouped by ``MicroBatcher`` into a single vectorized
+``predict_proba`` call.  When traffic is light requests are scored
+immediately; once several requests arrive per batch, the batcher waits up to
+the configured latency budget to fill larger batches.
+
+With ``--watch-interval`` a ``ModelRegistry`` hot-swaps retrained artifacts
+between batches and keeps previous versions loaded for rollback.  Every
+result carries the ``model_version`` that produced it.  With ``--shadow``
+every batch is also scored by the listed backends in the background and
+compared against the primary (see ``churn_scoring.shadow``).
+
+Usage:
+    python -m churn_scoring.service --port 8765 --max-latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.core import BACKENDS, get_scorer
+from churn_scoring.registry import DEFAULT_KEEP, ModelRegistry
+from churn_scoring.shadow import ShadowRunner
+from churn_scoring.schema import (
+    FLAG_COLUMNS, NUMERIC_COLUMNS, RAW_COLUMNS, canonical_flag, canonical_gender
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 512
+DEFAULT_MAX_LATENCY_MS = 2.0
+
+# Largest accepted request body
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 413: 'Payload Too Large',
+            500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """Client error reported back as an HTTP error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Scorer:
+    """Scores lists of raw customer records through the shared scoring core.
+
+    With a ``registry`` each batch is scored by the registry's active model.
+    """
+
+    def __init__(self, scorer=None, registry=None, shadow=None):
+        self._scorer = scorer
+        self.registry = registry
+        self.shadow = shadow
+
+    @classmethod
+    def from_artifacts(cls, artifact_dir=ARTIFACT_DIR, backend=None, watch_interval=None,
+                       keep_versions=DEFAULT_KEEP):
+        if watch_interval:
+            registry = ModelRegistry(backend, artifact_dir, keep=keep_versions)
+            return cls(registry=registry.start(watch_interval))
+        return cls(get_scorer(backend, artifact_dir))
+
+    @property
+    def scorer(self):
+        return self.registry.scorer if self.registry is not None else self._scorer
+
+    def score(self, records):
+        if self.shadow is not None:
+            return self.shadow.wrap(self.scorer).score(records)
+        return self.scorer.score(records)
+
+    def versions(self):
+        if self.registry is None:
+            return [{'version': self._scorer.backend.version, 'active': True}]
+        return self.registry.versions()
+
+
+def _content_length(headers):
+    """Request body length, or None for a malformed or negative Content-Length"""
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        return None
+    return length if length >= 0 else None
+
+
+def validate_record(record):
+    """Checked copy of ``record`` with Gender and the flags in one canonical form.
+
+    Raises RequestError unless ``record`` carries every raw customer column.
+    Records from different requests share a micro-batch, so every record is
+    brought to the same encoding (Gender 'Female'/'Male', flags 1.0/0.0):
+    otherwise one client's 'Yes' would turn another client's 1 into the
+    string '1' in the batch columns.
+    """
+    if not isinstance(record, dict):
+        raise RequestError(400, "Each record must be a JSON object")
+    missing = [col for col in RAW_COLUMNS if col not in record]
+    if missing:
+        raise RequestError(400, f"Missing customer fields: {', '.join(missing)}")
+    # Checked up front so one bad record cannot fail a whole micro-batch
+    for col in NUMERIC_COLUMNS:
+        if not isinstance(record[col], (int, float)):
+            raise RequestError(400, f"Field {col} must be a number")
+        # json.loads accepts NaN and Infinity, which would score as 0.5
+        if not math.isfinite(record[col]):
+            raise RequestError(400, f"Field {col} must be a finite number")
+    if not isinstance(record['Geography'], str):
+        raise RequestError(400, "Field Geography must be a string")
+    for col in ('Gender',) + tuple(FLAG_COLUMNS):
+        if not isinstance(record[col], (int, float, str)):
+            raise RequestError(400, f"Field {col} must be a string or a number")
+
+    record = dict(record)
+    try:
+        record['Gender'] = canonical_gender(record['Gender'])
+        for col in FLAG_COLUMNS:
+            record[col] = canonical_flag(col, record[col])
+    except ValueError as e:
+        raise RequestError(400, str(e))
+    return record
+
+
+class MicroBatcher:
+    """Groups concurrent scoring requests into one vectorized call.
+
+    Each submission is a list of records.  A single background task drains
+    the queue; the batch is dispatched as soon as it holds ``max_batch_size``
+    records or the oldest request has waited ``max_latency_ms``.  While
+    recent batches held a single request the batcher does not wait at all,
+    so an idle service adds no latency.
+    """
+
+    def __init__(self, score_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_latency_ms=DEFAULT_MAX_LATENCY_MS):
+        self.score_fn = score_fn
+        self.max_batch_size = int(max_batch_size)
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue = None
+        self._task = None
+        # Scoring runs off the event loop so it keeps accepting requests
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scorer')
+        self._avg_requests_per_batch = 1.0
+        self.batches = 0
+        self.records = 0
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, records):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    async def _collect(self):
+        """Wait for the next request and gather more within the latency budget"""
+        pending = [await self._queue.get()]
+        size = len(pending[0][0])
+        adaptive_wait = self.max_latency if self._avg_requests_per_batch > 1.5 else 0.0
+        deadline = time.perf_counter() + adaptive_wait
+
+        while size < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect()
+            records = [record for batch, _ in pending for record in batch]
+            self._avg_requests_per_batch = 0.8 * self._avg_requests_per_batch + 0.2 * len(pending)
+            self.batches += 1
+            self.records += len(records)
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_fn, records)
+            except Exception as exc:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            offset = 0
+            for batch, future in pending:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(batch)])
+                offset += len(batch)
+
+
+class ScoringService:
+    """Minimal keep-alive HTTP/1.1 JSON server in front of a MicroBatcher"""
+
+    def __init__(self, scorer, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_latency_ms=DEFAULT_MAX_LATENCY_MS):
+        self.scorer = scorer
+        self.batcher = MicroBatcher(scorer.score, max_batch_size, max_latency_ms)
+        self.started = time.time()
+
+    async def handle_request(self, method, path, body):
+        """Route one request, returning (status, JSON-serializable payload)"""
+        if path == '/health':
+            if method != 'GET':
+                raise RequestError(405, "Use GET for /health")
+            return 200, {
+                'status': 'ok',
+                'backend': self.scorer.scorer.name,
+                'model_version': self.scorer.scorer.backend.version,
+                'precision': getattr(self.scorer.scorer.backend, 'precision', None),
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'batches': self.batcher.batches,
+                'records': self.batcher.records,
+            }
+
+        if path == '/models':
+            if method != 'GET':
+                raise RequestError(405, "Use GET for /models")
+            return 200, {'versions': self.scorer.versions()}
+
+        if path == '/shadow':
+            if method != 'GET':
+                raise RequestError(405, "Use GET for /shadow")
+            if self.scorer.shadow is None:
+                raise RequestError(400, "Start the service with --shadow to compare scorers")
+            return 200, {'scorers': self.scorer.shadow.report(),
+                         **self.scorer.shadow.counters()}
+
+        if path == '/models/rollback':
+            if method != 'POST':
+                raise RequestError(405, "Use POST for /models/rollback")
+            if self.scorer.registry is None:
+                raise RequestError(400, "Start the service with --watch-interval to manage "
+                                        "model versions")
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                raise RequestError(400, "Request body is not valid JSON")
+            version = payload.get('version') if isinstance(payload, dict) else None
+            try:
+                return 200, {'active': self.scorer.registry.rollback(version)}
+            except ValueError as e:
+                raise RequestError(400, str(e))
+
+        if path not in ('/score', '/score/batch'):
+            raise RequestError(404, f"Unknown path {path}")
+        if method != 'POST':
+            raise RequestError(405, f"Use POST for {path}")
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError:
+            raise RequestError(400, "Request body is not valid JSON")
+
+        if path == '/score':
+            result, = await self.batcher.submit([validate_record(payload)])
+            return 200, result
+
+        records = payload.get('records') if isinstance(payload, dict) else payload
+        if not isinstance(records, list):
+            raise RequestError(400, 'Expected {"records": [...]} or a JSON list')
+        records = [validate_record(record) for record in records]
+        results = await self.batcher.submit(records) if records else []
+        return 200, {'results': results}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                length = _content_length(headers)
+                if length is None:
+                    # Where the body ends is unknown, so the connection cannot be reused
+                    status, payload, keep_alive = 400, {'error': "Invalid Content-Length"}, False
+                elif length > MAX_BODY_BYTES:
+                    status, payload, keep_alive = 413, {'error': "Request body too large"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, payload = await self.handle_request(method, path.split('?')[0], body)
+                    except RequestError as exc:
+                        status, payload = exc.status, {'error': str(exc)}
+                    except Exception as exc:
+                        status, payload = 500, {'error': f"Scoring failed: {exc}"}
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.batcher.start()
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Churn scoring service listening on http://{host}:{port}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve churn predictions over HTTP")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Most records scored in one call (default: %(default)s)")
+    parser.add_argument('--max-latency-ms', type=float, default=DEFAULT_MAX_LATENCY_MS,
+                        help="Longest a request waits for a batch to fill (default: %(default)s)")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the model artifacts")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=None,
+                        help="Scoring backend (default: $CHURN_SCORING_BACKEND or fast_svm)")
+    parser.add_argument('--watch-interval', type=float, default=0.0,
+                        help="Seconds between checks for new artifacts; 0 disables hot swapping")
+    parser.add_argument('--keep-versions', type=int, default=DEFAULT_KEEP,
+                        help="Previous model versions kept for rollback (default: %(default)s)")
+    parser.add_argument('--shadow', nargs='+', choices=sorted(BACKENDS), default=None,
+                        help="Backends scored in the background and compared to the primary")
+    parser.add_argument('--shadow-sample-rate', type=float, default=1.0,
+                        help="Fraction of batches shadow-scored (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    scorer = Scorer.from_artifacts(args.artifact_dir, args.backend, args.watch_interval,
+                                   args.keep_versions)
+    if args.shadow:
+        scorer.shadow = ShadowRunner({name: get_scorer(name, args.artifact_dir)
+                                      for name in args.shadow},
+                                     sample_rate=args.shadow_sample_rate)
+    service = ScoringService(scorer, args.max_batch_size, args.max_latency_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""Shadow scoring: compare secondary scorers against the primary on live traffic.
+
+``ShadowScorer`` is a drop-in ``ChurnScorer`` that scores every request or
+batch with the primary backend synchronously and hands the same input to a
+``ShadowRunner``, which re-scores it with each secondary backend on a
+background thread pool.  Callers only ever wait for the primary.
+
+Shadow work is best-effort.  A bounded number of jobs may be pending; beyond
+that new work is dropped (and counted) instead of queueing, calls can be
+sampled with ``sample_rate`` and large batches are subsampled to
+``max_rows`` rows.  Note that shadow scoring still competes with the primary
+for CPU on small hosts.
+
+The report aggregates, per scorer, latency and mean probability and, for
+every shadow versus the primary, label and risk-tier agreement, the
+probability difference and a calibration table of the shadow's
+probabilities against the primary's (outcome labels are not known at
+scoring time, so the primary serves as reference).
+
+Usage (offline comparison on a file):
+    python -m churn_scoring.shadow customers.csv --primary fast_svm \\
+        --shadow rules rules_mobile
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from churn_scoring.core import BACKENDS, ChurnScorer, get_scorer, to_columns
+from churn_scoring.metrics import StageHistogram
+from churn_scoring.prediction import (
+    CHURN_THRESHOLD, HIGH_RISK_THRESHOLD, TIER_IMMEDIATE, TIER_MAINTENANCE, TIER_PROACTIVE
+)
+
+SHADOW_ENV_VAR = 'CHURN_SHADOW_BACKENDS'
+
+DEFAULT_MAX_PENDING = 4
+DEFAULT_MAX_ROWS = 4096
+DEFAULT_WORKERS = 1
+
+# Calibration bins over the shadow's probability, and |difference| bins
+CALIBRATION_BINS = 10
+DIFF_BINS = 100
+
+
+def _tiers(probabilities):
+    return np.where(probabilities > HIGH_RISK_THRESHOLD, TIER_IMMEDIATE,
+                    np.where(probabilities > CHURN_THRESHOLD, TIER_PROACTIVE, TIER_MAINTENANCE))
+
+
+class ScorerStats:
+    """Running totals for one scorer; shadows also track agreement with the primary"""
+
+    def __init__(self):
+        self.latency = StageHistogram()
+        self.calls = 0
+        self.rows = 0
+        self.errors = 0
+        self.probability_sum = 0.0
+        self.positives = 0
+        # Shadow-only comparison totals
+        self.label_agree = 0
+        self.tier_agree = 0
+        self.abs_diff_sum = 0.0
+        self.diff_counts = np.zeros(DIFF_BINS + 1, dtype=np.int64)
+        self.calibration_counts = np.zeros(CALIBRATION_BINS, dtype=np.int64)
+        self.calibration_own = np.zeros(CALIBRATION_BINS)
+        self.calibration_primary = np.zeros(CALIBRATION_BINS)
+
+    def observe(self, probabilities, seconds):
+        self.latency.observe(seconds)
+        self.calls += 1
+        self.rows += len(probabilities)
+        self.probability_sum += float(probabilities.sum())
+        self.positives += int((probabilities > CHURN_THRESHOLD).sum())
+
+    def compare(self, probabilities, primary):
+        self.label_agree += int(((probabilities > CHURN_THRESHOLD)
+                                 == (primary > CHURN_THRESHOLD)).sum())
+        self.tier_agree += int((_tiers(probabilities) == _tiers(primary)).sum())
+        diff = np.abs(probabilities - primary)
+        self.abs_diff_sum += float(diff.sum())
+        self.diff_counts += np.bincount(np.minimum((diff * DIFF_BINS).astype(np.intp), DIFF_BINS),
+                                        minlength=DIFF_BINS + 1)
+        bins = np.minimum((probabilities * CALIBRATION_BINS).astype(np.intp), CALIBRATION_BINS - 1)
+        self.calibration_counts += np.bincount(bins, minlength=CALIBRATION_BINS)
+        self.calibration_own += np.bincount(bins, probabilities, CALIBRATION_BINS)
+        self.calibration_primary += np.bincount(bins, primary, CALIBRATION_BINS)
+
+    def p95_abs_diff(self):
+        """Upper edge of the |difference| bin holding the 95th percentile"""
+        total = self.diff_counts.sum()
+        if not total:
+            return None
+        return min(1.0, (np.searchsorted(np.cumsum(self.diff_counts), 0.95 * total) + 1)
+                   / DIFF_BINS)
+
+    def calibration(self):
+        """Per-bin count, mean own probability and mean primary probability"""
+        rows = []
+        for b in range(CALIBRATION_BINS):
+            n = int(self.calibration_counts[b])
+            rows.append({
+                'bin': f"{b / CALIBRATION_BINS:.1f}-{(b + 1) / CALIBRATION_BINS:.1f}",
+                'count': n,
+                'mean_probability': self.calibration_own[b] / n if n else None,
+                'mean_primary_probability': self.calibration_primary[b] / n if n else None,
+            })
+        return rows
+
+    def calibration_gap(self):
+        """Row-weighted mean |own - primary| over the calibration bins (ECE-style)"""
+        n = self.calibration_counts.sum()
+        if not n:
+            return None
+        return float(np.abs(self.calibration_own - self.calibration_primary).sum() / n)
+
+
+class ShadowRunner:
+    """Background pool scoring shadow backends and aggregating the comparison"""
+
+    def __init__(self, shadows, max_workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 sample_rate=1.0, max_rows=DEFAULT_MAX_ROWS, seed=0):
+        self.shadows = dict(shadows)
+        if not self.shadows:
+            raise ValueError("Shadow scoring needs at least one shadow scorer")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.max_rows = int(max_rows)
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='churn-shadow')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.primary_name = None
+        self.primary = ScorerStats()
+        self.stats = {name: ScorerStats() for name in self.shadows}
+        self.submitted = 0
+        self.dropped = 0
+        self.sampled_out = 0
+
+    @classmethod
+    def from_env(cls, artifact_dir=None, **kwargs):
+        """Runner for the backends listed in $CHURN_SHADOW_BACKENDS, or None"""
+        names = [n.strip() for n in os.environ.get(SHADOW_ENV_VAR, '').split(',') if n.strip()]
+        if not names:
+            return None
+        extra = {} if artifact_dir is None else {'artifact_dir': artifact_dir}
+        return cls({name: get_scorer(name, **extra) for name in names}, **kwargs)
+
+    def wrap(self, scorer):
+        """ShadowScorer running ``scorer`` as the primary"""
+        return ShadowScorer(scorer, self)
+
+    def submit(self, primary_name, columns, probabilities, seconds, block=False):
+        """Record the primary call and queue the shadow comparison; False if dropped.
+
+        ``columns`` and ``probabilities`` are read later on the pool, so the
+        caller must not modify them afterwards.
+        """
+        with self._lock:
+            self.primary_name = primary_name
+            self.primary.observe(probabilities, seconds)
+            if self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+                self.sampled_out += 1
+                return False
+        if not self._slots.acquire(blocking=block):
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        n_rows = len(probabilities)
+        if n_rows > self.max_rows:
+            with self._lock:
+                rows = np.sort(self._rng.choice(n_rows, self.max_rows, replace=False))
+            columns = {field: np.asarray(values)[rows] for field, values in columns.items()}
+            probabilities = probabilities[rows]
+        with self._lock:
+            self.submitted += 1
+        try:
+            self._pool.submit(self._run, columns, probabilities)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        return True
+
+    def _run(self, columns, primary):
+        try:
+            for name, scorer in self.shadows.items():
+                start = time.perf_counter()
+                try:
+                    probabilities = np.asarray(scorer.backend.probabilities(columns),
+                                               dtype=np.float64)
+                except Exception:
+                    with self._lock:
+                        self.stats[name].errors += 1
+                    continue
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.stats[name].observe(probabilities, elapsed)
+                    self.stats[name].compare(probabilities, primary)
+        finally:
+            self._slots.release()
+
+    def report(self):
+        """One row per scorer: role, volume, latency, probabilities and agreement"""
+        with self._lock:
+            rows = []
+            entries = [(self.primary_name or 'primary', 'primary', self.primary)]
+            entries += [(name, 'shadow', stats) for name, stats in self.stats.items()]
+            for name, role, stats in entries:
+                percentiles = stats.latency.percentiles() or {}
+                compared = role == 'shadow' and stats.rows
+                rows.append({
+                    'scorer': name,
+                    'role': role,
+                    'calls': stats.calls,
+                    'rows': stats.rows,
+                    'errors': stats.errors,
+                    'mean_probability': stats.probability_sum / stats.rows if stats.rows else None,
+                    'positive_rate': stats.positives / stats.rows if stats.rows else None,
+                    'label_agreement': stats.label_agree / stats.rows if compared else None,
+                    'tier_agreement': stats.tier_agree / stats.rows if compared else None,
+                    'mean_abs_diff': stats.abs_diff_sum / stats.rows if compared else None,
+                    'p95_abs_diff': stats.p95_abs_diff() if compared else None,
+                    'calibration_gap': stats.calibration_gap() if compared else None,
+                    'p50_ms': 1000 * percentiles[50] if percentiles else None,
+                    'p95_ms': 1000 * percentiles[95] if percentiles else None,
+                    'p99_ms': 1000 * percentiles[99] if percentiles else None,
+                })
+            return rows
+
+    def calibration(self, name):
+        with self._lock:
+            return self.stats[name].calibration()
+
+    def counters(self):
+        with self._lock:
+            return {'submitted': self.submitted, 'dropped': self.dropped,
+                    'sampled_out': self.sampled_out}
+
+    def drain(self):
+        """Wait for all pending shadow work"""
+        self._pool.shutdown(wait=True)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                        thread_name_prefix='churn-shadow')
+
+
+class ShadowScorer(ChurnScorer):
+    """ChurnScorer whose calls are mirrored to a ``ShadowRunner``"""
+
+    def __init__(self, primary, runner, block=False):
+        super().__init__(primary.backend, cache=primary.cache, monitor=primary.monitor)
+        self.runner = runner
+        self.block = block
+
+    def score_columns(self, columns):
+        start = time.perf_counter()
+        columns = to_columns(columns)
+        scored = super().score_columns(columns)
+        # The shadows read the same column arrays; callers hand over fresh inputs
+        self.runner.submit(self.name, columns, scored['probability'],
+                           time.perf_counter() - start, self.block)
+        return scored
+
+    def score_record(self, record):
+        if self.cache is None:
+            # Goes through score_columns
+            return super().score_record(record)
+        start = time.perf_counter()
+        result = super().score_record(record)
+        self.runner.submit(self.name, to_columns([record]), np.array([result['probability']]),
+                           time.perf_counter() - start, self.block)
+        return result
+
+
+def print_report(runner, out=sys.stdout):
+    def fmt(value, spec):
+        return '-' if value is None else format(value, spec)
+
+    print(f"{'scorer':>14} {'role':>8} {'rows':>10} {'mean p':>7} {'pos rate':>8} "
+          f"{'label agr':>9} {'tier agr':>8} {'mean |dp|':>9} {'p95 |dp|':>8} "
+          f"{'calib gap':>9} {'p50 ms':>8} {'p95 ms':>8}", file=out)
+    for row in runner.report():
+        print(f"{row['scorer']:>14} {row['role']:>8} {row['rows']:>10,} "
+              f"{fmt(row['mean_probability'], '7.3f'):>7} {fmt(row['positive_rate'], '8.3f'):>8} "
+              f"{fmt(row['label_agreement'], '9.3f'):>9} {fmt(row['tier_agreement'], '8.3f'):>8} "
+              f"{fmt(row['mean_abs_diff'], '9.3f'):>9} {fmt(row['p95_abs_diff'], '8.2f'):>8} "
+              f"{fmt(row['calibration_gap'], '9.3f'):>9} {fmt(row['p50_ms'], '8.3f'):>8} "
+              f"{fmt(row['p95_ms'], '8.3f'):>8}", file=out)
+    counters = runner.counters()
+    print(f"shadow jobs: {counters['submitted']:,} run, {counters['dropped']:,} dropped, "
+          f"{counters['sampled_out']:,} sampled out", file=out)
+
+
+def main(argv=None):
+    from churn_scoring.artifacts import ARTIFACT_DIR
+    from churn_scoring.batch import DEFAULT_CHUNK_SIZE, read_chunks
+
+    parser = argparse.ArgumentParser(description="Compare churn scorers on a customer file")
+    parser.add_argument('source', help="CSV or Parquet file of raw customer records")
+    parser.add_argument('--primary', choices=sorted(BACKENDS), default='fast_svm')
+    parser.add_argument('--shadow', nargs='+', choices=sorted(BACKENDS),
+                        default=['rules', 'rules_mobile'])
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE // 10,
+                        help="Rows per scored batch (default: %(default)s)")
+    parser.add_argument('--calibration', action='store_true',
+                        help="Also print each shadow's calibration table")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the model artifacts")
+    args = parser.parse_args(argv)
+
+    runner = ShadowRunner({name: get_scorer(name, args.artifact_dir) for name in args.shadow},
+                          max_rows=args.chunk_size)
+    # Offline: wait for shadow capacity instead of dropping work
+    scorer = ShadowScorer(get_scorer(args.primary, args.artifact_dir), runner, block=True)
+    for chunk in read_chunks(args.source, args.chunk_size):
+        if not chunk.empty:
+            scorer.score_columns(chunk)
+    runner.drain()
+    print_report(runner)
+    if args.calibration:
+        for name in args.shadow:
+            print(f"\ncalibration of {name} against {args.primary}:")
+            for row in runner.calibration(name):
+                print(f"  {row['bin']}: {row['count']:>9,} rows  "
+                      f"own {row['mean_probability'] or 0:.3f}  "
+                      f"primary {row['mean_primary_probability'] or 0:.3f}")
+
+
+if __name__ == '__main__':
+    main()
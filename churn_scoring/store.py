@@ -0,0 +1,284 @@
+"""Materialized score store: precomputed churn scores per customer ID.
+
+Agents mostly look up existing customers whose fields change monthly, so
+``ScoreStore`` scores the whole customer table once into an indexed SQLite
+file (one row per ``CustomerId``) holding the raw fields, a hash of those
+fields, the probability, label, risk tier, risk-factor mask and the tag of
+the model that produced them.
+
+* ``lookup`` is a primary-key read that serves the stored score; it scores
+  live only when the caller's current record hashes differently from the
+  stored one or the stored score came from another model.  The apps only
+  have a customer ID, so their lookups are as fresh as the last ``refresh``
+  (``source_caption`` says when that scored the customer).
+* ``refresh`` streams the customer table, compares per-row feature hashes
+  and model tags against the store and re-scores only new or changed rows.
+
+Usage:
+    python -m churn_scoring.store refresh customers.csv --db scores.db
+    python -m churn_scoring.store lookup 15634602 --db scores.db
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from hashlib import blake2b
+
+import numpy as np
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.metrics import timed
+from churn_scoring.rule_engine import factor_names
+from churn_scoring.schema import FLAG_COLUMNS, GEOGRAPHIES, ID_COLUMN, RAW_COLUMNS
+
+STORE_ENV_VAR = 'CHURN_SCORE_STORE'
+
+# How a lookup result was produced, for display
+SOURCE_LABELS = {
+    'store': 'stored score',
+    'live': 'scored live (stored score was out of date)',
+}
+
+
+def source_caption(result):
+    """How a lookup result was produced, with the refresh time of stored scores"""
+    label = SOURCE_LABELS[result['source']]
+    if result['source'] == 'store':
+        scored = time.strftime('%Y-%m-%d %H:%M', time.localtime(result['scored_at']))
+        label = f"{label} from the refresh of {scored}"
+    return label
+
+
+_SCORE_COLUMNS = ['feature_hash', 'probability', 'prediction', 'risk_tier', 'factor_mask',
+                  'model_tag', 'scored_at']
+_COLUMN_TYPES = {
+    'Geography': 'TEXT', 'Gender': 'TEXT', 'CreditScore': 'INTEGER', 'Age': 'INTEGER',
+    'Tenure': 'INTEGER', 'NumOfProducts': 'INTEGER', 'HasCrCard': 'INTEGER',
+    'IsActiveMember': 'INTEGER', 'feature_hash': 'INTEGER NOT NULL',
+    'probability': 'REAL NOT NULL', 'prediction': 'INTEGER NOT NULL',
+    'risk_tier': 'TEXT NOT NULL', 'factor_mask': 'INTEGER NOT NULL',
+    'model_tag': 'TEXT NOT NULL', 'scored_at': 'REAL NOT NULL',
+}
+
+
+def model_tag(scorer):
+    """Identifies the backend, model version and precision that produced a score"""
+    tag = f"{scorer.name}:{scorer.backend.version}"
+    precision = getattr(scorer.backend, 'precision', 'float64')
+    return tag if precision == 'float64' else f"{tag}:{precision}"
+
+
+def _canonical_matrix(columns):
+    """Raw fields as float64 (n_rows, len(RAW_COLUMNS)), independent of input dtypes"""
+    n_rows = len(np.asarray(columns[RAW_COLUMNS[0]]))
+    matrix = np.empty((n_rows, len(RAW_COLUMNS)), dtype=np.float64)
+    for i, column in enumerate(RAW_COLUMNS):
+        values = np.asarray(columns[column])
+        if column == 'Geography':
+            codes = {geo: code for code, geo in enumerate(GEOGRAPHIES)}
+            matrix[:, i] = [codes.get(value, -1) for value in values]
+        elif column == 'Gender':
+            matrix[:, i] = values == 'Male'
+        elif column in FLAG_COLUMNS and values.dtype.kind not in 'biuf':
+            matrix[:, i] = values == 'Yes'
+        else:
+            matrix[:, i] = values
+    return matrix
+
+
+def feature_hashes(columns):
+    """Signed 64-bit hash of each row's raw fields"""
+    return [int.from_bytes(blake2b(row.tobytes(), digest_size=8).digest(), 'little', signed=True)
+            for row in _canonical_matrix(columns)]
+
+
+class ScoreStore:
+    """SQLite table of precomputed scores keyed by customer ID"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.store_hits = 0
+        self.live_scores = 0
+        columns = ', '.join(f"{name} {_COLUMN_TYPES.get(name, 'REAL')}"
+                            for name in RAW_COLUMNS + _SCORE_COLUMNS)
+        with self._connection() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS scores ("
+                         f" customer_id TEXT PRIMARY KEY, {columns}) WITHOUT ROWID")
+
+    @classmethod
+    def from_env(cls):
+        """Store named by $CHURN_SCORE_STORE, or None when unset or not built yet"""
+        path = os.environ.get(STORE_ENV_VAR)
+        return cls(path) if path and os.path.exists(path) else None
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def get(self, customer_id):
+        """Stored row for ``customer_id`` as a dict, or None"""
+        conn = self._connection()
+        cursor = conn.execute("SELECT * FROM scores WHERE customer_id = ?", (str(customer_id),))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip((d[0] for d in cursor.description), row))
+
+    def lookup(self, customer_id, scorer, record=None):
+        """Score ``customer_id`` from the store, falling back to live scoring.
+
+        ``record`` is the customer's current raw record, if the caller has
+        one; it is scored live when its fields no longer hash to the stored
+        hash.  Without it the stored fields are used, so the score is only
+        as fresh as the last ``refresh`` of the customer table.  Returns a
+        result dict like ``ChurnScorer.score`` plus ``customer_id``,
+        ``record``, ``source`` ('store' or 'live') and ``scored_at`` (epoch
+        seconds), or None for an unknown ID without a record.
+        """
+        with timed('store'):
+            row = self.get(customer_id)
+            if row is None and record is None:
+                return None
+            fresh = row is not None and row['model_tag'] == model_tag(scorer)
+            if record is None:
+                record = {column: row[column] for column in RAW_COLUMNS}
+            elif fresh:
+                current = feature_hashes({column: [record[column]] for column in RAW_COLUMNS})
+                fresh = current[0] == row['feature_hash']
+            if fresh:
+                with self._lock:
+                    self.store_hits += 1
+                result = {
+                    'probability': row['probability'],
+                    'prediction': row['prediction'],
+                    'risk_tier': row['risk_tier'],
+                    'risk_factors': factor_names(row['factor_mask']),
+                    'backend': scorer.name,
+                    'model_version': scorer.backend.version,
+                }
+                source = 'store'
+                scored_at = row['scored_at']
+        if not fresh:
+            with self._lock:
+                self.live_scores += 1
+            result = scorer.score([record])[0]
+            source = 'live'
+            scored_at = time.time()
+        result.update(customer_id=str(customer_id), record=record, source=source,
+                      scored_at=scored_at)
+        return result
+
+    def _stored_state(self, conn, ids):
+        """{customer_id: (feature_hash, model_tag)} for the stored rows among ``ids``"""
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (customer_id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM incoming")
+        conn.executemany("INSERT OR IGNORE INTO incoming VALUES (?)", ((i,) for i in ids))
+        rows = conn.execute("SELECT customer_id, feature_hash, model_tag"
+                            " FROM scores JOIN incoming USING (customer_id)")
+        return {customer_id: (feature_hash, tag) for customer_id, feature_hash, tag in rows}
+
+    def refresh(self, chunks, scorer):
+        """Re-score new or changed customers of raw ``chunks``; returns counts"""
+        from churn_scoring.core import to_columns
+
+        tag = model_tag(scorer)
+        placeholders = ', '.join('?' * (1 + len(RAW_COLUMNS) + len(_SCORE_COLUMNS)))
+        insert = f"INSERT OR REPLACE INTO scores VALUES ({placeholders})"
+        counts = {'rows': 0, 'rescored': 0, 'unchanged': 0}
+        conn = self._connection()
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if ID_COLUMN not in chunk:
+                raise ValueError(f"Customer table has no {ID_COLUMN} column")
+            columns = to_columns(chunk)
+            ids = chunk[ID_COLUMN].astype(str).tolist()
+            hashes = feature_hashes(columns)
+            with conn:
+                stored = self._stored_state(conn, ids)
+                changed = np.array([stored.get(customer_id) != (feature_hash, tag)
+                                    for customer_id, feature_hash in zip(ids, hashes)])
+                counts['rows'] += len(ids)
+                counts['rescored'] += int(changed.sum())
+                counts['unchanged'] += int((~changed).sum())
+                if not changed.any():
+                    continue
+                rows = np.flatnonzero(changed)
+                subset = {column: np.asarray(columns[column])[rows] for column in RAW_COLUMNS}
+                scored = scorer.score_columns(subset)
+                raw = _canonical_matrix(subset)
+                fields = [subset[column].tolist() if column in ('Geography', 'Gender')
+                          else raw[:, i].tolist() for i, column in enumerate(RAW_COLUMNS)]
+                now = time.time()
+                conn.executemany(insert, zip(
+                    [ids[r] for r in rows], *fields, [hashes[r] for r in rows],
+                    scored['probability'].tolist(), scored['prediction'].tolist(),
+                    scored['risk_tier'].tolist(), scored['factor_mask'].tolist(),
+                    [tag] * len(rows), [now] * len(rows)))
+        return counts
+
+    def stats(self):
+        with self._lock:
+            return {'store_hits': self.store_hits, 'live_scores': self.live_scores}
+
+
+def main(argv=None):
+    from churn_scoring.batch import DEFAULT_CHUNK_SIZE, read_chunks
+    from churn_scoring.core import BACKENDS, get_scorer
+
+    parser = argparse.ArgumentParser(description="Precomputed churn score store")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    refresh = commands.add_parser('refresh', help="Score new or changed customers into the store")
+    refresh.add_argument('source', help="Customer table (CSV or Parquet) with a CustomerId column")
+    refresh.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                         help="Rows compared and scored per chunk (default: %(default)s)")
+
+    lookup = commands.add_parser('lookup', help="Print the stored score of customer IDs")
+    lookup.add_argument('customer_ids', nargs='+')
+
+    for command in (refresh, lookup):
+        command.add_argument('--db', default=os.environ.get(STORE_ENV_VAR),
+                             help=f"Store file (default: ${STORE_ENV_VAR})")
+        command.add_argument('--backend', choices=sorted(BACKENDS), default=None,
+                             help="Scoring backend (default: $CHURN_SCORING_BACKEND or fast_svm)")
+        command.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                             help="Directory holding the model artifacts")
+    args = parser.parse_args(argv)
+    if not args.db:
+        parser.error(f"--db is required when ${STORE_ENV_VAR} is not set")
+
+    store = ScoreStore(args.db)
+    scorer = get_scorer(args.backend, args.artifact_dir)
+    if args.command == 'refresh':
+        start = time.perf_counter()
+        counts = store.refresh(read_chunks(args.source, args.chunk_size), scorer)
+        elapsed = time.perf_counter() - start
+        print(f"Refreshed {counts['rows']:,} rows in {elapsed:.1f}s: {counts['rescored']:,} "
+              f"re-scored, {counts['unchanged']:,} unchanged", file=sys.stderr)
+        return
+
+    for customer_id in args.customer_ids:
+        result = store.lookup(customer_id, scorer)
+        if result is None:
+            print(json.dumps({'customer_id': customer_id, 'error': 'not found'}))
+        else:
+            print(json.dumps(result, default=str))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""Headless streaming scorer: customer records in, churn scores out.
+
+Reads newline-delimited JSON or CSV customer records from a file or stdin
+and writes each record back with ``ChurnProbability``/``ChurnPrediction``
+appended, in the same format.  Records flow through a chain of generators
+
+    parse -> normalize -> micro-batch -> encode + scale + score -> write
+
+so only one micro-batch is ever held in memory and output is flushed batch
+by batch, whatever the size of the input.  Throughput is reported on stderr.
+
+Usage:
+    warehouse_export | python -m churn_scoring.stream --format csv > scored.csv
+    python -m churn_scoring.stream customers.ndjson --batch-size 8192
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from churn_scoring.artifacts import ARTIFACT_DIR
+from churn_scoring.core import BACKENDS, MISSING_FIELD_DEFAULTS, get_scorer
+from churn_scoring.schema import (
+    FLAG_COLUMNS, NUMERIC_COLUMNS, PREDICTION_COLUMN, PROBABILITY_COLUMN, RAW_COLUMNS,
+    canonical_flag, canonical_gender, canonical_number
+)
+
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_PROGRESS_INTERVAL = 5.0
+
+REQUIRED_COLUMNS = [col for col in RAW_COLUMNS if col not in MISSING_FIELD_DEFAULTS]
+
+
+def normalize_record(record):
+    """Raw record with finite numbers parsed, Gender as 'Female'/'Male' and flags as 1/0.
+
+    Raises ValueError naming the offending field.
+    """
+    missing = [col for col in REQUIRED_COLUMNS if record.get(col) in (None, '')]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+    normalized = {col: record.get(col, MISSING_FIELD_DEFAULTS.get(col)) for col in RAW_COLUMNS}
+    for col in NUMERIC_COLUMNS:
+        normalized[col] = canonical_number(col, normalized[col])
+    normalized['Gender'] = canonical_gender(normalized['Gender'])
+    for col in FLAG_COLUMNS:
+        normalized[col] = canonical_flag(col, normalized[col])
+    return normalized
+
+
+def parse_ndjson(lines):
+    """Yield (line_no, passthrough, record) per JSON line; the passthrough is the object"""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+            if not isinstance(obj, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            _skip(line_no, e)
+            continue
+        yield line_no, obj, obj
+
+
+def parse_csv(lines):
+    """Yield (line_no, passthrough, record) per CSV row; the passthrough is the raw row.
+
+    The header comes first, as a passthrough with no record.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    yield 0, header, None
+    for line_no, row in enumerate(reader, 2):
+        if not row:
+            continue
+        if len(row) != len(header):
+            _skip(line_no, f"expected {len(header)} fields, got {len(row)}")
+            continue
+        yield line_no, row, dict(zip(header, row))
+
+
+def _skip(line_no, reason):
+    print(f"line {line_no}: skipped ({reason})", file=sys.stderr)
+
+
+def normalized(parsed):
+    """Drop records that fail ``normalize_record``, reporting them on stderr"""
+    for line_no, passthrough, record in parsed:
+        if record is None:
+            yield passthrough, None
+            continue
+        try:
+            yield passthrough, normalize_record(record)
+        except ValueError as e:
+            _skip(line_no, e)
+
+
+def micro_batches(items, batch_size=DEFAULT_BATCH_SIZE):
+    """Group an iterable into lists of at most ``batch_size`` items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def scored_batches(batches, scorer):
+    """Yield (passthroughs, probabilities, labels) for each micro-batch"""
+    for batch in batches:
+        columns = {col: [record[col] for _, record in batch] for col in RAW_COLUMNS}
+        result = scorer.score_columns(columns)
+        yield [p for p, _ in batch], result['probability'], result['prediction']
+
+
+class NDJSONWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write_batch(self, passthroughs, probabilities, labels):
+        lines = []
+        for obj, p, label in zip(passthroughs, probabilities.tolist(), labels.tolist()):
+            obj[PROBABILITY_COLUMN] = p
+            obj[PREDICTION_COLUMN] = label
+            lines.append(json.dumps(obj))
+        lines.append('')
+        self.out.write('\n'.join(lines))
+        self.out.flush()
+
+
+class CSVWriter:
+    def __init__(self, out, header):
+        self.out = out
+        self.writer = csv.writer(out, lineterminator='\n')
+        self.writer.writerow(list(header) + [PROBABILITY_COLUMN, PREDICTION_COLUMN])
+
+    def write_batch(self, passthroughs, probabilities, labels):
+        self.writer.writerows(
+            row + [repr(p), label]
+            for row, p, label in zip(passthroughs, probabilities.tolist(), labels.tolist())
+        )
+        self.out.flush()
+
+
+def detect_format(first_line, path=None):
+    """'ndjson' or 'csv', from the file extension or the first line"""
+    if path is not None:
+        lower = path.lower()
+        if lower.endswith(('.ndjson', '.jsonl', '.json')):
+            return 'ndjson'
+        if lower.endswith('.csv'):
+            return 'csv'
+    return 'ndjson' if first_line.lstrip().startswith('{') else 'csv'
+
+
+def _chain_first(first_line, lines):
+    if first_line:
+        yield first_line
+    yield from lines
+
+
+def stream_score(lines, out, scorer, fmt='auto', batch_size=DEFAULT_BATCH_SIZE,
+                 path=None, progress=None):
+    """Score every record in ``lines`` onto ``out``; returns the row count.
+
+    ``progress(rows)`` is called after each batch when given.
+    """
+    lines = iter(lines)
+    first_line = next(lines, '')
+    if fmt == 'auto':
+        fmt = detect_format(first_line, path)
+    lines = _chain_first(first_line, lines)
+
+    if fmt == 'ndjson':
+        parsed = normalized(parse_ndjson(lines))
+        writer = NDJSONWriter(out)
+    else:
+        parsed = normalized(parse_csv(lines))
+        header = next(parsed, (None, None))[0]
+        if header is None:
+            return 0
+        writer = CSVWriter(out, header)
+
+    rows = 0
+    for passthroughs, probabilities, labels in scored_batches(
+            micro_batches(parsed, batch_size), scorer):
+        writer.write_batch(passthroughs, probabilities, labels)
+        rows += len(passthroughs)
+        if progress is not None:
+            progress(rows)
+    return rows
+
+
+class ThroughputReporter:
+    """Prints rows/sec to stderr at most every ``interval`` seconds"""
+
+    def __init__(self, interval=DEFAULT_PROGRESS_INTERVAL):
+        self.interval = interval
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def __call__(self, rows):
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report(rows, now, final=False)
+
+    def report(self, rows, now=None, final=True):
+        elapsed = (now or time.perf_counter()) - self.start
+        prefix = "Scored" if final else "... scored"
+        print(f"{prefix} {rows:,} rows in {elapsed:.1f}s "
+              f"({rows / max(elapsed, 1e-9):,.0f} rows/sec)", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream customer records (NDJSON or CSV) through the churn model")
+    parser.add_argument('source', nargs='?', default='-',
+                        help="Input file, or - for stdin (default)")
+    parser.add_argument('--format', choices=['auto', 'ndjson', 'csv'], default='auto',
+                        help="Input/output format (default: detect from the input)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Records scored per micro-batch (default: %(default)s)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=None,
+                        help="Scoring backend (default: $CHURN_SCORING_BACKEND or fast_svm)")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR,
+                        help="Directory holding the model artifacts")
+    parser.add_argument('--progress-interval', type=float, default=DEFAULT_PROGRESS_INTERVAL,
+                        help="Seconds between throughput reports; 0 for final only")
+    parser.add_argument('--drift-state', default=None,
+                        help="Drift state JSON to update with this stream (see churn_scoring.drift)")
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+
+    scorer = get_scorer(args.backend, args.artifact_dir)
+    if args.drift_state:
+        from churn_scoring.drift import open_monitor
+        scorer.monitor = open_monitor(args.drift_state, args.artifact_dir)
+    reporter = ThroughputReporter(args.progress_interval)
+    progress = reporter if args.progress_interval > 0 else None
+
+    path = None if args.source == '-' else args.source
+    source = sys.stdin if path is None else open(path, newline='')
+    try:
+        rows = stream_score(source, sys.stdout, scorer, args.format, args.batch_size,
+                            path=path, progress=progress)
+    except BrokenPipeError:
+        # Downstream consumer (e.g. head) stopped reading; silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    finally:
+        if path is not None:
+            source.close()
+    reporter.report(rows)
+    if scorer.monitor is not None:
+        from churn_scoring.drift import report_alerts
+        scorer.monitor.save(args.drift_state)
+        report_alerts(scorer.monitor)
+
+
+if __name__ == '__main__':
+    main()
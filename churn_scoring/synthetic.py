@@ -0,0 +1,51 @@
+"""Synthetic raw customers for warm-up batches, tests and benchmarks.
+
+Every generator is seeded, so a given ``(n, seed)`` always produces the
+same customers.
+"""
+import numpy as np
+
+from churn_scoring.schema import GEOGRAPHIES
+
+
+def synthetic_columns(n, seed=0):
+    """Random raw customers spanning the apps' input ranges, as columns"""
+    rng = np.random.default_rng(seed)
+    return {
+        'CreditScore': rng.integers(350, 851, n),
+        'Geography': rng.choice(GEOGRAPHIES, n),
+        'Gender': rng.choice(['Female', 'Male'], n),
+        'Age': rng.integers(18, 93, n),
+        'Tenure': rng.integers(0, 11, n),
+        'Balance': rng.uniform(0, 300000, n),
+        'NumOfProducts': rng.integers(1, 5, n),
+        'HasCrCard': rng.integers(0, 2, n),
+        'IsActiveMember': rng.integers(0, 2, n),
+        'EstimatedSalary': rng.uniform(0, 250000, n),
+    }
+
+
+def synthetic_customers(n, seed=0):
+    """``synthetic_columns`` as a DataFrame of raw customer records"""
+    import pandas as pd
+
+    return pd.DataFrame(synthetic_columns(n, seed))
+
+
+def boundary_customers(n, seed=0):
+    """Random raw customers, half of them sitting exactly on a rule threshold"""
+    rng = np.random.default_rng(seed)
+    columns = {
+        'Age': rng.integers(18, 93, n),
+        'NumOfProducts': rng.integers(1, 5, n),
+        'Balance': rng.uniform(0, 300000, n).round(2),
+        'IsActiveMember': rng.integers(0, 2, n),
+        'Geography': rng.choice(GEOGRAPHIES, n),
+        'CreditScore': rng.integers(350, 851, n),
+        'Gender': rng.choice(['Female', 'Male'], n),
+    }
+    edge = rng.random(n) < 0.5
+    columns['Age'][edge] = rng.choice([35, 36, 45, 46], edge.sum())
+    columns['Balance'][edge] = rng.choice([50000.0, 50000.01, 100000.0, 100000.01], edge.sum())
+    columns['CreditScore'][edge] = rng.choice([499, 500, 599, 600, 649, 650], edge.sum())
+    return columns
@@ -0,0 +1,414 @@
+"""Train the churn SVM from a customer file and write its artifacts.
+
+Reads a CSV or Parquet file of raw customer records with the ``Exited``
+label, encodes it with the same Gender/Geo_* encoding the apps use and
+holds out a stratified test split.  The hyperparameter grid (C, gamma,
+class weights) is searched with stratified k-fold cross-validation across a
+process pool.  Each fold's scaled feature matrices are built once, saved as
+.npy files under ``--cache-dir`` (keyed by the data and fold layout, so a
+re-run over the same file skips them) and memory-mapped by the workers
+instead of being re-encoded and re-scaled for every grid point.
+
+For large files the search can run on a stratified subsample
+(``--search-rows``) and/or approximate the RBF kernel with Nystroem features
+and a linear SVM (``--approximate``).  The final model is always an exact
+``SVC(probability=True)`` refit on the training split, capped by
+``--max-train-rows``, so FastSVM and the other backends keep working.
+
+The output directory receives the artifact triple ``load_artifacts`` reads
+(churn_prediction_model.pkl, feature_scaler.pkl, feature_names.pkl) and
+metrics.json with the held-out test metrics, the cross-validation table and
+the ``artifact_version`` of the model it describes.  Files are replaced
+atomically, metrics.json first and the model last, so a running model
+registry picks the new model up whole and finds its metrics already there.
+
+Usage:
+    python -m churn_scoring.train Churn_Modelling.csv --output-dir models/ --workers 4
+    python -m churn_scoring.train big.parquet --search-rows 20000 --approximate
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from churn_scoring.artifacts import (FEATURE_NAMES_FILE, METRICS_FILE, MODEL_FILE,
+                                     SCALER_FILE, content_version)
+from churn_scoring.batch import read_chunks
+from churn_scoring.encoding import encode_customers
+from churn_scoring.prediction import CHURN_THRESHOLD
+from churn_scoring.schema import FEATURE_NAMES, RAW_COLUMNS, SCALED_COLUMNS, TARGET_COLUMN
+
+DEFAULT_C = [0.5, 1.0, 2.0]
+DEFAULT_GAMMA = ['scale', 0.05, 0.2]
+DEFAULT_CLASS_WEIGHT = ['none', 'balanced']
+DEFAULT_FOLDS = 5
+DEFAULT_TEST_SIZE = 0.2
+DEFAULT_SEED = 42
+DEFAULT_COMPONENTS = 500
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'churn_train_folds')
+
+SELECTION_METRICS = ('roc_auc', 'accuracy', 'recall', 'f1')
+_FOLD_ARRAYS = ('X_train', 'y_train', 'X_val', 'y_val')
+
+# Memory-mapped fold matrices of this worker, by (fold dir, fold)
+_folds = {}
+
+
+def read_training_data(path):
+    """Raw customer records and their 0/1 churn labels"""
+    df = pd.concat(read_chunks(path), ignore_index=True)
+    missing = [col for col in RAW_COLUMNS + [TARGET_COLUMN] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing training columns: {', '.join(missing)}")
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.int64)
+    if not np.isin(y, (0, 1)).all():
+        raise ValueError(f"{TARGET_COLUMN} must be 0 or 1")
+    if len(np.unique(y)) < 2:
+        raise ValueError(f"{TARGET_COLUMN} needs both churned and retained customers")
+    return df[RAW_COLUMNS], y
+
+
+def file_digest(path):
+    """SHA-256 of the training file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fit_scaler(features):
+    """StandardScaler over the continuous columns, like feature_scaler.pkl"""
+    from sklearn.preprocessing import StandardScaler
+
+    return StandardScaler().fit(features[SCALED_COLUMNS])
+
+
+def scale(features, scaler):
+    """Float64 model matrix of encoded ``features`` with ``scaler`` applied"""
+    X = features.to_numpy(dtype=np.float64, copy=True)
+    columns = [features.columns.get_loc(name) for name in SCALED_COLUMNS]
+    X[:, columns] = scaler.transform(features[SCALED_COLUMNS])
+    return X
+
+
+def stratified_subsample(indices, y, n_rows, seed):
+    """At most ``n_rows`` of ``indices``, keeping the churn rate of ``y``"""
+    if n_rows is None or n_rows >= len(indices):
+        return indices
+    from sklearn.model_selection import train_test_split
+
+    keep, _ = train_test_split(indices, train_size=n_rows, stratify=y[indices],
+                               random_state=seed)
+    return np.sort(keep)
+
+
+def build_folds(features, y, cache_dir, data_key, n_folds, seed, search_rows=None):
+    """Write each fold's scaled matrices as .npy files; returns their directory.
+
+    Each fold's scaler is fit on its training rows only.  An existing,
+    complete directory for the same data and fold layout is reused.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    layout = json.dumps([data_key, FEATURE_NAMES, n_folds, seed, search_rows])
+    fold_dir = os.path.join(cache_dir, hashlib.sha256(layout.encode()).hexdigest()[:16])
+    done = os.path.join(fold_dir, 'complete')
+    if os.path.exists(done):
+        return fold_dir
+
+    os.makedirs(fold_dir, exist_ok=True)
+    rows = stratified_subsample(np.arange(len(y)), y, search_rows, seed)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for fold, (train, val) in enumerate(splitter.split(rows, y[rows])):
+        train, val = rows[train], rows[val]
+        scaler = fit_scaler(features.iloc[train])
+        arrays = {
+            'X_train': scale(features.iloc[train], scaler),
+            'y_train': y[train],
+            'X_val': scale(features.iloc[val], scaler),
+            'y_val': y[val],
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(fold_dir, f'fold{fold}_{name}.npy'), array)
+    open(done, 'w').close()
+    return fold_dir
+
+
+def parameter_grid(C_values, gamma_values, class_weights):
+    """Every combination as SVC keyword arguments"""
+    return [{'C': C, 'gamma': gamma, 'class_weight': None if weight == 'none' else weight}
+            for C, gamma, weight in itertools.product(C_values, gamma_values, class_weights)]
+
+
+def _gamma_value(gamma, X):
+    """Numeric gamma of ``gamma``, resolving 'scale'/'auto' as SVC does"""
+    if gamma == 'scale':
+        return 1.0 / (X.shape[1] * X.var())
+    if gamma == 'auto':
+        return 1.0 / X.shape[1]
+    return gamma
+
+
+def make_estimator(params, X, approximate=False, n_components=DEFAULT_COMPONENTS,
+                   seed=DEFAULT_SEED):
+    """Exact RBF SVC, or Nystroem features and a linear SVM approximating it"""
+    if not approximate:
+        from sklearn.svm import SVC
+
+        return SVC(kernel='rbf', random_state=seed, **params)
+    from sklearn.kernel_approximation import Nystroem
+    from sklearn.pipeline import make_pipeline
+    from sklearn.svm import LinearSVC
+
+    return make_pipeline(
+        Nystroem(gamma=_gamma_value(params['gamma'], X),
+                 n_components=min(n_components, len(X)), random_state=seed),
+        LinearSVC(C=params['C'], class_weight=params['class_weight'], random_state=seed),
+    )
+
+
+def _init_worker():
+    # One BLAS thread per process; the pool provides the parallelism
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(1)
+
+
+def _load_fold(fold_dir, fold):
+    key = (fold_dir, fold)
+    if key not in _folds:
+        _folds[key] = tuple(np.load(os.path.join(fold_dir, f'fold{fold}_{name}.npy'),
+                                    mmap_mode='r')
+                            for name in _FOLD_ARRAYS)
+    return _folds[key]
+
+
+def evaluate(fold_dir, fold, params, approximate=False, n_components=DEFAULT_COMPONENTS,
+             seed=DEFAULT_SEED):
+    """Fit ``params`` on one cached fold and score its validation rows"""
+    from sklearn.metrics import accuracy_score, f1_score, recall_score, roc_auc_score
+
+    X_train, y_train, X_val, y_val = _load_fold(fold_dir, fold)
+    model = make_estimator(params, X_train, approximate, n_components, seed)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    margin = model.decision_function(X_val)
+    labels = (margin > 0).astype(np.int64)
+    return {
+        'roc_auc': roc_auc_score(y_val, margin),
+        'accuracy': accuracy_score(y_val, labels),
+        'recall': recall_score(y_val, labels),
+        'f1': f1_score(y_val, labels),
+        'fit_seconds': fit_seconds,
+    }
+
+
+def search(fold_dir, n_folds, grid, n_workers=1, approximate=False,
+           n_components=DEFAULT_COMPONENTS, seed=DEFAULT_SEED):
+    """Mean and standard deviation of each fold metric per grid point"""
+    tasks = [(params, fold) for params in grid for fold in range(n_folds)]
+    args = [(fold_dir, fold, params, approximate, n_components, seed) for params, fold in tasks]
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker) as pool:
+            scores = list(pool.map(evaluate, *zip(*args)))
+    else:
+        scores = [evaluate(*task) for task in args]
+
+    results = []
+    for i, params in enumerate(grid):
+        folds = scores[i * n_folds:(i + 1) * n_folds]
+        result = {'params': params}
+        for name in SELECTION_METRICS + ('fit_seconds',):
+            values = [score[name] for score in folds]
+            result[name] = float(np.mean(values))
+            result[name + '_std'] = float(np.std(values))
+        results.append(result)
+    return results
+
+
+def holdout_metrics(model, X, y):
+    """Held-out metrics of the final model at the apps' churn threshold"""
+    from sklearn.metrics import (accuracy_score, f1_score, precision_score, recall_score,
+                                 roc_auc_score)
+
+    probabilities = model.predict_proba(X)[:, 1]
+    labels = (probabilities > CHURN_THRESHOLD).astype(np.int64)
+    return {
+        'accuracy': accuracy_score(y, labels),
+        'precision': precision_score(y, labels, zero_division=0),
+        'recall': recall_score(y, labels),
+        'f1': f1_score(y, labels),
+        'roc_auc': roc_auc_score(y, probabilities),
+    }
+
+
+def _replace(path, write):
+    """Write ``path`` through a temporary file in the same directory"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_artifacts(output_dir, model, scaler, metrics):
+    """Write the artifact triple and metrics.json; returns the artifact version"""
+    import io
+
+    import joblib
+
+    def dumped(dump, obj):
+        buffer = io.BytesIO()
+        dump(obj, buffer)
+        return buffer.getvalue()
+
+    files = {
+        MODEL_FILE: dumped(joblib.dump, model),
+        SCALER_FILE: dumped(joblib.dump, scaler),
+        FEATURE_NAMES_FILE: dumped(pickle.dump, list(FEATURE_NAMES)),
+    }
+    # The version is known from the bytes, so metrics.json can go first: a
+    # registry that sees the new model already finds its metrics
+    metrics = dict(metrics, model_version=content_version(
+        files[name] for name in (MODEL_FILE, SCALER_FILE, FEATURE_NAMES_FILE)))
+    files[METRICS_FILE] = json.dumps(metrics, indent=2).encode()
+
+    os.makedirs(output_dir, exist_ok=True)
+    # The model last: a registry polling the model file sees a complete set
+    for name in (METRICS_FILE, SCALER_FILE, FEATURE_NAMES_FILE, MODEL_FILE):
+        _replace(os.path.join(output_dir, name), lambda f: f.write(files[name]))
+    return metrics['model_version']
+
+
+def train(path, output_dir, C_values=DEFAULT_C, gamma_values=DEFAULT_GAMMA,
+          class_weights=DEFAULT_CLASS_WEIGHT, metric='roc_auc', n_folds=DEFAULT_FOLDS,
+          test_size=DEFAULT_TEST_SIZE, n_workers=1, search_rows=None, approximate=False,
+          n_components=DEFAULT_COMPONENTS, max_train_rows=None, cache_dir=DEFAULT_CACHE_DIR,
+          seed=DEFAULT_SEED, out=sys.stdout):
+    """Search, refit and write the artifacts; returns the metrics written"""
+    import sklearn
+    from sklearn.model_selection import train_test_split
+    from sklearn.svm import SVC
+
+    if metric not in SELECTION_METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; choose one of {', '.join(SELECTION_METRICS)}")
+    raw, y = read_training_data(path)
+    features = encode_customers(raw, FEATURE_NAMES)
+    data_key = file_digest(path)
+    train_rows, test_rows = train_test_split(np.arange(len(y)), test_size=test_size,
+                                             stratify=y, random_state=seed)
+    train_rows = np.sort(train_rows)
+    print(f"{len(y):,} customers ({y.mean():.1%} churned): "
+          f"{len(train_rows):,} train, {len(test_rows):,} test", file=out)
+
+    start = time.perf_counter()
+    fold_dir = build_folds(features.iloc[train_rows], y[train_rows], cache_dir,
+                           [data_key, test_size], n_folds, seed, search_rows)
+    grid = parameter_grid(C_values, gamma_values, class_weights)
+    results = search(fold_dir, n_folds, grid, n_workers, approximate, n_components, seed)
+    search_seconds = time.perf_counter() - start
+    for result in sorted(results, key=lambda r: -r[metric]):
+        print(f"  C={result['params']['C']:<5} gamma={result['params']['gamma']!s:<6} "
+              f"class_weight={result['params']['class_weight']!s:<9} "
+              f"{metric} {result[metric]:.4f} ± {result[metric + '_std']:.4f}", file=out)
+    best = max(results, key=lambda r: r[metric])['params']
+    print(f"Searched {len(grid)} settings x {n_folds} folds in {search_seconds:.1f}s; "
+          f"best {best}", file=out)
+
+    fit_rows = stratified_subsample(train_rows, y, max_train_rows, seed)
+    scaler = fit_scaler(features.iloc[fit_rows])
+    start = time.perf_counter()
+    model = SVC(kernel='rbf', probability=True, random_state=seed, **best)
+    model.fit(scale(features.iloc[fit_rows], scaler), y[fit_rows])
+    fit_seconds = time.perf_counter() - start
+    test = holdout_metrics(model, scale(features.iloc[test_rows], scaler), y[test_rows])
+
+    metrics = {
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'data': os.path.basename(path),
+        'data_sha256': data_key,
+        'customers': len(y),
+        'churn_rate': float(y.mean()),
+        'train_rows': len(fit_rows),
+        'test_rows': len(test_rows),
+        'params': best,
+        'test': {name: float(value) for name, value in test.items()},
+        'cv': {
+            'folds': n_folds,
+            'metric': metric,
+            'rows': len(train_rows) if search_rows is None else min(search_rows, len(train_rows)),
+            'approximate': approximate,
+            'results': results,
+        },
+        'support_vectors': int(model.support_vectors_.shape[0]),
+        'search_seconds': search_seconds,
+        'fit_seconds': fit_seconds,
+        'seed': seed,
+        'sklearn_version': sklearn.__version__,
+    }
+    version = write_artifacts(output_dir, model, scaler, metrics)
+    print("Test: " + '  '.join(f"{name} {value:.3f}" for name, value in test.items()), file=out)
+    print(f"Wrote model {version} ({len(fit_rows):,} rows, {fit_seconds:.1f}s fit) "
+          f"to {output_dir}", file=out)
+    return dict(metrics, model_version=version)
+
+
+def _gamma(value):
+    return value if value in ('scale', 'auto') else float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the churn SVM and write its artifacts")
+    parser.add_argument('data', help="CSV or Parquet customer file with an Exited column")
+    parser.add_argument('--output-dir', required=True,
+                        help="Directory for the model artifacts and metrics.json")
+    parser.add_argument('--C', type=float, nargs='+', default=DEFAULT_C)
+    parser.add_argument('--gamma', type=_gamma, nargs='+', default=DEFAULT_GAMMA,
+                        help="'scale', 'auto' or numbers (default: %(default)s)")
+    parser.add_argument('--class-weight', nargs='+', choices=['none', 'balanced'],
+                        default=DEFAULT_CLASS_WEIGHT)
+    parser.add_argument('--metric', choices=SELECTION_METRICS, default='roc_auc',
+                        help="Cross-validated metric that picks the model (default: %(default)s)")
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--test-size', type=float, default=DEFAULT_TEST_SIZE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Search worker processes (default: %(default)s)")
+    parser.add_argument('--search-rows', type=int, default=None,
+                        help="Cross-validate on a stratified sample of this many training rows")
+    parser.add_argument('--approximate', action='store_true',
+                        help="Search with Nystroem features and a linear SVM")
+    parser.add_argument('--components', type=int, default=DEFAULT_COMPONENTS,
+                        help="Nystroem components with --approximate (default: %(default)s)")
+    parser.add_argument('--max-train-rows', type=int, default=None,
+                        help="Fit the final SVC on at most this many training rows")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Where fold matrices are cached (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    train(args.data, args.output_dir, args.C, args.gamma, args.class_weight, args.metric,
+          args.folds, args.test_size, args.workers, args.search_rows, args.approximate,
+          args.components, args.max_train_rows, args.cache_dir, args.seed)
+
+
+if __name__ == '__main__':
+    main()
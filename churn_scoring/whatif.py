@@ -0,0 +1,117 @@
+"""What-if sensitivity sweep for one customer.
+
+Retention agents want to know how a single change (one more product,
+reactivating the account, a longer tenure, a different balance) would move
+a customer's churn probability.  ``WhatIfSweep`` scores every candidate
+change for one customer in a single vectorized call:
+
+* the base customer is encoded and scaled once and cached;
+* each candidate's scaled feature values do not depend on the customer, so
+  they are encoded once when the sweep is built;
+* the sweep tiles the base vector, overwrites only the changed column in
+  each row, and scores all rows with one ``predict_proba``-equivalent call.
+
+Backends without a feature pipeline (the rule scorers) fall back to scoring
+the tiled raw records through the backend.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from churn_scoring.core import to_columns
+from churn_scoring.metrics import timed
+from churn_scoring.prediction import predict_churn
+
+BALANCE_BANDS = [0.0, 25000.0, 50000.0, 75000.0, 100000.0, 125000.0, 150000.0,
+                 200000.0, 250000.0]
+
+# Candidate values swept per raw field
+WHAT_IF_VALUES = {
+    'NumOfProducts': [1, 2, 3, 4],
+    'IsActiveMember': [0, 1],
+    'Tenure': list(range(11)),
+    'Balance': BALANCE_BANDS,
+}
+
+BASE_CACHE_SIZE = 256
+
+
+def _current_value(field, record):
+    value = record[field]
+    if field == 'IsActiveMember' and isinstance(value, str):
+        return int(value == 'Yes')
+    return value
+
+
+class WhatIfSweep:
+    """Scores every single-field change of ``candidates`` for one customer"""
+
+    def __init__(self, scorer, candidates=WHAT_IF_VALUES):
+        self.scorer = scorer
+        self.candidates = {field: list(values) for field, values in candidates.items()}
+        # (field, value) of each sweep row, after the base row
+        self.changes = [(field, value) for field, values in self.candidates.items()
+                        for value in values]
+        self._pipeline = getattr(scorer.backend, 'pipeline', None)
+        self._model = getattr(scorer.backend, 'model', None)
+        # Shared by every session using this model version
+        self._base_vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self._pipeline is not None:
+            # Scaled feature values of every candidate, per sweep row
+            self._patches = []
+            start = 1
+            for field, values in self.candidates.items():
+                rows = np.arange(start, start + len(values))
+                for index, scaled in self._pipeline.column_features(field, values):
+                    self._patches.append((rows, index, scaled))
+                start += len(values)
+
+    def base_vector(self, record):
+        """Encoded and scaled base customer, cached per distinct record"""
+        key = tuple(sorted(record.items()))
+        with self._lock:
+            vector = self._base_vectors.get(key)
+            if vector is not None:
+                self._base_vectors.move_to_end(key)
+                return vector
+        vector = self._pipeline.transform_record(record)[0].copy()
+        with self._lock:
+            self._base_vectors[key] = vector
+            while len(self._base_vectors) > BASE_CACHE_SIZE:
+                self._base_vectors.popitem(last=False)
+        return vector
+
+    def _probabilities(self, record):
+        if self._pipeline is None:
+            # Candidates are numeric, so the base flag must be too
+            record = dict(record, IsActiveMember=_current_value('IsActiveMember', record))
+            records = [record] + [dict(record, **{field: value}) for field, value in self.changes]
+            return np.asarray(self.scorer.backend.probabilities(to_columns(records)))
+
+        X = np.tile(self.base_vector(record), (len(self.changes) + 1, 1))
+        for rows, index, scaled in self._patches:
+            X[rows, index] = scaled
+        return predict_churn(self._model, X)[0]
+
+    def sweep(self, record):
+        """Return (base probability, rows) where each row describes one change.
+
+        Rows carry ``field``, ``value``, ``probability``, ``delta`` (vs the
+        base probability) and ``current`` (the customer already has it).
+        """
+        with timed('whatif'):
+            probabilities = self._probabilities(record)
+        base = float(probabilities[0])
+        rows = []
+        for (field, value), probability in zip(self.changes, probabilities[1:]):
+            rows.append({
+                'field': field,
+                'value': value,
+                'probability': float(probability),
+                'delta': float(probability) - base,
+                'current': value == _current_value(field, record),
+            })
+        return base, rows
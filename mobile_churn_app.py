@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
+
+from churn_scoring.artifacts import load_metrics
+from churn_scoring.core import RISK_FACTOR_MESSAGES, configured_backend, get_scorer
+from churn_scoring.loader import BackgroundLoader
+from churn_scoring.prediction import TIER_IMMEDIATE, TIER_PROACTIVE
+from churn_scoring.store import ScoreStore, source_caption
 
 # Mobile-optimized configuration
 st.set_page_config(
@@ -66,30 +70,38 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Mobile-optimized prediction engine
-def predict_churn_mobile(age, num_products, balance, is_active, geography, credit_score, gender):
-    """Fast churn prediction optimized for mobile"""
-    risk_score = 0
-    
-    # Top 5 factors from our ML analysis
-    if num_products == 1:
-        risk_score += 0.35  # Most important factor
-    if age > 45:
-        risk_score += 0.25  # Second most important
-    if geography == 'Germany':
-        risk_score += 0.20  # High churn region
-    if balance > 100000:
-        risk_score += 0.15  # High balance risk
-    if not is_active:
-        risk_score += 0.15  # Inactivity risk
-    if credit_score < 600:
-        risk_score += 0.10  # Credit risk
-    if gender == 'Female':
-        risk_score += 0.05  # Gender pattern
-    
-    # Ensure reasonable bounds
-    churn_prob = min(0.95, max(0.05, risk_score))
-    return churn_prob, churn_prob > 0.5
+# Shared scoring core; this app defaults to the mobile rule-based scorer.
+# It loads on a background thread so the form paints before any model is ready.
+@st.cache_resource
+def start_loading(backend):
+    return BackgroundLoader(lambda: get_scorer(backend))
+
+def wait_for_scorer():
+    if not loader.ready:
+        with st.spinner("Loading the churn model..."):
+            loader.result()
+    return loader.result()
+
+loader = start_loading(configured_backend('rules_mobile'))
+
+# Precomputed scores by customer ID, when $CHURN_SCORE_STORE names a built store.
+# Lookups only have the ID, so a score is as fresh as the store's last refresh.
+@st.cache_resource
+def load_store():
+    return ScoreStore.from_env()
+
+store = load_store()
+
+# Test-set metrics written by churn_scoring.train for the shipped artifacts;
+# the original figures are shown until the model is retrained here
+metrics = load_metrics()
+if metrics:
+    accuracy_text = f"{metrics['test']['accuracy']:.0%}"
+    recall_text = f"{metrics['test']['recall']:.0%}"
+    customers_text = f"{metrics['customers']:,}"
+    data_text = f"{metrics['customers'] / 1000:.0f}K"
+else:
+    accuracy_text, recall_text, customers_text, data_text = "85%", "74%", "10,000+", "10K+"
 
 # MOBILE APP INTERFACE
 st.title("📱 Churn Predictor")
@@ -97,54 +109,79 @@ st.markdown("**Instant customer churn risk assessment**")
 
 # Quick stats bar
 col1, col2, col3 = st.columns(3)
-col1.metric("Accuracy", "85%")
+col1.metric("Accuracy", accuracy_text)
 col2.metric("Speed", "Instant")
-col3.metric("Data", "10K+")
+col3.metric("Data", data_text)
 
 st.markdown("---")
 
-# INPUT SECTION - Mobile optimized forms
-with st.expander("👤 Customer Profile", expanded=True):
-    col1, col2 = st.columns(2)
-    with col1:
-        age = st.slider("Age", 18, 92, 40, 
-                       help="Older = Higher Risk")
-        geography = st.selectbox("Country", 
-                               ["France", "Germany", "Spain"],
-                               help="Germany = 32% Churn Rate")
-    with col2:
-        num_products = st.slider("Products", 1, 4, 1,
-                               help="1 Product = Highest Risk")
-        is_active = st.selectbox("Active?", ["Yes", "No"])
+# Each panel is a fragment: a widget inside one reruns only that panel, not the
+# CSS, the other panels or the footer.  The inputs and the last result live in
+# session state, so a full rerun redraws the result without scoring again.
 
-with st.expander("💰 Financial Details"):
-    col1, col2 = st.columns(2)
-    with col1:
-        balance = st.number_input("Balance ($)", 
-                                0.0, 300000.0, 50000.0,
-                                help="High Balance = Higher Risk")
-        credit_score = st.slider("Credit Score", 350, 850, 650)
-    with col2:
-        gender = st.selectbox("Gender", ["Male", "Female"])
-        tenure = st.slider("Tenure", 0, 10, 5)
+# LOOKUP SECTION - existing customers are served from the score store
+@st.fragment
+def lookup_panel():
+    with st.expander("🔎 Look Up Customer ID"):
+        customer_id = st.text_input("Customer ID")
+        if st.button("🔎 LOOK UP", use_container_width=True) and customer_id.strip():
+            result = store.lookup(customer_id.strip(), wait_for_scorer())
+            if result is None:
+                st.error(f"No stored score for customer {customer_id.strip()}")
+            else:
+                st.session_state.result = result
+                # The results panel is another fragment; redraw the page once
+                st.rerun()
 
-# PREDICTION BUTTON - Large and prominent
-st.markdown("---")
-predict_btn = st.button("🎯 PREDICT CHURN RISK", 
-                       use_container_width=True,
-                       type="primary")
-
-# RESULTS SECTION
-if predict_btn:
-    # Calculate prediction
-    is_active_bool = is_active == "Yes"
-    churn_prob, will_churn = predict_churn_mobile(
-        age, num_products, balance, is_active_bool, 
-        geography, credit_score, gender
-    )
+# INPUT SECTION - Mobile optimized forms; widget keys are the record fields
+@st.fragment
+def customer_inputs():
+    with st.expander("👤 Customer Profile", expanded=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.slider("Age", 18, 92, 40, key="Age",
+                      help="Older = Higher Risk")
+            st.selectbox("Country", 
+                         ["France", "Germany", "Spain"], key="Geography",
+                         help="Germany = 32% Churn Rate")
+        with col2:
+            st.slider("Products", 1, 4, 1, key="NumOfProducts",
+                      help="1 Product = Highest Risk")
+            st.selectbox("Active?", ["Yes", "No"], key="IsActiveMember")
+
+    with st.expander("💰 Financial Details"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.number_input("Balance ($)", 
+                            0.0, 300000.0, 50000.0, key="Balance",
+                            help="High Balance = Higher Risk")
+            st.slider("Credit Score", 350, 850, 650, key="CreditScore")
+        with col2:
+            st.selectbox("Gender", ["Male", "Female"], key="Gender")
+            st.slider("Tenure", 0, 10, 5, key="Tenure")
+
+def score_inputs():
+    """Score the customer currently entered in the input panel"""
+    inputs = st.session_state
+    return wait_for_scorer().score([{
+        'Age': inputs.Age,
+        'NumOfProducts': inputs.NumOfProducts,
+        'Balance': inputs.Balance,
+        'IsActiveMember': 1 if inputs.IsActiveMember == "Yes" else 0,
+        'Geography': inputs.Geography,
+        'CreditScore': inputs.CreditScore,
+        'Tenure': inputs.Tenure,
+        'Gender': inputs.Gender,
+    }])[0]
+
+def show_results(result):
+    churn_prob = result['probability']
+    will_churn = result['prediction'] == 1
     
     # Display results
     st.success("✅ Analysis Complete!")
+    if 'customer_id' in result:
+        st.caption(f"Customer {result['customer_id']}: {source_caption(result)}")
     
     # Risk visualization
     risk_color = "🔴" if will_churn else "🟢"
@@ -160,20 +197,7 @@ if predict_btn:
     
     # Risk factors
     st.subheader("📊 Risk Factors Found")
-    risk_factors = []
-    
-    if num_products == 1:
-        risk_factors.append(("📦 Single Product", "Highest churn driver"))
-    if age > 45:
-        risk_factors.append(("👴 Age 45+", "Older customers churn more"))
-    if geography == "Germany":
-        risk_factors.append(("🇩🇪 Germany", "32% churn rate"))
-    if balance > 100000:
-        risk_factors.append(("💰 High Balance", "Wealthier customers leave"))
-    if not is_active_bool:
-        risk_factors.append(("💤 Inactive", "2x higher churn risk"))
-    if credit_score < 600:
-        risk_factors.append(("📉 Low Credit", "Financial stress indicator"))
+    risk_factors = [RISK_FACTOR_MESSAGES[name] for name in result['risk_factors']]
     
     if risk_factors:
         for factor, reason in risk_factors:
@@ -187,14 +211,14 @@ if predict_btn:
     # Action recommendations
     st.subheader("🚀 Recommended Actions")
     
-    if churn_prob > 0.7:
+    if result['risk_tier'] == TIER_IMMEDIATE:
         st.error("**🚨 CRITICAL - Immediate Action Required**")
         st.write("• **Call customer** within 24 hours")
         st.write("• **Offer** 15% loyalty discount")
         st.write("• **Upgrade** to premium product bundle")
         st.write("• **Assign** dedicated account manager")
         
-    elif churn_prob > 0.5:
+    elif result['risk_tier'] == TIER_PROACTIVE:
         st.warning("**⚠️ HIGH RISK - Proactive Outreach**")
         st.write("• **Email** personalized retention offer")
         st.write("• **Survey** customer satisfaction")
@@ -208,25 +232,46 @@ if predict_btn:
         st.write("• **Engage** with relevant content")
         st.write("• **Check-in** quarterly")
 
+# PREDICTION BUTTON - Large and prominent - and the RESULTS SECTION
+@st.fragment
+def prediction_panel():
+    st.markdown("---")
+    if st.button("🎯 PREDICT CHURN RISK", 
+                 use_container_width=True,
+                 type="primary"):
+        st.session_state.result = score_inputs()
+    
+    # The latest prediction or looked-up customer
+    if st.session_state.get('result') is not None:
+        show_results(st.session_state.result)
+
 # QUICK ACTIONS SECTION
-st.markdown("---")
-st.subheader("⚡ Quick Actions")
-
-quick_col1, quick_col2, quick_col3 = st.columns(3)
-with quick_col1:
-    if st.button("📞 Call", use_container_width=True):
-        st.info("**Call Protocol**: Listen → Empathize → Offer Solution")
-with quick_col2:
-    if st.button("✉️ Email", use_container_width=True):
-        st.info("**Email Template**: Personal greeting + Value offer")
-with quick_col3:
-    if st.button("📊 Report", use_container_width=True):
-        st.info("**Report Generated**: Risk factors + Recommendations")
+@st.fragment
+def quick_actions():
+    st.markdown("---")
+    st.subheader("⚡ Quick Actions")
+    
+    quick_col1, quick_col2, quick_col3 = st.columns(3)
+    with quick_col1:
+        if st.button("📞 Call", use_container_width=True):
+            st.info("**Call Protocol**: Listen → Empathize → Offer Solution")
+    with quick_col2:
+        if st.button("✉️ Email", use_container_width=True):
+            st.info("**Email Template**: Personal greeting + Value offer")
+    with quick_col3:
+        if st.button("📊 Report", use_container_width=True):
+            st.info("**Report Generated**: Risk factors + Recommendations")
+
+if store is not None:
+    lookup_panel()
+customer_inputs()
+prediction_panel()
+quick_actions()
 
 # MOBILE TIPS
 st.markdown("---")
 with st.expander("📱 Mobile Tips"):
-    st.write("""
+    st.write(f"""
     **Add to Home Screen:**
     1. Tap Share/More (⋮) → Add to Home Screen
     2. Use like a native app!
@@ -237,11 +282,11 @@ with st.expander("📱 Mobile Tips"):
     • 1 Product = Highest churn rate
     
     **Model Performance:**
-    • 85% Prediction Accuracy
-    • 74% Churn Detection Rate
-    • 10,000+ Customers Analyzed
+    • {accuracy_text} Prediction Accuracy
+    • {recall_text} Churn Detection Rate
+    • {customers_text} Customers Analyzed
     """)
 
 # FOOTER
 st.markdown("---")
-st.caption("📊 Powered by ML Analysis • 85% Accuracy • Instant Predictions")
\ No newline at end of file
+st.caption(f"📊 Powered by ML Analysis • {accuracy_text} Accuracy • Instant Predictions")
\ No newline at end of file
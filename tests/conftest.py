@@ -0,0 +1,36 @@
+import pytest
+
+from churn_scoring.artifacts import load_artifacts
+from churn_scoring.pipeline import FeaturePipeline
+from churn_scoring.synthetic import synthetic_customers
+
+
+@pytest.fixture(scope='session')
+def artifacts():
+    return load_artifacts()
+
+
+@pytest.fixture(scope='session')
+def model(artifacts):
+    return artifacts[0]
+
+
+@pytest.fixture(scope='session')
+def scaler(artifacts):
+    return artifacts[1]
+
+
+@pytest.fixture(scope='session')
+def feature_names(artifacts):
+    return artifacts[2]
+
+
+@pytest.fixture
+def pipeline(scaler, feature_names):
+    return FeaturePipeline(scaler, feature_names)
+
+
+@pytest.fixture(scope='session')
+def customers():
+    """Raw customer records spanning the app input ranges"""
+    return synthetic_customers(500, seed=3)
@@ -0,0 +1,58 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from churn_scoring import batch
+from churn_scoring.bundle import export_bundle
+from churn_scoring.schema import PREDICTION_COLUMN, PROBABILITY_COLUMN
+
+SCORED_COLUMNS = [PROBABILITY_COLUMN, PREDICTION_COLUMN]
+
+
+def _write(frame, path):
+    if path.endswith('.csv'):
+        frame.to_csv(path, index=False)
+    elif path.endswith('.parquet'):
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path)
+    else:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read(path):
+    return pd.read_csv(path) if path.endswith('.csv') else pd.read_parquet(path)
+
+
+@pytest.mark.parametrize('source', ['in.csv', 'in.parquet', 'in.arrow'])
+@pytest.mark.parametrize('destination', ['out.csv', 'out.parquet'])
+def test_empty_input_writes_header_only_output(tmp_path, customers, source, destination):
+    source, destination = str(tmp_path / source), str(tmp_path / destination)
+    _write(customers.head(0), source)
+    assert batch.main([source, destination]) is None
+    scored = _read(destination)
+    assert scored.empty
+    assert list(scored.columns) == list(customers.columns) + SCORED_COLUMNS
+
+
+def test_single_process_scoring_uses_the_bundle(tmp_path, customers, model, scaler,
+                                                feature_names, monkeypatch):
+    source = str(tmp_path / 'in.csv')
+    _write(customers, source)
+    bundle_path = str(tmp_path / 'model.bundle')
+    export_bundle(bundle_path, model, scaler, feature_names)
+    opened = []
+    load_bundle = batch.load_bundle
+    monkeypatch.setattr(batch, 'load_bundle', lambda path: opened.append(path) or load_bundle(path))
+
+    batch.main([source, str(tmp_path / 'bundle.csv'), '--bundle', bundle_path])
+    batch.main([source, str(tmp_path / 'artifacts.csv')])
+    assert opened == [bundle_path]
+    pd.testing.assert_frame_equal(_read(str(tmp_path / 'bundle.csv')),
+                                  _read(str(tmp_path / 'artifacts.csv')))
+
+
+def test_bundle_requires_the_fast_engine(tmp_path):
+    with pytest.raises(SystemExit):
+        batch.main(['in.csv', 'out.csv', '--engine', 'sklearn', '--bundle', 'model.bundle'])
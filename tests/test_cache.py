@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from churn_scoring.cache import (
+    MAX_ROWS_ENV_VAR, QUANTIZE_ENV_VAR, PredictionCache, SQLiteBackend
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+
+def _rows(path):
+    conn = SQLiteBackend(path)._connection()
+    return sorted(conn.execute("SELECT model_version, key FROM predictions").fetchall())
+
+
+def test_switching_version_keeps_rows_other_processes_use(db_path):
+    old = PredictionCache(backend=SQLiteBackend(db_path), model_version='v1')
+    new = PredictionCache(backend=SQLiteBackend(db_path), model_version='v1')
+    old.put(b'a', 0.25)
+    new.set_model_version('v2')
+    new.put(b'a', 0.75)
+
+    assert _rows(db_path) == [('v1', b'a'), ('v2', b'a')]
+    # A process still on v1 keeps hitting its shared rows
+    fresh_v1 = PredictionCache(backend=SQLiteBackend(db_path), model_version='v1')
+    assert fresh_v1.get(b'a') == 0.25
+    assert new.get(b'a') == 0.75
+
+
+def test_retire_versions_deletes_only_those_versions(db_path):
+    cache = PredictionCache(backend=SQLiteBackend(db_path), model_version='v1')
+    cache.put(b'a', 0.25)
+    cache.set_model_version('v2')
+    cache.put(b'a', 0.75)
+    cache.retire_versions(['v1'])
+    assert _rows(db_path) == [('v2', b'a')]
+
+
+def test_purge_removes_expired_rows(db_path):
+    backend = SQLiteBackend(db_path)
+    backend.put('v1', b'old', 0.1, expires_at=100.0)
+    backend.put('v1', b'live', 0.2, expires_at=300.0)
+    backend.purge(now=200.0)
+    assert _rows(db_path) == [('v1', b'live')]
+
+
+def test_quantize_from_env(monkeypatch):
+    monkeypatch.setenv(QUANTIZE_ENV_VAR, 'Balance=100, EstimatedSalary=1000')
+    monkeypatch.delenv('CHURN_CACHE_DB', raising=False)
+    cache = PredictionCache.from_env()
+    assert cache.quantize == {'Balance': 100.0, 'EstimatedSalary': 1000.0}
+    seen = []
+    cache.get_or_compute({'Balance': 1234.0, 'EstimatedSalary': 56789.0},
+                         lambda record: seen.append(record) or 0.5)
+    assert seen == [{'Balance': 1200.0, 'EstimatedSalary': 57000.0}]
+    # A near-identical profile is a hit
+    assert cache.get_or_compute({'Balance': 1180.0, 'EstimatedSalary': 57100.0},
+                                lambda record: 0.9) == 0.5
+
+
+def test_quantize_argument_overrides_env(monkeypatch):
+    monkeypatch.setenv(QUANTIZE_ENV_VAR, 'Balance=100')
+    assert PredictionCache.from_env(quantize={'Age': 5}).quantize == {'Age': 5}
+
+
+@pytest.mark.parametrize('value', ['Balance', 'Balance=abc', 'Gender=1', 'Balance=0'])
+def test_bad_quantize_env(monkeypatch, value):
+    monkeypatch.setenv(QUANTIZE_ENV_VAR, value)
+    with pytest.raises(ValueError):
+        PredictionCache.from_env()
+
+
+def test_puts_purge_expired_rows_and_cap_the_file(db_path):
+    backend = SQLiteBackend(db_path, max_rows=5, purge_every=4)
+    backend.put('v1', b'expired', 0.1, expires_at=1.0)
+    for i in range(7):
+        backend.put('v1', b'%d' % i, 0.5, expires_at=time.time() + 100 + i)
+    # Purged on the 4th put (expired row) and the 8th (over the cap)
+    assert _rows(db_path) == [('v1', b'%d' % i) for i in range(2, 7)]
+
+
+def test_from_env_row_cap(monkeypatch, db_path):
+    monkeypatch.setenv('CHURN_CACHE_DB', db_path)
+    monkeypatch.setenv(MAX_ROWS_ENV_VAR, '10')
+    assert PredictionCache.from_env().backend.max_rows == 10
+    monkeypatch.setenv(MAX_ROWS_ENV_VAR, 'many')
+    with pytest.raises(ValueError):
+        PredictionCache.from_env()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from churn_scoring import columnar
+from churn_scoring.encoding import encode_customers, scale_features
+
+STRING_COLUMNS = ['Geography', 'Gender', 'HasCrCard', 'IsActiveMember']
+
+
+def _reference(frame, scaler, feature_names):
+    return scale_features(encode_customers(frame, feature_names), scaler)
+
+
+def _form_flags(customers):
+    """Yes/No string flags, as exported from the forms"""
+    frame = customers.copy()
+    for col in ('HasCrCard', 'IsActiveMember'):
+        frame[col] = np.where(frame[col] == 1, 'Yes', 'No')
+    return frame
+
+
+def _with_nulls(customers):
+    frame = _form_flags(customers).astype({'Age': float, 'Balance': float})
+    rng = np.random.default_rng(0)
+    for col in ('Age', 'Balance', 'Geography', 'Gender', 'HasCrCard'):
+        rows = rng.choice(len(frame), 25, replace=False)
+        frame.loc[rows, col] = np.nan if frame[col].dtype.kind == 'f' else None
+    return frame
+
+
+def _dictionary_encoded(table):
+    for col in STRING_COLUMNS:
+        index = table.schema.get_field_index(col)
+        field_type = table.schema.field(col).type
+        if pa.types.is_string(field_type) or pa.types.is_large_string(field_type):
+            table = table.set_column(index, col, table.column(col).dictionary_encode())
+    return table
+
+
+FRAMES = {
+    'numeric flags': lambda customers: customers,
+    'string flags': _form_flags,
+    'nulls': _with_nulls,
+}
+
+
+@pytest.fixture(params=list(FRAMES))
+def frame(request, customers):
+    return FRAMES[request.param](customers)
+
+
+@pytest.mark.parametrize('dictionary', [False, True])
+def test_transform_arrow_matches_pandas_path(pipeline, scaler, feature_names, frame,
+                                             dictionary):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if dictionary:
+        table = _dictionary_encoded(table)
+        assert pa.types.is_dictionary(table.schema.field('Geography').type)
+    expected = _reference(frame, scaler, feature_names)
+    np.testing.assert_array_equal(pipeline.transform_arrow(table), expected)
+    # Record batches and multi-chunk tables take the same path chunk by chunk
+    chunked = pa.Table.from_batches(table.to_batches(max_chunksize=64))
+    assert chunked.column('Age').num_chunks > 1
+    np.testing.assert_array_equal(pipeline.transform_arrow(chunked), expected)
+    batch = table.slice(100, 50).combine_chunks().to_batches()[0]
+    np.testing.assert_array_equal(pipeline.transform_arrow(batch), expected[100:150])
+
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.arrow'])
+def test_feature_matrix_matches_pandas_path(tmp_path, pipeline, scaler, feature_names, frame,
+                                            suffix):
+    path = str(tmp_path / f'customers{suffix}')
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if suffix == '.parquet':
+        pq.write_table(table, path)
+    else:
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table, max_chunksize=128)
+    expected = _reference(pd.read_parquet(path) if suffix == '.parquet'
+                          else pd.read_feather(path), scaler, feature_names)
+    np.testing.assert_array_equal(columnar.feature_matrix(path, pipeline, 100), expected)
+    batches = [X.copy() for X in columnar.feature_batches(path, pipeline, 100)]
+    np.testing.assert_array_equal(np.vstack(batches), expected)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from churn_scoring.explain import SVMExplainer, explain_chunks
+from churn_scoring.schema import PREDICTION_COLUMN, PROBABILITY_COLUMN
+
+
+def test_explain_chunks_columns(model, pipeline, customers):
+    explainer = SVMExplainer(model, pipeline)
+    chunk = customers.head(20)
+    explained, = explain_chunks([chunk], explainer, top_k=2)
+    added = [col for col in explained.columns if col not in chunk.columns]
+    assert added == [PROBABILITY_COLUMN, PREDICTION_COLUMN, 'TopFactor1', 'TopFactor1Impact',
+                     'TopFactor2', 'TopFactor2Impact']
+    assert set(explained['TopFactor1']) <= set(explainer.group_names)
+    assert (np.abs(explained['TopFactor1Impact']) >= np.abs(explained['TopFactor2Impact'])).all()
+
+
+def test_shapley_values_sum_to_probability_change(model, pipeline, customers):
+    explainer = SVMExplainer(model, pipeline)
+    X = pipeline.transform_columns(customers.head(3)).copy()
+    phi, base = explainer.shapley_values(X)
+    probabilities = model.predict_proba(X)[:, 1]
+    np.testing.assert_allclose(phi.sum(axis=1), probabilities - base, atol=1e-9)
+
+
+def test_empty_input(model, pipeline):
+    explainer = SVMExplainer(model, pipeline)
+    X = np.empty((0, pipeline.n_features))
+    phi, base = explainer.shapley_values(X)
+    assert phi.shape == (0, explainer.n_groups)
+    assert base == explainer.shapley_values(explainer.background)[1]
+    assert explainer.occlusion_values(X)[0].shape == (0, explainer.n_groups)
+    assert explainer.top_contributors(X, method='shapley')[0].shape == (0, 3)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_scoring.encoding import encode_customers, scale_features
+from churn_scoring.fast_svm import DEFAULT_BLOCK_SIZE, FastSVM, accuracy_delta
+
+
+@pytest.fixture(scope='module')
+def engine(model):
+    return FastSVM.from_model(model)
+
+
+@pytest.fixture(scope='module')
+def X(customers, scaler, feature_names):
+    return scale_features(encode_customers(customers, feature_names), scaler)
+
+
+def _edge_customers():
+    """Input range corners, an unknown country and a zero-balance customer"""
+    rows = []
+    for credit, age, tenure, balance, products, salary in [
+            (350, 18, 0, 0.0, 1, 0.0),
+            (850, 92, 10, 300000.0, 4, 250000.0),
+            (350, 92, 0, 300000.0, 1, 0.0),
+            (850, 18, 10, 0.0, 4, 250000.0)]:
+        for geography in ('France', 'Germany', 'Spain', 'Italy'):
+            rows.append({
+                'CreditScore': credit, 'Geography': geography, 'Gender': 'Male',
+                'Age': age, 'Tenure': tenure, 'Balance': balance,
+                'NumOfProducts': products, 'HasCrCard': 1, 'IsActiveMember': 0,
+                'EstimatedSalary': salary,
+            })
+    return pd.DataFrame(rows)
+
+
+def test_predict_proba_matches_svc(engine, model, X):
+    assert np.allclose(engine.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9)
+
+
+def test_predict_proba_matches_svc_on_edge_rows(engine, model, scaler, feature_names):
+    X = scale_features(encode_customers(_edge_customers(), feature_names), scaler)
+    assert np.allclose(engine.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9)
+
+
+def test_decision_function_matches_svc(engine, model, X):
+    assert np.allclose(engine.decision_function(X), model.decision_function(X),
+                       rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('n_rows', [1, DEFAULT_BLOCK_SIZE - 1, DEFAULT_BLOCK_SIZE,
+                                    DEFAULT_BLOCK_SIZE + 1])
+def test_block_boundaries(engine, model, X, n_rows):
+    assert np.allclose(engine.predict_proba(X[:n_rows]), model.predict_proba(X[:n_rows]),
+                       rtol=0, atol=1e-9)
+
+
+def test_predict_matches_svc(engine, model, X):
+    assert np.array_equal(engine.predict(X), model.predict(X))
+
+
+def test_pruned_keeping_everything_is_exact(engine, X):
+    delta = accuracy_delta(engine, engine.pruned(1.0), X)
+    assert delta['max_abs_error'] < 1e-6
+    assert delta['label_agreement'] == 1.0
+
+
+def test_pruned_accuracy_delta_within_bounds(engine, X):
+    approx = engine.pruned(0.5)
+    assert approx.n_support == round(engine.n_support * 0.5)
+    delta = accuracy_delta(engine, approx, X)
+    assert delta['mean_abs_error'] < 0.03
+    assert delta['max_abs_error'] < 0.2
+    assert delta['label_agreement'] >= 0.95
+
+
+def test_accuracy_delta_reports_the_differences(engine, X):
+    approx = engine.pruned(0.25)
+    expected = engine.predict_proba(X)[:, 1]
+    actual = approx.predict_proba(X)[:, 1]
+    delta = accuracy_delta(engine, approx, X)
+    assert delta['max_abs_error'] == pytest.approx(np.abs(actual - expected).max())
+    assert delta['mean_abs_error'] == pytest.approx(np.abs(actual - expected).mean())
+    assert delta['label_agreement'] == pytest.approx(
+        np.mean((actual > 0.5) == (expected > 0.5)))
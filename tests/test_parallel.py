@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from churn_scoring.encoding import encode_customers, scale_features
+from churn_scoring.fast_svm import FastSVM
+from churn_scoring.parallel import ParallelScorer
+
+
+@pytest.fixture(scope='module')
+def parallel_scorer():
+    with ParallelScorer(2, min_rows_per_task=64) as scorer:
+        yield scorer
+
+
+@pytest.fixture(scope='module')
+def X(customers, scaler, feature_names):
+    return scale_features(encode_customers(customers, feature_names), scaler)
+
+
+def test_matches_fast_svm(parallel_scorer, model, X):
+    expected = FastSVM.from_model(model).predict_proba(X)
+    assert np.allclose(parallel_scorer.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+def test_empty_input(parallel_scorer):
+    assert parallel_scorer.predict_proba(np.empty((0, 12))).shape == (0, 2)
+
+
+def test_errors_are_not_masked_by_shared_memory_cleanup(parallel_scorer, X, monkeypatch):
+    def fail(n_rows):
+        raise RuntimeError("shard planning failed")
+
+    monkeypatch.setattr(parallel_scorer, '_ranges', fail)
+    with pytest.raises(RuntimeError, match="shard planning failed"):
+        parallel_scorer.predict_proba(X)
+
+
+def test_worker_errors_are_not_masked(parallel_scorer):
+    # Wrong feature count: the worker's engine raises while holding its views
+    with pytest.raises(ValueError):
+        parallel_scorer.predict_proba(np.zeros((10, 5)))
+
+
+def test_first_segment_is_freed_when_the_second_cannot_be_created(parallel_scorer, X,
+                                                                  monkeypatch):
+    from churn_scoring import parallel
+
+    created = []
+    SharedMemory = parallel.SharedMemory
+
+    class FailingSecond(SharedMemory):
+        def __init__(self, *args, **kwargs):
+            if created:
+                raise OSError("no space left for the output segment")
+            super().__init__(*args, **kwargs)
+            created.append(self.name)
+
+    monkeypatch.setattr(parallel, 'SharedMemory', FailingSecond)
+    with pytest.raises(OSError, match="output segment"):
+        parallel_scorer.predict_proba(X)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=created[0])
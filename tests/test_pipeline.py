@@ -0,0 +1,95 @@
+import threading
+
+import numpy as np
+import pytest
+
+from churn_scoring.core import MISSING_FIELD_DEFAULTS, to_columns
+from churn_scoring.encoding import encode_customers, scale_features
+
+
+@pytest.fixture
+def reference(customers, scaler, feature_names):
+    return scale_features(encode_customers(customers, feature_names), scaler)
+
+
+def _form_records(customers):
+    """Records as the Streamlit forms build them: Yes/No flags"""
+    records = customers.to_dict('records')
+    for record in records:
+        record['HasCrCard'] = 'Yes' if record['HasCrCard'] else 'No'
+        record['IsActiveMember'] = 'Yes' if record['IsActiveMember'] else 'No'
+    return records
+
+
+def test_transform_columns_numeric_flags(pipeline, customers, reference):
+    X = pipeline.transform_columns({col: customers[col].to_numpy() for col in customers})
+    assert np.array_equal(X, reference)
+
+
+def test_transform_columns_dataframe(pipeline, customers, reference):
+    assert np.array_equal(pipeline.transform_columns(customers), reference)
+
+
+def test_transform_columns_string_flags(pipeline, customers, reference):
+    columns = to_columns(_form_records(customers))
+    assert columns['HasCrCard'].dtype.kind == 'U'
+    assert np.array_equal(pipeline.transform_columns(columns), reference)
+
+
+@pytest.mark.parametrize('form_style', [False, True])
+def test_transform_record(pipeline, customers, reference, form_style):
+    records = _form_records(customers) if form_style else customers.to_dict('records')
+    for i, record in enumerate(records):
+        assert np.array_equal(pipeline.transform_record(record)[0], reference[i])
+
+
+def test_missing_fields_use_core_defaults(pipeline, customers, scaler, feature_names):
+    partial = customers.drop(columns=list(MISSING_FIELD_DEFAULTS))
+    filled = customers.copy()
+    for field, value in MISSING_FIELD_DEFAULTS.items():
+        filled[field] = value
+    expected = scale_features(encode_customers(filled, feature_names), scaler)
+    assert np.array_equal(pipeline.transform_columns(to_columns(partial)), expected)
+    records = [to_columns([record]) for record in partial.to_dict('records')[:20]]
+    assert all(np.array_equal(pipeline.transform_columns(r)[0], expected[i])
+               for i, r in enumerate(records))
+
+
+def test_missing_columns_rejected(pipeline, customers):
+    with pytest.raises(ValueError, match='Missing customer columns: Age'):
+        pipeline.transform_columns(customers.drop(columns=['Age']))
+
+
+def test_buffer_reused_across_calls(pipeline, customers, reference):
+    first = pipeline.transform_columns(customers)
+    assert np.array_equal(first, reference)
+    second = pipeline.transform_columns(customers.iloc[::-1])
+    # Same per-thread buffer: the first view now holds the second result
+    assert np.shares_memory(first, second)
+    assert np.array_equal(second, reference[::-1])
+    # A smaller call after a larger one still produces exact rows
+    assert np.array_equal(pipeline.transform_record(customers.iloc[7].to_dict())[0],
+                          reference[7])
+    assert np.array_equal(pipeline.transform_columns(customers.iloc[:3]), reference[:3])
+
+
+def test_buffer_grows_for_larger_batches(pipeline, customers, reference):
+    pipeline.transform_columns(customers.iloc[:2])
+    assert np.array_equal(pipeline.transform_columns(customers), reference)
+
+
+def test_buffers_are_per_thread(pipeline, customers, reference):
+    results = {}
+
+    def run(name, frame):
+        results[name] = pipeline.transform_columns(frame)
+
+    threads = [threading.Thread(target=run, args=('forward', customers)),
+               threading.Thread(target=run, args=('reverse', customers.iloc[::-1]))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not np.shares_memory(results['forward'], results['reverse'])
+    assert np.array_equal(results['forward'], reference)
+    assert np.array_equal(results['reverse'], reference[::-1])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from churn_scoring.core import SVCBackend
+from churn_scoring.fast_svm import FastSVM
+from churn_scoring.precision import (
+    DEFAULT_LIMITS, LIMITS_ENV_VAR, PRECISION_ENV_VAR, PrecisionLimitError, checked_engine,
+    configured_limits, reduced_engine, validation_matrix
+)
+
+
+@pytest.fixture(scope='module')
+def engine(model):
+    return FastSVM.from_model(model)
+
+
+def test_float32_within_documented_limits(model, engine, pipeline):
+    candidate, report = checked_engine(model, engine, pipeline, 'float32', DEFAULT_LIMITS)
+    assert candidate.precision == 'float32'
+    assert report['passed'] and not report['violations']
+    X = validation_matrix(pipeline, 2000, seed=5)
+    error = np.abs(candidate.predict_proba(X)[:, 1] - model.predict_proba(X)[:, 1])
+    assert error.max() <= DEFAULT_LIMITS['max_abs_error']
+    assert error.mean() <= DEFAULT_LIMITS['mean_abs_error']
+
+
+@pytest.mark.parametrize('precision', ['float32', 'int8'])
+def test_guardrail_violation_is_rejected(model, engine, pipeline, precision):
+    # No reduced mode is exact, so zero tolerance must refuse it
+    limits = dict(DEFAULT_LIMITS, max_abs_error=0.0)
+    with pytest.raises(PrecisionLimitError) as error:
+        checked_engine(model, engine, pipeline, precision, limits, n_rows=500)
+    report = error.value.report
+    assert not report['passed'] and report['precision'] == precision
+    assert report['violations'][0].startswith('max_abs_error')
+
+
+def test_backend_falls_back_to_float64_on_violation(monkeypatch):
+    monkeypatch.setenv(PRECISION_ENV_VAR, 'float32')
+    monkeypatch.setenv(LIMITS_ENV_VAR, 'max_abs_error=0')
+    backend = SVCBackend.from_artifacts('fast_svm', fast=True)
+    assert backend.precision == 'float64'
+    assert not backend.precision_report['passed']
+    assert getattr(backend.model, 'precision', 'float64') == 'float64'
+
+
+def test_backend_uses_float32_within_limits(monkeypatch):
+    monkeypatch.setenv(PRECISION_ENV_VAR, 'float32')
+    monkeypatch.delenv(LIMITS_ENV_VAR, raising=False)
+    backend = SVCBackend.from_artifacts('fast_svm', fast=True)
+    assert backend.precision == 'float32' and backend.precision_report['passed']
+
+
+def test_float64_is_the_exact_engine(engine, pipeline):
+    assert reduced_engine(engine, pipeline, 'float64') is engine
+
+
+def test_limits_from_env(monkeypatch):
+    monkeypatch.setenv(LIMITS_ENV_VAR, 'max_abs_error=0.02, label_flip_rate=0.002')
+    assert configured_limits() == dict(DEFAULT_LIMITS, max_abs_error=0.02,
+                                       label_flip_rate=0.002)
+    monkeypatch.setenv(LIMITS_ENV_VAR, 'max_error=1')
+    with pytest.raises(ValueError):
+        configured_limits()
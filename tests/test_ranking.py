@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_scoring.core import get_scorer
+from churn_scoring.ranking import RANK_COLUMN, SegmentTopK, age_band, rank_file
+from churn_scoring.schema import PROBABILITY_COLUMN
+
+
+def exact_top_k(frame, probabilities, top_k, segment_by):
+    """Full sort per segment: probability descending, earlier rows first on ties"""
+    frame = frame.copy()
+    if 'AgeBand' in segment_by:
+        frame['AgeBand'] = age_band(frame['Age'])
+    frame[PROBABILITY_COLUMN] = probabilities
+    frame = frame.sort_values(PROBABILITY_COLUMN, ascending=False, kind='mergesort')
+    if segment_by:
+        frame = frame.groupby(segment_by, sort=False).head(top_k)
+        return frame.sort_values(segment_by, kind='mergesort')
+    return frame.head(top_k)
+
+
+@pytest.fixture
+def portfolio(customers):
+    frame = pd.concat([customers] * 4, ignore_index=True)
+    # One segment smaller than K
+    frame.loc[:2, 'Geography'] = 'Portugal'
+    return frame
+
+
+def _ranked(frame, probabilities, top_k, segment_by, chunk_size):
+    ranking = SegmentTopK(top_k, segment_by)
+    for start in range(0, len(frame), chunk_size):
+        ranking.push(frame.iloc[start:start + chunk_size],
+                     probabilities[start:start + chunk_size])
+    return ranking.ranked()
+
+
+@pytest.mark.parametrize('segment_by', [(), ('Geography',), ('Geography', 'AgeBand'),
+                                        ('NumOfProducts',)])
+@pytest.mark.parametrize('chunk_size', [37, 500, 5000])
+def test_matches_exact_ranking_with_ties(portfolio, segment_by, chunk_size):
+    # Probabilities on a 0.05 grid: most rows tie with many others
+    probabilities = np.random.default_rng(0).integers(0, 21, len(portfolio)) / 20
+    top_k = 25
+    ranked = _ranked(portfolio, probabilities, top_k, list(segment_by), chunk_size)
+    expected = exact_top_k(portfolio, probabilities, top_k, list(segment_by))
+
+    columns = list(portfolio.columns) + [PROBABILITY_COLUMN]
+    pd.testing.assert_frame_equal(ranked[columns].reset_index(drop=True),
+                                  expected[columns].reset_index(drop=True))
+    if segment_by:
+        for _, segment in ranked.groupby(list(segment_by)):
+            assert segment[RANK_COLUMN].tolist() == list(range(1, len(segment) + 1))
+        assert ranked.groupby(list(segment_by)).size().max() == top_k
+    if 'Geography' in segment_by:
+        # The small segment keeps all its rows
+        assert (ranked['Geography'] == 'Portugal').sum() == 3
+
+
+def test_rank_file_matches_exact_ranking(tmp_path, portfolio):
+    source, destination = str(tmp_path / 'portfolio.csv'), str(tmp_path / 'actions.csv')
+    portfolio.to_csv(source, index=False)
+    scorer = get_scorer('rules')
+    rows, written = rank_file(source, destination, scorer, top_k=40, chunk_size=300)
+    assert rows == len(portfolio)
+
+    expected = exact_top_k(portfolio, scorer.score_columns(portfolio)['probability'], 40,
+                           ['Geography'])
+    actions = pd.read_csv(destination)
+    assert written == len(expected) == len(actions)
+    np.testing.assert_array_equal(actions[PROBABILITY_COLUMN], expected[PROBABILITY_COLUMN])
+    np.testing.assert_array_equal(actions['Age'], expected['Age'])
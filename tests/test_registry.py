@@ -0,0 +1,149 @@
+import copy
+import os
+import shutil
+import threading
+
+import joblib
+import pytest
+
+from churn_scoring.artifacts import ARTIFACT_DIR, FEATURE_NAMES_FILE, MODEL_FILE, SCALER_FILE
+from churn_scoring.cache import PredictionCache, SQLiteBackend
+from churn_scoring.loader import EAGER_ENV_VAR, BackgroundLoader
+from churn_scoring.registry import ModelRegistry
+
+
+@pytest.fixture
+def artifact_dir(tmp_path):
+    for name in (MODEL_FILE, SCALER_FILE, FEATURE_NAMES_FILE):
+        shutil.copy(os.path.join(ARTIFACT_DIR, name), tmp_path / name)
+    return str(tmp_path)
+
+
+def write_version(artifact_dir, model, tag):
+    """Rewrite the model file as a new artifact version of the same model"""
+    model = copy.copy(model)
+    model.registry_test_tag = tag
+    joblib.dump(model, os.path.join(artifact_dir, MODEL_FILE))
+
+
+def test_dropped_versions_are_retired_from_the_shared_cache(artifact_dir, model, tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.db'))
+
+    def prepare(scorer):
+        scorer.cache = PredictionCache(backend=backend, model_version=scorer.backend.version)
+
+    registry = ModelRegistry('svc', artifact_dir, keep=1, prepare=prepare)
+    first = registry.active.version
+    registry.scorer.cache.put(b'key', 0.5)
+    write_version(artifact_dir, model, 1)
+    assert registry.refresh()
+    registry.scorer.cache.put(b'key', 0.6)
+    # Still loaded for rollback
+    assert backend.get(first, b'key', 0) is not None
+
+    write_version(artifact_dir, model, 2)
+    assert registry.refresh()
+    assert first not in [v['version'] for v in registry.versions()]
+    assert backend.get(first, b'key', 0) is None
+    assert backend.get(registry.versions()[1]['version'], b'key', 0) is not None
+
+
+def test_rollback_without_a_previous_version(artifact_dir):
+    registry = ModelRegistry('svc', artifact_dir)
+    with pytest.raises(ValueError, match="No previous model version"):
+        registry.rollback()
+    with pytest.raises(ValueError, match="not loaded"):
+        registry.rollback('0123456789abcdef')
+
+
+def test_rollback_to_the_previous_version(artifact_dir, model):
+    registry = ModelRegistry('svc', artifact_dir)
+    first = registry.active.version
+    write_version(artifact_dir, model, 1)
+    assert registry.refresh()
+    second = registry.active.version
+    assert second != first
+
+    assert registry.rollback() == first
+    assert registry.active.version == first
+    assert [v['active'] for v in registry.versions()] == [False, True]
+    # Nothing new on disk: the rolled-back version stays active
+    assert not registry.refresh()
+    assert registry.rollback(second) == second
+
+
+def test_invalid_artifacts_are_rejected_and_not_retried(artifact_dir):
+    registry = ModelRegistry('svc', artifact_dir)
+    active = registry.active
+    with open(os.path.join(artifact_dir, MODEL_FILE), 'wb') as f:
+        f.write(b'not a pickle')
+    assert not registry.refresh()
+    assert registry.active is active
+    assert registry.last_error and len(registry.rejected) == 1
+    assert not registry.refresh()
+
+
+def test_swap_while_scoring(artifact_dir, model, customers):
+    registry = ModelRegistry('svc', artifact_dir)
+    records = customers.head(50).to_dict('records')
+    expected = [r['probability'] for r in registry.scorer.score(records)]
+    errors = []
+    stop = threading.Event()
+
+    def score():
+        while not stop.is_set():
+            try:
+                loaded = registry.active
+                results = loaded.scorer.score(records)
+                # Every result of one request comes from the model it started on
+                assert {r['model_version'] for r in results} == {loaded.version}
+                assert [r['probability'] for r in results] == expected
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=score) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        versions = set()
+        for tag in range(3):
+            write_version(artifact_dir, model, tag)
+            assert registry.refresh()
+            versions.add(registry.active.version)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert not errors
+    assert len(versions) == 3
+
+
+def test_loader_returns_the_loaded_value():
+    loader = BackgroundLoader(lambda: 42)
+    assert loader.result(timeout=10) == 42
+    assert loader.ready and loader.elapsed is not None
+
+
+def test_loader_reraises_load_errors():
+    started = threading.Event()
+
+    def load():
+        started.wait(10)
+        raise ValueError("broken artifacts")
+
+    loader = BackgroundLoader(load)
+    assert not loader.ready
+    with pytest.raises(TimeoutError):
+        loader.result(timeout=0.01)
+    started.set()
+    for _ in range(2):
+        with pytest.raises(ValueError, match="broken artifacts"):
+            loader.result(timeout=10)
+
+
+def test_eager_loading_from_the_environment(monkeypatch):
+    monkeypatch.setenv(EAGER_ENV_VAR, '1')
+    thread = []
+    loader = BackgroundLoader(lambda: thread.append(threading.current_thread()))
+    assert loader.ready and thread == [threading.current_thread()]
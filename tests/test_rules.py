@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from churn_scoring.core import get_scorer
+from churn_scoring.rule_engine import (
+    N_BUCKETS, RISK_FACTORS, bucket_index, compile_rules, representative_records
+)
+from churn_scoring.rules import predict_churn_mobile, predict_churn_risk
+from churn_scoring.synthetic import boundary_customers
+
+
+def _desktop(record):
+    return predict_churn_risk(record)[0]
+
+
+def _mobile(record):
+    return predict_churn_mobile(
+        record['Age'], record['NumOfProducts'], record['Balance'],
+        record['IsActiveMember'] != 0, record['Geography'],
+        record['CreditScore'], record['Gender'],
+    )[0]
+
+
+ORIGINAL_RULES = {'rules': _desktop, 'rules_mobile': _mobile}
+
+
+def _columns(records):
+    return {col: np.array([r[col] for r in records]) for col in records[0]}
+
+
+def _records(columns):
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*(columns[c].tolist() for c in names))]
+
+
+def _cases():
+    buckets = list(representative_records())
+    boundary = _records(boundary_customers(20_000, seed=1))
+    return {'buckets': buckets, 'boundary': boundary}
+
+
+CASES = _cases()
+
+
+def test_representatives_cover_every_bucket():
+    index = bucket_index(_columns(CASES['buckets']))
+    assert np.array_equal(index, np.arange(N_BUCKETS))
+
+
+@pytest.mark.parametrize('case', list(CASES))
+@pytest.mark.parametrize('backend', list(ORIGINAL_RULES))
+def test_compiled_rules_match_original(backend, case):
+    records = CASES[case]
+    expected = np.array([ORIGINAL_RULES[backend](r) for r in records])
+    probabilities = get_scorer(backend).backend.probabilities(_columns(records))
+    mismatches = np.flatnonzero(probabilities != expected)
+    assert mismatches.size == 0, f"{mismatches.size} mismatches, first {records[mismatches[0]]}"
+
+
+@pytest.mark.parametrize('case', list(CASES))
+def test_risk_factor_masks_match_predicates(case):
+    records = CASES[case]
+    expected = np.array([
+        sum(1 << bit for bit, (_, predicate) in enumerate(RISK_FACTORS) if predicate(r))
+        for r in records
+    ])
+    masks = compile_rules(_desktop).score(_columns(records))[2]
+    assert np.array_equal(masks, expected)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from churn_scoring.core import get_scorer
+from churn_scoring.service import RequestError, Scorer, ScoringService, validate_record
+
+RECORD = {
+    'CreditScore': 600, 'Geography': 'Germany', 'Gender': 0, 'Age': 52, 'Tenure': 3,
+    'Balance': 120000.0, 'NumOfProducts': 1, 'HasCrCard': 1, 'IsActiveMember': 0,
+    'EstimatedSalary': 90000.0,
+}
+FORM_RECORD = dict(RECORD, Gender='Male', HasCrCard='Yes', IsActiveMember='No')
+
+
+def test_validate_record_canonical_form():
+    assert validate_record(RECORD) == dict(RECORD, Gender='Female', HasCrCard=1.0,
+                                           IsActiveMember=0.0)
+    assert validate_record(FORM_RECORD) == dict(RECORD, Gender='Male', HasCrCard=1.0,
+                                                IsActiveMember=0.0)
+    assert validate_record(dict(RECORD, Gender=' male ', HasCrCard='0'))['HasCrCard'] == 0.0
+
+
+def test_validate_record_leaves_input_untouched():
+    record = dict(FORM_RECORD)
+    validate_record(record)
+    assert record == FORM_RECORD
+
+
+@pytest.mark.parametrize('field, value', [
+    ('Gender', 'X'), ('Gender', 2), ('HasCrCard', 'maybe'), ('IsActiveMember', None),
+    ('Age', '52'), ('Geography', 1),
+])
+def test_validate_record_rejects_bad_values(field, value):
+    with pytest.raises(RequestError) as error:
+        validate_record(dict(RECORD, **{field: value}))
+    assert error.value.status == 400
+
+
+@pytest.mark.parametrize('backend', ['svc', 'rules', 'rules_mobile'])
+def test_batch_neighbours_do_not_change_a_score(backend):
+    scorer = get_scorer(backend)
+    alone, = scorer.score([validate_record(RECORD)])
+    batched = scorer.score([validate_record(RECORD), validate_record(FORM_RECORD)])
+    assert batched[0]['probability'] == alone['probability']
+    assert batched[0]['risk_factors'] == alone['risk_factors']
+
+
+@pytest.mark.parametrize('backend', ['rules', 'rules_mobile'])
+def test_numeric_gender_is_female_for_rules(backend):
+    scorer = get_scorer(backend)
+    numeric, = scorer.score([dict(RECORD, Gender=0)])
+    named, = scorer.score([dict(RECORD, Gender='Female')])
+    assert numeric == named
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), float('-inf')])
+def test_validate_record_rejects_non_finite_numbers(value):
+    with pytest.raises(RequestError) as error:
+        validate_record(dict(RECORD, Balance=value))
+    assert error.value.status == 400
+
+
+def _exchange(request):
+    """Status line of the response to one raw HTTP request"""
+    service = ScoringService(Scorer(get_scorer('rules')))
+
+    async def run():
+        service.batcher.start()
+        server = await asyncio.start_server(service._handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), 10)
+            writer.close()
+            return status_line.decode()
+        finally:
+            server.close()
+            await service.batcher.stop()
+
+    return asyncio.run(run())
+
+
+def test_nan_in_json_body_is_a_bad_request():
+    body = json.dumps(dict(RECORD, Age=float('nan'))).encode()
+    assert b'NaN' in body
+    request = (b"POST /score HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body)) + body
+    assert _exchange(request).startswith('HTTP/1.1 400')
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1.5'])
+def test_malformed_content_length_is_a_bad_request(length):
+    request = f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode()
+    assert _exchange(request).startswith('HTTP/1.1 400')
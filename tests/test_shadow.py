@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from churn_scoring.core import get_scorer, to_columns
+from churn_scoring.prediction import CHURN_THRESHOLD
+from churn_scoring.shadow import CALIBRATION_BINS, ShadowRunner, _tiers
+
+
+@pytest.fixture
+def frame(customers):
+    return customers.head(300)
+
+
+def _probabilities(backend, frame):
+    return np.asarray(get_scorer(backend).backend.probabilities(to_columns(frame)))
+
+
+def test_report_against_direct_comparison(frame):
+    runner = ShadowRunner({'rules': get_scorer('rules'), 'svc_copy': get_scorer('svc')})
+    scorer = runner.wrap(get_scorer('svc'))
+    scorer.block = True
+    for start in range(0, len(frame), 100):
+        scorer.score_columns(frame.iloc[start:start + 100])
+    runner.drain()
+
+    primary = _probabilities('svc', frame)
+    rules = _probabilities('rules', frame)
+    report = {row['scorer']: row for row in runner.report()}
+    assert set(report) == {'svc', 'rules', 'svc_copy'}
+    assert runner.counters() == {'submitted': 3, 'dropped': 0, 'sampled_out': 0}
+
+    assert report['svc']['role'] == 'primary'
+    assert report['svc']['calls'] == 3 and report['svc']['rows'] == len(frame)
+    assert report['svc']['mean_probability'] == pytest.approx(primary.mean())
+    assert report['svc']['label_agreement'] is None
+
+    row = report['rules']
+    assert row['role'] == 'shadow' and row['rows'] == len(frame) and row['errors'] == 0
+    assert row['mean_probability'] == pytest.approx(rules.mean())
+    assert row['positive_rate'] == pytest.approx((rules > CHURN_THRESHOLD).mean())
+    assert row['label_agreement'] == pytest.approx(
+        ((rules > CHURN_THRESHOLD) == (primary > CHURN_THRESHOLD)).mean())
+    assert row['tier_agreement'] == pytest.approx((_tiers(rules) == _tiers(primary)).mean())
+    assert row['mean_abs_diff'] == pytest.approx(np.abs(rules - primary).mean())
+    assert row['p95_abs_diff'] >= np.quantile(np.abs(rules - primary), 0.95)
+    assert row['p50_ms'] is not None and row['p95_ms'] >= row['p50_ms']
+
+    calibration = runner.calibration('rules')
+    assert len(calibration) == CALIBRATION_BINS
+    assert sum(b['count'] for b in calibration) == len(frame)
+
+    # A shadow identical to the primary agrees everywhere
+    same = report['svc_copy']
+    assert same['label_agreement'] == same['tier_agreement'] == 1.0
+    assert same['mean_abs_diff'] == 0.0 and same['calibration_gap'] == 0.0
+
+
+def test_shadow_errors_are_counted_not_raised(frame):
+    class Broken:
+        class backend:
+            @staticmethod
+            def probabilities(columns):
+                raise RuntimeError("shadow failed")
+
+    runner = ShadowRunner({'broken': Broken()})
+    scorer = runner.wrap(get_scorer('rules'))
+    scorer.block = True
+    result = scorer.score_columns(frame)
+    runner.drain()
+    assert len(result['probability']) == len(frame)
+    row = {r['scorer']: r for r in runner.report()}['broken']
+    assert row['errors'] == 1 and row['rows'] == 0 and row['label_agreement'] is None
+
+
+def test_large_batches_are_subsampled(frame):
+    runner = ShadowRunner({'rules': get_scorer('rules')}, max_rows=50)
+    scorer = runner.wrap(get_scorer('svc'))
+    scorer.block = True
+    scorer.score_columns(frame)
+    runner.drain()
+    report = {r['scorer']: r for r in runner.report()}
+    assert report['svc']['rows'] == len(frame)
+    assert report['rules']['rows'] == 50
@@ -0,0 +1,39 @@
+import pytest
+
+from churn_scoring.core import get_scorer
+from churn_scoring.schema import ID_COLUMN
+from churn_scoring.store import ScoreStore, source_caption
+
+
+@pytest.fixture
+def store(tmp_path, customers):
+    table = customers.head(50).copy()
+    table.insert(0, ID_COLUMN, range(15_000_000, 15_000_050))
+    store = ScoreStore(str(tmp_path / 'scores.db'))
+    store.refresh([table], get_scorer('rules'))
+    return store
+
+
+def test_lookup_by_id_serves_the_last_refresh(store):
+    result = store.lookup('15000000', get_scorer('rules'))
+    row = store.get('15000000')
+    assert result['source'] == 'store'
+    assert result['probability'] == row['probability']
+    assert result['scored_at'] == row['scored_at']
+    assert source_caption(result).startswith('stored score from the refresh of ')
+
+
+def test_lookup_with_changed_record_scores_live(store):
+    scorer = get_scorer('rules')
+    record = dict(store.lookup('15000000', scorer)['record'])
+    assert store.lookup('15000000', scorer, record)['source'] == 'store'
+    record['Age'] = 70 if record['Age'] < 45 else 30
+    result = store.lookup('15000000', scorer, record)
+    assert result['source'] == 'live'
+    assert result['probability'] == scorer.score([record])[0]['probability']
+    assert source_caption(result) == 'scored live (stored score was out of date)'
+
+
+def test_lookup_with_another_model_scores_live(store):
+    assert store.lookup('15000000', get_scorer('rules_mobile'))['source'] == 'live'
+    assert store.lookup('99', get_scorer('rules')) is None
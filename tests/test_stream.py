@@ -0,0 +1,40 @@
+import io
+import json
+
+import pytest
+
+from churn_scoring.core import get_scorer
+from churn_scoring.stream import normalize_record, stream_score
+
+RECORD = {
+    'CreditScore': '600', 'Geography': 'Germany', 'Gender': 'Male', 'Age': '52', 'Tenure': '3',
+    'Balance': '120000', 'NumOfProducts': '1', 'HasCrCard': 'Yes', 'IsActiveMember': '0',
+    'EstimatedSalary': '90000',
+}
+
+
+@pytest.mark.parametrize('gender, expected', [
+    ('Male', 'Male'), (' male ', 'Male'), ('1', 'Male'), (1, 'Male'),
+    ('female', 'Female'), ('0', 'Female'), (0, 'Female'),
+])
+def test_normalize_record_canonical_gender(gender, expected):
+    assert normalize_record(dict(RECORD, Gender=gender))['Gender'] == expected
+
+
+@pytest.mark.parametrize('field, value', [
+    ('Gender', 'M'), ('Gender', '2'), ('Age', 'nan'), ('Balance', 'inf'), ('Age', 'old'),
+    ('HasCrCard', 'nan'), ('IsActiveMember', 'maybe'),
+])
+def test_normalize_record_rejects_bad_values(field, value):
+    with pytest.raises(ValueError, match=field):
+        normalize_record(dict(RECORD, **{field: value}))
+
+
+@pytest.mark.parametrize('backend', ['svc', 'rules'])
+def test_numeric_and_named_gender_score_alike(backend):
+    lines = [json.dumps(dict(RECORD, Gender=gender)) for gender in ('Male', 'male', '1', 1)]
+    lines.append(json.dumps(dict(RECORD, Age='nan')))
+    out = io.StringIO()
+    assert stream_score(lines, out, get_scorer(backend), fmt='ndjson') == 4
+    probabilities = {json.loads(line)['ChurnProbability'] for line in out.getvalue().splitlines()}
+    assert len(probabilities) == 1
@@ -0,0 +1,23 @@
+import os
+
+from churn_scoring import train
+from churn_scoring.artifacts import METRICS_FILE, MODEL_FILE, artifact_version, load_metrics
+
+
+def test_write_artifacts_versions_metrics_before_the_model(tmp_path, model, scaler, monkeypatch):
+    written = []
+    replace = train._replace
+
+    def recording_replace(path, write):
+        replace(path, write)
+        written.append(os.path.basename(path))
+        if os.path.basename(path) == METRICS_FILE:
+            # No model yet, but the metrics already name the version it will have
+            assert not os.path.exists(tmp_path / MODEL_FILE)
+
+    monkeypatch.setattr(train, '_replace', recording_replace)
+    version = train.write_artifacts(str(tmp_path), model, scaler, {'test': {'accuracy': 0.9}})
+
+    assert written[0] == METRICS_FILE and written[-1] == MODEL_FILE
+    assert version == artifact_version(str(tmp_path))
+    assert load_metrics(str(tmp_path)) == {'test': {'accuracy': 0.9}, 'model_version': version}
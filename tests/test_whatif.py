@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from churn_scoring.core import get_scorer
+from churn_scoring.whatif import BASE_CACHE_SIZE, WhatIfSweep
+
+
+def test_base_vector_cache_is_thread_safe(customers):
+    sweep = WhatIfSweep(get_scorer('svc'))
+    records = customers.to_dict('records')
+
+    def encode(record):
+        return sweep.base_vector(record)
+
+    with ThreadPoolExecutor(8) as pool:
+        for _ in range(3):
+            vectors = list(pool.map(encode, records))
+
+    assert len(sweep._base_vectors) == BASE_CACHE_SIZE
+    expected = sweep._pipeline.transform_columns(customers)
+    np.testing.assert_array_equal(np.array(vectors), expected)
+
+
+def test_sweep_base_matches_the_scorer(customers):
+    scorer = get_scorer('svc')
+    record = customers.to_dict('records')[0]
+    base, rows = WhatIfSweep(scorer).sweep(record)
+    assert base == scorer.score([record])[0]['probability']
+    assert len(rows) == sum(len(values) for values in WhatIfSweep(scorer).candidates.values())